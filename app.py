@@ -1,12 +1,22 @@
-from flask import Flask, render_template, request, jsonify, send_file, redirect, url_for, flash, session
+from flask import Flask, Response, render_template, request, jsonify, send_file, redirect, url_for, flash, session
 from flask_login import LoginManager, login_user, logout_user, login_required, current_user
 from werkzeug.utils import secure_filename
 from config import Config
-from database.models import db, User, AnalysisResult, EncryptedData, AuditLog
+from database.models import db, User, AnalysisResult, BenchmarkResult, EncryptedData
+from database.persistence import save_analysis_results, save_encrypted_batch, analysis_stats
+from database.pagination import keyset_page
+from database.migrations import ensure_indexes, ensure_analysis_stats
 from modules.analyzer import EncryptionAnalyzer
+from modules.measurement import MEMORY_MODES
 from modules.key_manager import KeyManager
+from modules.encryption.registry import registry, FILE, ANALYZE
 from modules.report_generator import ReportGenerator
-from modules.memory_encryptor import MemoryEncryptor
+from modules.report_cache import ReportCache
+from modules.parallel_encryptor import ParallelMemoryEncryptor
+from modules.container_format import ContainerError
+from modules import benchmark
+from modules.audit_pipeline import AuditPipeline
+from modules.job_queue import JobQueue, Job
 import os
 import sys
 import base64
@@ -26,6 +36,7 @@ app.config.from_object(Config)
 
 # Initialize extensions
 db.init_app(app)
+audit_pipeline = AuditPipeline(app)
 login_manager = LoginManager()
 login_manager.init_app(app)
 login_manager.login_view = 'login'
@@ -34,10 +45,17 @@ login_manager.login_view = 'login'
 analyzer = EncryptionAnalyzer(Config)
 key_manager = KeyManager(Config.KEY_VAULT_PATH, Config.AUDIT_LOG_PATH)
 report_generator = ReportGenerator()
+job_queue = JobQueue(max_workers=Config.ANALYSIS_JOB_WORKERS, ttl=Config.ANALYSIS_JOB_TTL)
+# Sweeps get their own worker, so a long sweep does not hold up analyses
+benchmark_queue = JobQueue(max_workers=Config.BENCHMARK_JOB_WORKERS, ttl=Config.ANALYSIS_JOB_TTL)
+report_cache = ReportCache(Config.REPORT_CACHE_FOLDER, Config.REPORT_CACHE_MAX_BYTES)
 
 # Initialize memory encryptor (will be initialized after app context)
 memory_encryptor = None
 
+# Algorithms offered by /secure-encrypt and /secure-decrypt
+SECURE_ALGORITHMS = tuple(registry.names(FILE))
+
 @login_manager.user_loader
 def load_user(user_id):
     return User.query.get(int(user_id))
@@ -59,14 +77,12 @@ def login():
             login_user(user)
             
             # Log audit
-            audit = AuditLog(
-                user_id=user.id,
-                action='LOGIN',
+            audit_pipeline.log(
+                'LOGIN',
                 details=f'User {username} logged in',
+                user_id=user.id,
                 ip_address=request.remote_addr
             )
-            db.session.add(audit)
-            db.session.commit()
             
             flash('Muvaffaqiyatli kirdingiz!', 'success')
             return redirect(url_for('index'))
@@ -115,14 +131,12 @@ def register():
         db.session.commit()
         
         # Log audit
-        audit = AuditLog(
-            user_id=user.id,
-            action='REGISTER',
+        audit_pipeline.log(
+            'REGISTER',
             details=f'New user registered: {username}',
+            user_id=user.id,
             ip_address=request.remote_addr
         )
-        db.session.add(audit)
-        db.session.commit()
         
         flash('Ro\'yxatdan o\'tdingiz! Endi tizimga kirishingiz mumkin.', 'success')
         return redirect(url_for('login'))
@@ -133,14 +147,12 @@ def register():
 @login_required
 def logout():
     # Log audit
-    audit = AuditLog(
-        user_id=current_user.id,
-        action='LOGOUT',
+    audit_pipeline.log(
+        'LOGOUT',
         details=f'User {current_user.username} logged out',
+        user_id=current_user.id,
         ip_address=request.remote_addr
     )
-    db.session.add(audit)
-    db.session.commit()
     
     logout_user()
     flash('Tizimdan chiqdingiz!', 'info')
@@ -187,58 +199,123 @@ def analyze():
                 
                 plaintext = file.read()
             
-            # Run analysis on all algorithms
-            results = analyzer.compare_algorithms(plaintext)
-            
-            # Save results to database
-            for result in results:
-                analysis_result = AnalysisResult(
-                    user_id=current_user.id,
-                    algorithm=result['algorithm'],
-                    encryption_time_ms=result['encryption_time_ms'],
-                    decryption_time_ms=result['decryption_time_ms'],
-                    total_time_ms=result['total_time_ms'],
-                    avg_cpu_percent=result['avg_cpu_percent'],
-                    avg_memory_mb=result['avg_memory_mb'],
-                    entropy=result['entropy'],
-                    key_size=result['key_size'],
-                    security_level=result['security_level'],
-                    t_performance=result['T_performance'],
-                    e_security=result['E_security'],
-                    k_key_management=result['K_key_management'],
-                    i_integrity=result['I_integrity'],
-                    s_overall_score=result['S_overall_score'],
-                    plaintext_size=result['plaintext_size'],
-                    ciphertext_size=result['ciphertext_size'],
-                    integrity_check=result['integrity_check']
-                )
-                db.session.add(analysis_result)
-            
-            db.session.commit()
+            memory_mode = request.form.get('memory_mode') or analyzer.memory_mode
+            if memory_mode not in MEMORY_MODES:
+                return jsonify({'error': 'Noma\'lum xotira o\'lchash rejimi!'}), 400
+            if memory_mode not in analyzer.memory_modes:
+                return jsonify({'error': 'Bu xotira o\'lchash rejimi ushbu platformada mavjud emas!'}), 400
             
-            # Log audit
-            audit = AuditLog(
-                user_id=current_user.id,
-                action='ANALYSIS',
-                details=f'Analyzed {len(results)} algorithms',
-                ip_address=request.remote_addr
+            # Run the analysis on a background worker; the browser polls the job
+            job = job_queue.submit(
+                _run_analysis_job,
+                current_user.id,
+                analyzer.ALGORITHMS,
+                plaintext,
+                current_user.id,
+                request.remote_addr,
+                memory_mode
             )
-            db.session.add(audit)
-            db.session.commit()
-            
-            # Store results in session for report generation
-            session['last_analysis'] = results
             
             return jsonify({
                 'success': True,
-                'results': results,
-                'best_algorithm': analyzer.get_best_algorithm(results)
-            })
+                'job_id': job.id,
+                'status_url': url_for('analysis_job_status', job_id=job.id),
+                'events_url': url_for('analysis_job_events', job_id=job.id)
+            }), 202
         
         except Exception as e:
             return jsonify({'error': str(e)}), 500
     
-    return render_template('analyze.html')
+    return render_template('analyze.html', memory_modes=analyzer.memory_modes,
+                           default_memory_mode=analyzer.memory_mode)
+
+def _run_analysis_job(job, plaintext, user_id, ip_address, memory_mode=None):
+    """Background analysis: report each algorithm as it finishes, then save the batch"""
+    results = analyzer.compare_algorithms(
+        plaintext,
+        on_result=lambda name, metrics, error: job.step_done(name, metrics, str(error) if error else None),
+        memory_mode=memory_mode,
+        user_id=user_id
+    )
+    
+    # Save results and the audit entry in one transaction. Every submission
+    # is recorded, cache hits included: history and /api/stats count
+    # analyses requested (as before results were memoized)
+    cached = bool(results) and all(r.get('cached') for r in results)
+    with app.app_context():
+        save_analysis_results(results, user_id, audit={
+            'action': 'ANALYSIS',
+            'details': f'Analyzed {len(results)} algorithms' + (' (cached results)' if cached else ''),
+            'user_id': user_id,
+            'ip_address': ip_address
+        })
+    
+    job.finish(best_algorithm=analyzer.get_best_algorithm(results))
+
+@app.route('/analyze/jobs/<job_id>')
+@login_required
+def analysis_job_status(job_id):
+    """Progress and partial results of a background analysis"""
+    job = job_queue.get(job_id, user_id=current_user.id)
+    if job is None:
+        return jsonify({'error': 'Tahlil topilmadi!'}), 404
+    
+    status = job.to_dict()
+    
+    # Store results in session for report generation
+    if job.status == Job.DONE:
+        session['last_analysis'] = status['results']
+    
+    return jsonify(status)
+
+def _sse(event, data):
+    """Format one Server-Sent Events message"""
+    return f"event: {event}\ndata: {json.dumps(data)}\n\n"
+
+@app.route('/analyze/jobs/<job_id>/events')
+@login_required
+def analysis_job_events(job_id):
+    """Server-Sent Events stream: each algorithm's metrics as soon as it finishes"""
+    job = job_queue.get(job_id, user_id=current_user.id)
+    if job is None:
+        return jsonify({'error': 'Tahlil topilmadi!'}), 404
+    
+    def generate():
+        seen = 0
+        results = []
+        while True:
+            updates, finished = job.wait_for_updates(seen, timeout=Config.SSE_KEEPALIVE_SECONDS)
+            seen += len(updates)
+            
+            for name, metrics, error in updates:
+                if error:
+                    yield _sse('algorithm_error', {'algorithm': name, 'error': error})
+                    continue
+                results.append(metrics)
+                yield _sse('result', {
+                    'result': metrics,
+                    'ranking': analyzer.rank_algorithms(results),
+                    'completed': seen,
+                    'total': len(job.steps)
+                })
+            
+            if finished:
+                status = job.to_dict()
+                yield _sse('done', {
+                    'status': status['status'],
+                    'error': status['error'],
+                    'best_algorithm': status.get('best_algorithm')
+                })
+                return
+            
+            if not updates:
+                # Comment line keeps proxies from closing an idle stream
+                yield ': keepalive\n\n'
+    
+    response = Response(generate(), mimetype='text/event-stream')
+    response.headers['Cache-Control'] = 'no-cache'
+    response.headers['X-Accel-Buffering'] = 'no'
+    return response
 
 @app.route('/encrypt', methods=['POST'])
 @login_required
@@ -270,14 +347,12 @@ def encrypt_data():
         db.session.commit()
         
         # Log audit
-        audit = AuditLog(
-            user_id=current_user.id,
-            action='ENCRYPT',
+        audit_pipeline.log(
+            'ENCRYPT',
             details=f'Encrypted data with {algorithm}',
+            user_id=current_user.id,
             ip_address=request.remote_addr
         )
-        db.session.add(audit)
-        db.session.commit()
         
         return jsonify({
             'success': True,
@@ -289,6 +364,53 @@ def encrypt_data():
     except Exception as e:
         return jsonify({'error': str(e)}), 500
 
+@app.route('/encrypt/batch', methods=['POST'])
+@login_required
+def encrypt_batch():
+    """
+    Encrypt many short messages under one new key, each with its own IV/nonce
+    JSON body: {"algorithm": "...", "messages": ["...", ...]}
+    """
+    try:
+        payload = request.get_json(silent=True) or {}
+        algorithm = payload.get('algorithm')
+        messages = payload.get('messages')
+        
+        if not algorithm or not isinstance(messages, list) or not messages:
+            return jsonify({'error': 'Algoritm yoki xabarlar kiritilmagan!'}), 400
+        if algorithm not in analyzer.ALGORITHMS:
+            return jsonify({'error': 'Noto\'g\'ri algoritm!'}), 400
+        if len(messages) > Config.BATCH_MAX_MESSAGES:
+            return jsonify({'error': f'Xabarlar soni {Config.BATCH_MAX_MESSAGES} tadan oshmasligi kerak!'}), 400
+        if not all(isinstance(message, str) for message in messages):
+            return jsonify({'error': 'Har bir xabar matn bo\'lishi kerak!'}), 400
+        
+        # One key (one vault append) for the whole batch
+        key_id = key_manager.create_key(algorithm, current_user.username)
+        key, iv_or_nonce, _ = key_manager.get_key(key_id)
+        
+        batch = analyzer.encrypt_many(algorithm, messages, key, iv_or_nonce)
+        
+        # Single bulk insert plus the audit entry, one commit
+        encrypted_ids = save_encrypted_batch(batch['ciphertexts'], current_user.id, algorithm, key_id, audit={
+            'action': 'ENCRYPT_BATCH',
+            'details': f'Encrypted {batch["count"]} messages with {algorithm}',
+            'user_id': current_user.id,
+            'ip_address': request.remote_addr
+        })
+        
+        return jsonify({
+            'success': True,
+            'key_id': key_id,
+            'count': batch['count'],
+            'encrypted_ids': encrypted_ids,
+            'total_time_ms': batch['total_time_ms'],
+            'messages_per_second': batch['messages_per_second']
+        })
+    
+    except Exception as e:
+        return jsonify({'error': str(e)}), 500
+
 @app.route('/decrypt/<int:encrypted_id>', methods=['POST'])
 @login_required
 def decrypt_data(encrypted_id):
@@ -303,18 +425,21 @@ def decrypt_data(encrypted_id):
         # Get key
         key, iv_or_nonce, algorithm = key_manager.get_key(encrypted_data.key_id)
         
-        # Decrypt
-        plaintext = encrypted_data.get_decrypted_content()
+        # Decrypt (batch rows hold real ciphertext under the stored key)
+        if encrypted_data.content_type == 'batch':
+            algo = analyzer.create_algorithm(algorithm)
+            algo.set_key(key, iv_or_nonce)
+            plaintext = algo.decrypt_many([base64.b64decode(encrypted_data.encrypted_content)])[0][0]
+        else:
+            plaintext = encrypted_data.get_decrypted_content()
         
         # Log audit
-        audit = AuditLog(
-            user_id=current_user.id,
-            action='DECRYPT',
+        audit_pipeline.log(
+            'DECRYPT',
             details=f'Decrypted data with {algorithm}',
+            user_id=current_user.id,
             ip_address=request.remote_addr
         )
-        db.session.add(audit)
-        db.session.commit()
         
         return jsonify({
             'success': True,
@@ -350,14 +475,12 @@ def delete_encrypted(encrypted_id):
         db.session.commit()
         
         # Log audit
-        audit = AuditLog(
-            user_id=current_user.id,
-            action='DELETE_ENCRYPTED',
+        audit_pipeline.log(
+            'DELETE_ENCRYPTED',
             details=f'Deleted encrypted data ID: {encrypted_id}',
+            user_id=current_user.id,
             ip_address=request.remote_addr
         )
-        db.session.add(audit)
-        db.session.commit()
         
         return jsonify({'success': True})
     
@@ -372,9 +495,11 @@ def report():
     results = session.get('last_analysis')
     
     if not results:
-        # Get latest analysis from database
-        latest_results = AnalysisResult.query.filter_by(user_id=current_user.id)\
-            .order_by(AnalysisResult.created_at.desc()).limit(4).all()
+        # Get latest analysis from database (one save shares a created_at)
+        latest_at = db.session.query(db.func.max(AnalysisResult.created_at))\
+            .filter(AnalysisResult.user_id == current_user.id).scalar()
+        latest_results = AnalysisResult.query.filter_by(user_id=current_user.id, created_at=latest_at)\
+            .order_by(AnalysisResult.id).all() if latest_at else []
         
         if latest_results:
             results = [
@@ -413,24 +538,30 @@ def export_pdf():
             flash('Tahlil natijalari topilmadi!', 'error')
             return redirect(url_for('report'))
         
-        # Generate PDF
         timestamp = datetime.now().strftime('%Y%m%d_%H%M%S')
         filename = f'encryption_report_{timestamp}.pdf'
-        output_path = os.path.join(Config.UPLOAD_FOLDER, filename)
         
-        report_generator.generate_pdf_report(results, output_path)
+        # Reuse the rendered PDF while the results are unchanged; its printed
+        # date is when it was first generated (the filename uses the download time)
+        cache_key = ReportCache.make_key(results, report_generator.cache_version)
+        cached_path = report_cache.get(cache_key)
+        if cached_path:
+            with open(cached_path, 'rb') as f:
+                pdf = BytesIO(f.read())
+        else:
+            # Render in memory and serve from the buffer, caching a copy
+            pdf = report_generator.generate_pdf_report(results)
+            report_cache.put(cache_key, pdf.getvalue())
         
         # Log audit
-        audit = AuditLog(
-            user_id=current_user.id,
-            action='EXPORT_PDF',
+        audit_pipeline.log(
+            'EXPORT_PDF',
             details=f'Exported report as PDF',
+            user_id=current_user.id,
             ip_address=request.remote_addr
         )
-        db.session.add(audit)
-        db.session.commit()
         
-        return send_file(output_path, as_attachment=True, download_name=filename)
+        return send_file(pdf, mimetype='application/pdf', as_attachment=True, download_name=filename)
     
     except Exception as e:
         flash(f'Xatolik: {str(e)}', 'error')
@@ -439,13 +570,26 @@ def export_pdf():
 @app.route('/history')
 @login_required
 def history():
-    """Analysis history page"""
-    page = request.args.get('page', 1, type=int)
+    """Analysis history page (keyset pagination; ?page=N keeps the old offset mode)"""
     per_page = 20
+    query = AnalysisResult.query.filter_by(user_id=current_user.id)
     
-    pagination = AnalysisResult.query.filter_by(user_id=current_user.id)\
-        .order_by(AnalysisResult.created_at.desc())\
-        .paginate(page=page, per_page=per_page, error_out=False)
+    page = request.args.get('page', type=int)
+    if page:
+        pagination = query.order_by(AnalysisResult.created_at.desc())\
+            .paginate(page=page, per_page=per_page, error_out=False)
+        return render_template('history.html', pagination=pagination)
+    
+    try:
+        pagination = keyset_page(
+            query,
+            AnalysisResult.created_at,
+            AnalysisResult.id,
+            cursor=request.args.get('cursor'),
+            per_page=per_page
+        )
+    except ValueError:
+        return redirect(url_for('history'))
     
     return render_template('history.html', pagination=pagination)
 
@@ -453,26 +597,144 @@ def history():
 @login_required
 def api_stats():
     """API endpoint for statistics"""
-    # Algorithm usage statistics
-    algorithm_stats = db.session.query(
-        AnalysisResult.algorithm,
-        db.func.count(AnalysisResult.id).label('count'),
-        db.func.avg(AnalysisResult.s_overall_score).label('avg_score')
-    ).filter_by(user_id=current_user.id)\
-     .group_by(AnalysisResult.algorithm).all()
-    
+    # Algorithm usage statistics (pre-aggregated, O(#algorithms))
     stats = {
-        'algorithms': [
+        'algorithms': analysis_stats(current_user.id)
+    }
+    
+    return jsonify(stats)
+
+@app.route('/api/keys')
+@login_required
+def api_keys():
+    """The current user's keys (metadata only), one cursor page at a time"""
+    limit = max(1, min(request.args.get('limit', 50, type=int), 200))
+    try:
+        page = key_manager.list_keys_page(
+            user=current_user.username,
+            algorithm=request.args.get('algorithm') or None,
+            cursor=request.args.get('cursor') or None,
+            limit=limit,
+            newest_first=request.args.get('order', 'desc') != 'asc'
+        )
+    except ValueError:
+        return jsonify({'error': 'Noto\'g\'ri kursor!'}), 400
+    
+    return jsonify(page)
+
+@app.route('/benchmark', methods=['GET', 'POST'])
+@login_required
+def benchmark_sweep():
+    """Throughput-vs-size sweep (POST runs one, GET lists stored rows)"""
+    if request.method == 'POST':
+        try:
+            algorithms = request.form.getlist('algorithms') or analyzer.ALGORITHMS
+            min_size = benchmark.parse_size(request.form.get('min_size', str(Config.BENCHMARK_SWEEP_MIN_SIZE)))
+            max_size = benchmark.parse_size(request.form.get('max_size', str(Config.BENCHMARK_WEB_MAX_SIZE)))
+            repetitions = request.form.get('repetitions', Config.BENCHMARK_SWEEP_REPETITIONS, type=int)
+        except ValueError:
+            return jsonify({'error': 'Noto\'g\'ri o\'lcham!'}), 400
+        
+        unknown = [name for name in algorithms if name not in registry.names(ANALYZE)]
+        if unknown:
+            return jsonify({'error': f'Noma\'lum algoritm: {", ".join(unknown)}'}), 400
+        
+        # Keep web-triggered sweeps bounded
+        max_size = min(max_size, Config.BENCHMARK_WEB_MAX_SIZE)
+        repetitions = max(1, min(repetitions, Config.BENCHMARK_WEB_MAX_REPETITIONS))
+        if not 1 <= min_size <= max_size:
+            return jsonify({'error': f'O\'lcham 1 va {max_size} bayt oralig\'ida bo\'lishi kerak!'}), 400
+        
+        # Run the sweep on a background worker; the browser polls the job
+        sizes = benchmark.sweep_sizes(min_size, max_size)
+        job = benchmark_queue.submit(
+            _run_benchmark_job,
+            current_user.id,
+            [str(size) for size in sizes],
+            algorithms,
+            min_size,
+            max_size,
+            repetitions,
+            current_user.id,
+            request.remote_addr
+        )
+        
+        return jsonify({
+            'success': True,
+            'job_id': job.id,
+            'status_url': url_for('benchmark_job_status', job_id=job.id)
+        }), 202
+    
+    # The user's stored sweeps, optionally filtered by run, host or release
+    query = BenchmarkResult.query.filter_by(user_id=current_user.id)
+    for field in ('run_id', 'host', 'release'):
+        value = request.args.get(field)
+        if value:
+            query = query.filter(getattr(BenchmarkResult, field) == value)
+    
+    rows = query.order_by(BenchmarkResult.created_at.desc(), BenchmarkResult.id)\
+        .limit(request.args.get('limit', 500, type=int)).all()
+    
+    return jsonify({
+        'results': [
             {
-                'name': stat.algorithm,
-                'count': stat.count,
-                'avg_score': round(stat.avg_score, 4) if stat.avg_score else 0
+                'run_id': r.run_id,
+                'algorithm': r.algorithm,
+                'plaintext_size': r.plaintext_size,
+                'encryption_time_ms': r.encryption_time_ms,
+                'decryption_time_ms': r.decryption_time_ms,
+                'encryption_mb_s': r.encryption_mb_s,
+                'decryption_mb_s': r.decryption_mb_s,
+                'cycles_per_byte': r.cycles_per_byte,
+                'overhead_us': r.overhead_us,
+                'host': r.host,
+                'release': r.release,
+                'python_version': r.python_version,
+                'created_at': r.created_at.isoformat() if r.created_at else None
             }
-            for stat in algorithm_stats
+            for r in rows
         ]
-    }
+    })
+
+def _run_benchmark_job(job, algorithms, min_size, max_size, repetitions, user_id, ip_address):
+    """Background throughput sweep: one progress step per plaintext size"""
+    current = []
     
-    return jsonify(stats)
+    def progress(name, size):
+        # Sizes run in order; a new size means the previous one is complete
+        if current and current[0] != size:
+            job.step_done(str(current[0]))
+        current[:] = [size]
+    
+    sweep = benchmark.run_sweep(
+        algorithms=algorithms,
+        min_size=min_size,
+        max_size=max_size,
+        repetitions=repetitions,
+        progress=progress
+    )
+    if current:
+        job.step_done(str(current[0]))
+    
+    with app.app_context():
+        benchmark.save_sweep(sweep, Config.APP_VERSION, user_id=user_id, audit={
+            'action': 'BENCHMARK',
+            'details': f'Throughput sweep {sweep["run_id"]} up to {max_size} bytes',
+            'user_id': user_id,
+            'ip_address': ip_address
+        })
+    
+    job.finish(**sweep)
+
+@app.route('/benchmark/jobs/<job_id>')
+@login_required
+def benchmark_job_status(job_id):
+    """Progress of a background sweep; rows and summaries once it is done"""
+    job = benchmark_queue.get(job_id, user_id=current_user.id)
+    if job is None:
+        return jsonify({'error': 'Benchmark topilmadi!'}), 404
+    
+    return jsonify(job.to_dict())
 
 # ==================== In-Memory Encryption Routes ====================
 
@@ -500,22 +762,12 @@ def secure_encrypt():
             # Get original filename
             original_filename = secure_filename(file.filename)
             
-            # Read file into BytesIO
-            file_stream = BytesIO(file.read())
-            
             # Initialize encryptor
             global memory_encryptor
             if memory_encryptor is None:
-                memory_encryptor = MemoryEncryptor(Config.MASTER_KEY)
-            
-            # Encrypt based on algorithm
-            if algorithm == 'AES':
-                encrypted_data_stream, encrypted_key_stream = memory_encryptor.encrypt_file_aes(file_stream)
-            elif algorithm == 'Fernet':
-                encrypted_data_stream, encrypted_key_stream = memory_encryptor.encrypt_file_fernet(file_stream)
-            elif algorithm == 'ChaCha20':
-                encrypted_data_stream, encrypted_key_stream = memory_encryptor.encrypt_file_chacha20(file_stream)
-            else:
+                memory_encryptor = ParallelMemoryEncryptor(Config.MASTER_KEY, workers=Config.CONTAINER_WORKERS)
+            
+            if algorithm not in SECURE_ALGORITHMS:
                 return jsonify({'error': 'Noto\'g\'ri algoritm!'}), 400
             
             # Create user-specific temp folder
@@ -537,11 +789,18 @@ def secure_encrypt():
             enc_path = os.path.join(session_folder, enc_filename)
             key_path = os.path.join(session_folder, key_filename)
             
-            with open(enc_path, 'wb') as f:
-                f.write(encrypted_data_stream.getvalue())
-            
-            with open(key_path, 'wb') as f:
-                f.write(encrypted_key_stream.getvalue())
+            # Encrypt straight from the upload stream into the temp file
+            try:
+                with open(enc_path, 'wb') as f:
+                    wrapped_key = memory_encryptor.encrypt_stream(
+                        file.stream, f, algorithm, Config.CONTAINER_SEGMENT_SIZE
+                    )
+                
+                with open(key_path, 'wb') as f:
+                    f.write(wrapped_key)
+            except Exception:
+                _remove_temp_folder(session_folder)
+                raise
             
             # Store session info
             session['encryption_session_id'] = session_id
@@ -549,14 +808,12 @@ def secure_encrypt():
             session['encryption_algorithm'] = algorithm
             
             # Log audit
-            audit = AuditLog(
-                user_id=current_user.id,
-                action='SECURE_ENCRYPT',
+            audit_pipeline.log(
+                'SECURE_ENCRYPT',
                 details=f'Encrypted file {original_filename} with {algorithm} (in-memory)',
+                user_id=current_user.id,
                 ip_address=request.remote_addr
             )
-            db.session.add(audit)
-            db.session.commit()
             
             return jsonify({
                 'success': True,
@@ -570,6 +827,14 @@ def secure_encrypt():
     
     return render_template('secure_encrypt.html')
 
+def _remove_temp_folder(folder):
+    """Delete a temporary session folder"""
+    import shutil
+    try:
+        shutil.rmtree(folder)
+    except Exception as del_error:
+        print(f"[ERROR] Failed to delete folder: {del_error}")
+
 @app.route('/download-encrypted-data')
 @login_required
 def download_encrypted_data():
@@ -591,33 +856,29 @@ def download_encrypted_data():
             flash('Fayl topilmadi!', 'error')
             return redirect(url_for('secure_encrypt'))
         
-        # Read file to memory
-        with open(enc_path, 'rb') as f:
-            file_data = f.read()
-        
         # Mark that data file was downloaded
         session['enc_downloaded'] = True
         
-        # Check if both files downloaded, then delete folder
-        if session.get('key_downloaded'):
-            import shutil
-            try:
-                shutil.rmtree(session_folder)
-                # Clear session
-                session.pop('encryption_session_id', None)
-                session.pop('original_filename', None)
-                session.pop('enc_downloaded', None)
-                session.pop('key_downloaded', None)
-            except Exception as del_error:
-                print(f"[ERROR] Failed to delete folder: {del_error}")
-        
-        # Send file from memory
-        return send_file(
-            BytesIO(file_data),
+        # Stream the file in chunks instead of reading it into memory
+        response = send_file(
+            open(enc_path, 'rb'),
             as_attachment=True,
             download_name=f"{original_filename}.enc",
             mimetype='application/octet-stream'
         )
+        
+        # Check if both files downloaded, then delete folder once sent
+        if session.get('key_downloaded'):
+            # Iterate through Werkzeug so close callbacks run after sending
+            response.direct_passthrough = False
+            response.call_on_close(lambda: _remove_temp_folder(session_folder))
+            # Clear session
+            session.pop('encryption_session_id', None)
+            session.pop('original_filename', None)
+            session.pop('enc_downloaded', None)
+            session.pop('key_downloaded', None)
+        
+        return response
     
     except Exception as e:
         flash(f'Xatolik: {str(e)}', 'error')
@@ -653,16 +914,12 @@ def download_encrypted_key():
         
         # Check if both files downloaded, then delete folder
         if session.get('enc_downloaded'):
-            import shutil
-            try:
-                shutil.rmtree(session_folder)
-                # Clear session
-                session.pop('encryption_session_id', None)
-                session.pop('original_filename', None)
-                session.pop('enc_downloaded', None)
-                session.pop('key_downloaded', None)
-            except Exception as del_error:
-                print(f"[ERROR] Failed to delete folder: {del_error}")
+            _remove_temp_folder(session_folder)
+            # Clear session
+            session.pop('encryption_session_id', None)
+            session.pop('original_filename', None)
+            session.pop('enc_downloaded', None)
+            session.pop('key_downloaded', None)
         
         # Send file from memory
         return send_file(
@@ -705,23 +962,15 @@ def secure_decrypt():
             if key_file.filename == '':
                 return jsonify({'error': 'Kalit fayli tanlanmagan!'}), 400
             
-            # Read files into BytesIO
-            encrypted_data_stream = BytesIO(encrypted_file.read())
-            encrypted_key_stream = BytesIO(key_file.read())
+            # The wrapped key is small, the data is streamed
+            wrapped_key = key_file.read()
             
             # Initialize encryptor
             global memory_encryptor
             if memory_encryptor is None:
-                memory_encryptor = MemoryEncryptor(Config.MASTER_KEY)
-            
-            # Decrypt based on algorithm
-            if algorithm == 'AES':
-                decrypted_stream = memory_encryptor.decrypt_file_aes(encrypted_data_stream, encrypted_key_stream)
-            elif algorithm == 'Fernet':
-                decrypted_stream = memory_encryptor.decrypt_file_fernet(encrypted_data_stream, encrypted_key_stream)
-            elif algorithm == 'ChaCha20':
-                decrypted_stream = memory_encryptor.decrypt_file_chacha20(encrypted_data_stream, encrypted_key_stream)
-            else:
+                memory_encryptor = ParallelMemoryEncryptor(Config.MASTER_KEY, workers=Config.CONTAINER_WORKERS)
+            
+            if algorithm not in SECURE_ALGORITHMS:
                 return jsonify({'error': 'Noto\'g\'ri algoritm!'}), 400
             
             # Get original filename (remove .enc extension)
@@ -741,24 +990,32 @@ def secure_decrypt():
             decrypt_folder = os.path.join(user_temp_folder, decrypt_session_id)
             os.makedirs(decrypt_folder, exist_ok=True)
             
-            # Save decrypted file to temp folder
+            # Decrypt straight from the upload stream into the temp file
             decrypted_path = os.path.join(decrypt_folder, original_filename)
-            with open(decrypted_path, 'wb') as f:
-                f.write(decrypted_stream.getvalue())
+            try:
+                with open(decrypted_path, 'wb') as f:
+                    # Segmented containers are detected from their header
+                    memory_encryptor.decrypt_stream(encrypted_file.stream, f, wrapped_key, algorithm)
+            except ContainerError as e:
+                # Wrong key file, tampered or truncated container
+                _remove_temp_folder(decrypt_folder)
+                return jsonify({'error': f'Xatolik: {str(e)}'}), 400
+            except Exception:
+                # Do not leave partial plaintext behind
+                _remove_temp_folder(decrypt_folder)
+                raise
             
             # Store session info
             session['decryption_session_id'] = decrypt_session_id
             session['decrypted_filename'] = original_filename
             
             # Log audit
-            audit = AuditLog(
-                user_id=current_user.id,
-                action='SECURE_DECRYPT',
+            audit_pipeline.log(
+                'SECURE_DECRYPT',
                 details=f'Decrypted file with {algorithm} (in-memory)',
+                user_id=current_user.id,
                 ip_address=request.remote_addr
             )
-            db.session.add(audit)
-            db.session.commit()
             
             return jsonify({
                 'success': True,
@@ -792,27 +1049,22 @@ def download_decrypted():
             flash('Fayl topilmadi!', 'error')
             return redirect(url_for('secure_decrypt'))
         
-        # Read file to memory
-        with open(decrypted_path, 'rb') as f:
-            file_data = f.read()
-        
-        # Delete folder immediately
-        import shutil
-        try:
-            shutil.rmtree(decrypt_folder)
-            # Clear session
-            session.pop('decryption_session_id', None)
-            session.pop('decrypted_filename', None)
-        except Exception as del_error:
-            print(f"[ERROR] Failed to delete folder: {del_error}")
-        
-        # Send file from memory
-        return send_file(
-            BytesIO(file_data),
+        # Stream the file, then delete the folder once it has been sent
+        response = send_file(
+            open(decrypted_path, 'rb'),
             as_attachment=True,
             download_name=filename,
             mimetype='application/octet-stream'
         )
+        # Iterate through Werkzeug so close callbacks run after sending
+        response.direct_passthrough = False
+        response.call_on_close(lambda: _remove_temp_folder(decrypt_folder))
+        
+        # Clear session
+        session.pop('decryption_session_id', None)
+        session.pop('decrypted_filename', None)
+        
+        return response
     
     except Exception as e:
         flash(f'Xatolik: {str(e)}', 'error')
@@ -867,6 +1119,8 @@ def server_error(e):
 
 with app.app_context():
     db.create_all()
+    ensure_indexes()
+    ensure_analysis_stats()
     
     # Create default admin user if not exists
     admin = User.query.filter_by(username='admin').first()
@@ -6,6 +6,9 @@ from dotenv import load_dotenv
 load_dotenv()
 
 class Config:
+    # Application release (recorded with benchmark sweeps)
+    APP_VERSION = os.environ.get('APP_VERSION', '2.1.0')
+    
     # Flask configuration
     SECRET_KEY = os.environ.get('SECRET_KEY') or 'dev-secret-key-change-in-production'
     
@@ -23,17 +26,77 @@ class Config:
     MAX_CONTENT_LENGTH = 16 * 1024 * 1024  # 16MB max file size
     UPLOAD_FOLDER = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'uploads')
     
+    # Rendered PDF reports, reused while the analysis results are unchanged
+    REPORT_CACHE_FOLDER = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'cache', 'reports')
+    REPORT_CACHE_MAX_BYTES = 100 * 1024 * 1024
+    
     # Temporary encrypted files folder
     TEMP_ENCRYPTED_FOLDER = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'temp_encrypted')
     
+    # Plaintext bytes per authenticated segment in the .enc container format
+    CONTAINER_SEGMENT_SIZE = 1024 * 1024
+    CONTAINER_WORKERS = None  # Threads for parallel segment encryption (None = CPU count)
+    
+    # Batch encryption (/encrypt/batch)
+    BATCH_MAX_MESSAGES = 50000
+    
     # Key vault configuration
     KEY_VAULT_PATH = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'database', 'key_vault.enc')
     
     # Audit log configuration
     AUDIT_LOG_PATH = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'logs', 'audit.log')
     
+    # Audit table writes (queued and flushed in batches by a background thread)
+    AUDIT_ASYNC = os.environ.get('AUDIT_ASYNC', 'true').lower() == 'true'
+    AUDIT_BATCH_SIZE = 100
+    AUDIT_FLUSH_INTERVAL = 1.0   # Seconds
+    AUDIT_QUEUE_SIZE = 10000     # log() blocks when this many records are pending
+    AUDIT_PUT_TIMEOUT = 5.0      # Then falls back to a synchronous write
+    AUDIT_WRITE_RETRIES = 3      # Retries of a failed batch before it goes to AUDIT_LOG_PATH
+    AUDIT_RETRY_DELAY = 0.5      # Seconds, multiplied by the attempt number
+    
     # Analysis weights
     WEIGHT_PERFORMANCE = 0.25
     WEIGHT_SECURITY = 0.35
     WEIGHT_KEY_MANAGEMENT = 0.25
     WEIGHT_INTEGRITY = 0.15
+    
+    # Analysis execution (parallel mode fans algorithms out to a process pool)
+    ANALYSIS_PARALLEL = os.environ.get('ANALYSIS_PARALLEL', 'false').lower() == 'true'
+    ANALYSIS_WORKERS = None  # None = one worker per available CPU
+    ANALYSIS_PIN_CPUS = True
+    
+    # Measurement sandbox (one pre-forked worker per algorithm, GC off while measuring)
+    ANALYSIS_SANDBOX = os.environ.get('ANALYSIS_SANDBOX', 'false').lower() == 'true'
+    ANALYSIS_SANDBOX_CPUS = None     # e.g. [2, 3] to pin workers round-robin; None = no pinning
+    ANALYSIS_SANDBOX_TIMEOUT = 300   # Seconds per sandboxed analysis
+    
+    # Background analysis jobs (/analyze enqueues, the browser polls for progress)
+    ANALYSIS_JOB_WORKERS = 1     # Concurrent analyses would skew each other's timings
+    ANALYSIS_JOB_TTL = 3600      # Seconds a finished job stays queryable
+    SSE_KEEPALIVE_SECONDS = 15   # Idle interval before a keepalive comment on event streams
+    
+    # Memoized analysis results for identical plaintext, algorithms and weights
+    RESULT_CACHE_ENABLED = os.environ.get('RESULT_CACHE_ENABLED', 'true').lower() == 'true'
+    RESULT_CACHE_MAX_ENTRIES = 128
+    RESULT_CACHE_TTL = 24 * 3600                              # Seconds
+    RESULT_CACHE_DB_PATH = os.environ.get('RESULT_CACHE_DB_PATH')  # SQLite file for a persistent tier (optional)
+    
+    # Memory instrumentation: 'off', 'tracemalloc' (sampled) or 'rss' (USS growth in a forked process)
+    MEMORY_PROFILE_MODE = os.environ.get('MEMORY_PROFILE_MODE', 'tracemalloc').lower()
+    MEMORY_SAMPLE_EVERY = 10     # Trace the first and every 10th call per operation
+    
+    # Benchmark mode (warmup + repeated timings until the relative standard error is low enough)
+    BENCHMARK_MODE = os.environ.get('BENCHMARK_MODE', 'false').lower() == 'true'
+    BENCHMARK_WARMUP = 3             # Untimed runs, which also take the memory samples (at least 1)
+    BENCHMARK_REPETITIONS = 10       # Minimum timed repetitions
+    BENCHMARK_MAX_REPETITIONS = 200
+    BENCHMARK_TARGET_RSE = 0.02      # Stop once SEM / mean <= 2%
+    
+    # Throughput sweep benchmark
+    BENCHMARK_SWEEP_MIN_SIZE = 16
+    BENCHMARK_SWEEP_MAX_SIZE = 256 * 1024 * 1024   # CLI default
+    BENCHMARK_WEB_MAX_SIZE = 1024 * 1024           # Cap for the /benchmark route
+    BENCHMARK_WEB_MAX_REPETITIONS = 3
+    BENCHMARK_SWEEP_REPETITIONS = 3
+    BENCHMARK_JOB_WORKERS = 1    # Web sweeps run on their own queue, never ahead of /analyze jobs
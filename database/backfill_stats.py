@@ -0,0 +1,40 @@
+import sys
+import os
+import argparse
+
+# Set UTF-8 encoding for console output
+if sys.platform == 'win32':
+    import codecs
+    sys.stdout = codecs.getwriter('utf-8')(sys.stdout.buffer, 'strict')
+    sys.stderr = codecs.getwriter('utf-8')(sys.stderr.buffer, 'strict')
+
+# Add parent directory to path for imports
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from database.models import db
+from database.persistence import rebuild_analysis_stats
+from flask import Flask
+from config import Config
+
+def backfill_stats(user_id=None):
+    """Rebuild the analysis_stats rollup table from existing analysis results"""
+    app = Flask(__name__)
+    app.config.from_object(Config)
+
+    db.init_app(app)
+
+    with app.app_context():
+        # Make sure the rollup table exists on databases created before it
+        db.create_all()
+
+        count = rebuild_analysis_stats(user_id)
+
+        scope = f"user {user_id}" if user_id is not None else "all users"
+        print(f"[OK] Rebuilt {count} rollup rows for {scope}")
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description='Backfill the analysis_stats rollup table')
+    parser.add_argument('--user-id', type=int, default=None, help='Only rebuild one user (default: all)')
+    args = parser.parse_args()
+
+    backfill_stats(args.user_id)
@@ -10,6 +10,7 @@ if sys.platform == 'win32':
 # Add parent directory to path for imports
 sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
 
+from database.migrations import ensure_indexes, ensure_analysis_stats
 from database.models import db, User, AnalysisResult, EncryptedData, AuditLog
 from flask import Flask
 from config import Config
@@ -25,6 +26,12 @@ def init_db():
         # Create all tables
         db.create_all()
         
+        # Add indexes introduced after the tables were created
+        ensure_indexes()
+        
+        # Fill the stats rollup from results saved before it existed
+        ensure_analysis_stats()
+        
         # Create default admin user if not exists
         admin = User.query.filter_by(username='admin').first()
         if not admin:
@@ -0,0 +1,35 @@
+"""
+Schema Migrations
+db.create_all() only creates missing tables, so indexes added to existing
+tables are created here, and rollup tables added later are backfilled
+"""
+
+from database.models import db, AnalysisResult, AnalysisStat
+from database.persistence import rebuild_analysis_stats
+
+
+def ensure_indexes():
+    """
+    Create every index declared on the models that is missing in the
+    database (requires app context)
+    Returns: names of the indexes checked
+    """
+    names = []
+    for table in db.metadata.sorted_tables:
+        for index in table.indexes:
+            index.create(bind=db.engine, checkfirst=True)
+            names.append(index.name)
+    return names
+
+
+def ensure_analysis_stats():
+    """
+    Backfill the analysis_stats rollup on databases that have analysis
+    results from before the table existed (requires app context)
+    Returns: number of rollup rows written (0 when nothing was needed)
+    """
+    if db.session.query(AnalysisStat.id).first() is not None:
+        return 0
+    if db.session.query(AnalysisResult.id).first() is None:
+        return 0
+    return rebuild_analysis_stats()
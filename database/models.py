@@ -60,6 +60,10 @@ class User(UserMixin, db.Model):
 
 class AnalysisResult(db.Model):
     __tablename__ = 'analysis_results'
+    # Per-user listings ordered by time (history keyset pagination uses id as tie-breaker)
+    __table_args__ = (
+        db.Index('ix_analysis_results_user_created', 'user_id', 'created_at', 'id'),
+    )
     
     id = db.Column(db.Integer, primary_key=True)
     user_id = db.Column(db.Integer, db.ForeignKey('users.id'), nullable=False)
@@ -96,8 +100,85 @@ class AnalysisResult(db.Model):
         return f'<AnalysisResult {self.algorithm} - Score: {self.s_overall_score}>'
 
 
+class AnalysisStat(db.Model):
+    """Running per-user, per-algorithm aggregates of one AnalysisResult metric"""
+    __tablename__ = 'analysis_stats'
+    __table_args__ = (
+        db.UniqueConstraint('user_id', 'algorithm', 'metric', name='uq_analysis_stats_user_algorithm_metric'),
+    )
+    
+    # AnalysisResult columns rolled up into this table
+    METRICS = (
+        'encryption_time_ms', 'decryption_time_ms', 'total_time_ms',
+        'avg_cpu_percent', 'avg_memory_mb', 'entropy', 's_overall_score'
+    )
+    
+    id = db.Column(db.Integer, primary_key=True)
+    user_id = db.Column(db.Integer, db.ForeignKey('users.id'), nullable=False)
+    algorithm = db.Column(db.String(50), nullable=False)
+    metric = db.Column(db.String(50), nullable=False)
+    
+    # Aggregates over non-null values (mean and stddev are derived)
+    count = db.Column(db.Integer, nullable=False, default=0)
+    total = db.Column(db.Float, nullable=False, default=0.0)
+    total_sq = db.Column(db.Float, nullable=False, default=0.0)
+    min_value = db.Column(db.Float)
+    max_value = db.Column(db.Float)
+    
+    updated_at = db.Column(db.DateTime, default=datetime.utcnow, onupdate=datetime.utcnow)
+    
+    @property
+    def mean(self):
+        return self.total / self.count if self.count else None
+    
+    @property
+    def stddev(self):
+        """Sample standard deviation"""
+        if self.count < 2:
+            return 0.0 if self.count else None
+        variance = (self.total_sq - self.total * self.total / self.count) / (self.count - 1)
+        return max(0.0, variance) ** 0.5
+    
+    def __repr__(self):
+        return f'<AnalysisStat {self.algorithm}.{self.metric} n={self.count}>'
+
+
+class BenchmarkResult(db.Model):
+    __tablename__ = 'benchmark_results'
+    
+    id = db.Column(db.Integer, primary_key=True)
+    run_id = db.Column(db.String(36), nullable=False, index=True)
+    user_id = db.Column(db.Integer, db.ForeignKey('users.id'), nullable=True)
+    algorithm = db.Column(db.String(50), nullable=False)
+    plaintext_size = db.Column(db.BigInteger, nullable=False)
+    
+    # Throughput metrics
+    encryption_time_ms = db.Column(db.Float)
+    decryption_time_ms = db.Column(db.Float)
+    encryption_mb_s = db.Column(db.Float)
+    decryption_mb_s = db.Column(db.Float)
+    cycles_per_byte = db.Column(db.Float)
+    overhead_us = db.Column(db.Float)  # Fixed per-call overhead of the algorithm
+    
+    # Environment (so sweeps can be compared across releases and hosts)
+    host = db.Column(db.String(255))
+    release = db.Column(db.String(50))
+    python_version = db.Column(db.String(20))
+    cpu_mhz = db.Column(db.Float)
+    
+    # Metadata
+    created_at = db.Column(db.DateTime, default=datetime.utcnow)
+    
+    def __repr__(self):
+        return f'<BenchmarkResult {self.algorithm} {self.plaintext_size}B - {self.encryption_mb_s} MB/s>'
+
+
 class EncryptedData(db.Model):
     __tablename__ = 'encrypted_data'
+    # Per-user listings ordered by time
+    __table_args__ = (
+        db.Index('ix_encrypted_data_user_created', 'user_id', 'created_at'),
+    )
     
     id = db.Column(db.Integer, primary_key=True)
     user_id = db.Column(db.Integer, db.ForeignKey('users.id'), nullable=False)
@@ -170,6 +251,10 @@ class EncryptedData(db.Model):
 
 class AuditLog(db.Model):
     __tablename__ = 'audit_logs'
+    # Per-user listings ordered by time
+    __table_args__ = (
+        db.Index('ix_audit_logs_user_timestamp', 'user_id', 'timestamp'),
+    )
     
     id = db.Column(db.Integer, primary_key=True)
     user_id = db.Column(db.Integer, db.ForeignKey('users.id'), nullable=True)
@@ -0,0 +1,68 @@
+"""
+Keyset Pagination
+Cursor-based paging over (timestamp, id) so deep pages cost the same as
+the first one: no OFFSET scan and no COUNT(*)
+"""
+
+from datetime import datetime
+from sqlalchemy import and_, or_
+
+
+class KeysetPage:
+    """
+    One page of results plus the cursor of the next page
+    """
+
+    def __init__(self, items, next_cursor):
+        self.items = items
+        self.next_cursor = next_cursor
+
+    @property
+    def has_next(self):
+        return self.next_cursor is not None
+
+
+def encode_cursor(timestamp, row_id):
+    """Opaque cursor for the last row of a page"""
+    return f"{timestamp.isoformat()}_{row_id}"
+
+
+def decode_cursor(cursor):
+    """Inverse of encode_cursor, raises ValueError on malformed input"""
+    timestamp, sep, row_id = cursor.rpartition('_')
+    if not sep:
+        raise ValueError(f"Invalid cursor: {cursor}")
+    return datetime.fromisoformat(timestamp), int(row_id)
+
+
+def keyset_page(query, time_column, id_column, cursor=None, per_page=20):
+    """
+    Newest-first page of query after cursor
+
+    Args:
+        query: Filtered query (e.g. by user_id) without ordering
+        time_column: Timestamp column, e.g. AnalysisResult.created_at
+        id_column: Primary key column, breaks ties between equal timestamps
+        cursor: Cursor from the previous page, None for the first page
+        per_page: Page size
+
+    Returns:
+        KeysetPage
+    """
+    if cursor:
+        timestamp, row_id = decode_cursor(cursor)
+        query = query.filter(or_(
+            time_column < timestamp,
+            and_(time_column == timestamp, id_column < row_id)
+        ))
+
+    # One extra row tells whether another page exists
+    rows = query.order_by(time_column.desc(), id_column.desc()).limit(per_page + 1).all()
+    items = rows[:per_page]
+
+    next_cursor = None
+    if len(rows) > per_page:
+        last = items[-1]
+        next_cursor = encode_cursor(getattr(last, time_column.key), getattr(last, id_column.key))
+
+    return KeysetPage(items, next_cursor)
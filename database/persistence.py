@@ -0,0 +1,305 @@
+"""
+Result Persistence
+Bulk inserts of analysis, benchmark and batch-encryption rows, each batch
+in one transaction together with its audit entry and the analysis_stats rollups
+"""
+
+import base64
+from datetime import datetime
+from sqlalchemy import insert, select, case
+from database.models import db, AnalysisResult, AnalysisStat, BenchmarkResult, AuditLog, EncryptedData
+
+# AnalysisResult column -> key in an analyzer result dict
+ANALYSIS_FIELDS = {
+    'algorithm': 'algorithm',
+    'encryption_time_ms': 'encryption_time_ms',
+    'decryption_time_ms': 'decryption_time_ms',
+    'total_time_ms': 'total_time_ms',
+    'avg_cpu_percent': 'avg_cpu_percent',
+    'avg_memory_mb': 'avg_memory_mb',
+    'entropy': 'entropy',
+    'key_size': 'key_size',
+    'security_level': 'security_level',
+    't_performance': 'T_performance',
+    'e_security': 'E_security',
+    'k_key_management': 'K_key_management',
+    'i_integrity': 'I_integrity',
+    's_overall_score': 'S_overall_score',
+    'plaintext_size': 'plaintext_size',
+    'ciphertext_size': 'ciphertext_size',
+    'integrity_check': 'integrity_check'
+}
+
+
+def analysis_rows(results, user_id, created_at=None):
+    """Column dicts for AnalysisResult from analyzer result dicts"""
+    created_at = created_at or datetime.utcnow()
+    return [
+        dict(
+            {column: result.get(key) for column, key in ANALYSIS_FIELDS.items()},
+            user_id=user_id,
+            created_at=created_at
+        )
+        for result in results
+    ]
+
+
+def bulk_insert(model, rows, audit=None, rollup=None, returning=None):
+    """
+    Insert rows with one executemany, plus an optional audit entry, then
+    commit once
+
+    Args:
+        model: Mapped class to insert into
+        rows: List of column dicts
+        audit: Optional dict of AuditLog fields (action, details, user_id,
+               ip_address) written in the same transaction
+        rollup: Optional callable(rows) run in the same transaction
+        returning: Optional column whose values are returned in row order
+
+    Returns:
+        int: Number of rows inserted, or the returning values as a list
+    """
+    inserted = []
+    try:
+        if rows:
+            if returning is not None:
+                statement = insert(model).returning(returning, sort_by_parameter_order=True)
+                inserted = db.session.execute(statement, rows).scalars().all()
+            else:
+                db.session.execute(insert(model), rows)
+            if rollup:
+                rollup(rows)
+        if audit:
+            db.session.execute(insert(AuditLog), [dict(audit, timestamp=datetime.utcnow())])
+        db.session.commit()
+    except Exception:
+        db.session.rollback()
+        raise
+    return inserted if returning is not None else len(rows)
+
+
+def save_analysis_results(results, user_id, audit=None):
+    """Persist analyzer results (any number of rows) in one transaction"""
+    return bulk_insert(AnalysisResult, analysis_rows(results, user_id), audit, rollup=update_analysis_stats)
+
+
+def save_benchmark_rows(sweep, release, user_id=None, audit=None):
+    """Persist throughput sweep rows in one transaction"""
+    created_at = datetime.utcnow()
+    rows = [
+        dict(
+            row,
+            run_id=sweep['run_id'],
+            user_id=user_id,
+            host=sweep['host'],
+            release=release,
+            python_version=sweep['python_version'],
+            cpu_mhz=sweep['cpu_mhz'],
+            created_at=created_at
+        )
+        for row in sweep['rows']
+    ]
+    return bulk_insert(BenchmarkResult, rows, audit)
+
+
+def save_encrypted_batch(ciphertexts, user_id, algorithm, key_id, audit=None):
+    """
+    Store batch-encrypted messages as EncryptedData rows (content_type
+    'batch', base64 of IV/nonce || ciphertext) with one executemany
+    Returns: list of new ids, in message order
+    """
+    created_at = datetime.utcnow()
+    rows = [
+        {
+            'user_id': user_id,
+            'algorithm': algorithm,
+            'key_id': key_id,
+            'encrypted_content': base64.b64encode(ciphertext).decode('ascii'),
+            'content_type': 'batch',
+            'created_at': created_at
+        }
+        for ciphertext in ciphertexts
+    ]
+    return bulk_insert(EncryptedData, rows, audit, returning=EncryptedData.id)
+
+
+def _aggregate(rows):
+    """(user_id, algorithm, metric) -> [count, total, total_sq, min, max] over a batch"""
+    aggregates = {}
+    for row in rows:
+        for metric in AnalysisStat.METRICS:
+            value = row.get(metric)
+            if value is None:
+                continue
+            value = float(value)
+            key = (row['user_id'], row['algorithm'], metric)
+            agg = aggregates.get(key)
+            if agg is None:
+                aggregates[key] = [1, value, value * value, value, value]
+            else:
+                agg[0] += 1
+                agg[1] += value
+                agg[2] += value * value
+                agg[3] = min(agg[3], value)
+                agg[4] = max(agg[4], value)
+    return aggregates
+
+
+def _merge_aggregates(table, new):
+    """SET clause adding a batch's aggregates (columns of new) to an analysis_stats row"""
+    return {
+        'count': table.c.count + new['count'],
+        'total': table.c.total + new['total'],
+        'total_sq': table.c.total_sq + new['total_sq'],
+        'min_value': case((table.c.min_value <= new['min_value'], table.c.min_value),
+                          else_=new['min_value']),
+        'max_value': case((table.c.max_value >= new['max_value'], table.c.max_value),
+                          else_=new['max_value']),
+        'updated_at': new['updated_at']
+    }
+
+
+def _upsert(table):
+    """
+    INSERT that adds to the existing rollup row on a (user_id, algorithm,
+    metric) conflict, or None when the session's database has no upsert
+    """
+    dialect = db.session.get_bind().dialect.name
+    if dialect in ('sqlite', 'postgresql'):
+        if dialect == 'sqlite':
+            from sqlalchemy.dialects.sqlite import insert as dialect_insert
+        else:
+            from sqlalchemy.dialects.postgresql import insert as dialect_insert
+        statement = dialect_insert(table)
+        return statement.on_conflict_do_update(
+            index_elements=[table.c.user_id, table.c.algorithm, table.c.metric],
+            set_=_merge_aggregates(table, statement.excluded)
+        )
+    if dialect in ('mysql', 'mariadb'):
+        from sqlalchemy.dialects.mysql import insert as dialect_insert
+        statement = dialect_insert(table)
+        # Each assignment only reads its own column, so MySQL's left-to-right
+        # evaluation of the SET list does not matter
+        return statement.on_duplicate_key_update(_merge_aggregates(table, statement.inserted))
+    return None
+
+
+def _merge_locked(table, values):
+    """
+    Fallback for databases without an upsert: lock each existing rollup
+    row (SELECT ... FOR UPDATE), then UPDATE it or INSERT a new one
+    """
+    new_rows = []
+    for value in values:
+        key = (table.c.user_id == value['user_id']) & (table.c.algorithm == value['algorithm']) & \
+              (table.c.metric == value['metric'])
+        row = db.session.execute(select(table).where(key).with_for_update()).first()
+        if row is None:
+            new_rows.append(value)
+            continue
+        db.session.execute(table.update().where(table.c.id == row.id).values(
+            count=row.count + value['count'],
+            total=row.total + value['total'],
+            total_sq=row.total_sq + value['total_sq'],
+            min_value=min(row.min_value, value['min_value']),
+            max_value=max(row.max_value, value['max_value']),
+            updated_at=value['updated_at']
+        ))
+    if new_rows:
+        db.session.execute(insert(table), new_rows)
+
+
+def update_analysis_stats(rows):
+    """
+    Fold a batch of AnalysisResult rows into analysis_stats (caller commits)
+    One executemany upsert per batch where the database has one (SQLite,
+    PostgreSQL, MySQL), so concurrent saves add to the same rollup row
+    instead of racing to create it; row locks elsewhere
+    """
+    aggregates = _aggregate(rows)
+    if not aggregates:
+        return
+
+    table = AnalysisStat.__table__
+    now = datetime.utcnow()
+    values = [
+        {'user_id': user_id, 'algorithm': algorithm, 'metric': metric,
+         'count': count, 'total': total, 'total_sq': total_sq,
+         'min_value': low, 'max_value': high, 'updated_at': now}
+        for (user_id, algorithm, metric), (count, total, total_sq, low, high) in aggregates.items()
+    ]
+
+    statement = _upsert(table)
+    if statement is None:
+        _merge_locked(table, values)
+    else:
+        db.session.execute(statement, values)
+
+
+def analysis_stats(user_id):
+    """
+    Per-algorithm statistics for a user, read from the rollup table
+    Returns: list of dicts with name, count, avg_score and per-metric
+             count/mean/stddev/min/max
+    """
+    stats = {}
+    for stat in AnalysisStat.query.filter_by(user_id=user_id).order_by(AnalysisStat.algorithm).all():
+        entry = stats.setdefault(stat.algorithm, {'name': stat.algorithm, 'count': 0, 'avg_score': 0, 'metrics': {}})
+        entry['count'] = max(entry['count'], stat.count)
+        entry['metrics'][stat.metric] = {
+            'count': stat.count,
+            'mean': round(stat.mean, 4) if stat.mean is not None else None,
+            'stddev': round(stat.stddev, 4) if stat.stddev is not None else None,
+            'min': stat.min_value,
+            'max': stat.max_value
+        }
+        if stat.metric == 's_overall_score' and stat.mean:
+            entry['avg_score'] = round(stat.mean, 4)
+    return list(stats.values())
+
+
+def rebuild_analysis_stats(user_id=None):
+    """
+    Recompute analysis_stats from analysis_results (backfill)
+    Returns: number of rollup rows written
+    """
+    table = AnalysisStat.__table__
+    results = AnalysisResult.__table__
+
+    try:
+        delete = table.delete()
+        if user_id is not None:
+            delete = delete.where(table.c.user_id == user_id)
+        db.session.execute(delete)
+
+        now = datetime.utcnow()
+        rows = []
+        for metric in AnalysisStat.METRICS:
+            column = results.c[metric]
+            query = select(
+                results.c.user_id,
+                results.c.algorithm,
+                db.func.count(column),
+                db.func.sum(column),
+                db.func.sum(column * column),
+                db.func.min(column),
+                db.func.max(column)
+            ).where(column.isnot(None)).group_by(results.c.user_id, results.c.algorithm)
+            if user_id is not None:
+                query = query.where(results.c.user_id == user_id)
+
+            for uid, algorithm, count, total, total_sq, low, high in db.session.execute(query):
+                rows.append({
+                    'user_id': uid, 'algorithm': algorithm, 'metric': metric,
+                    'count': count, 'total': float(total), 'total_sq': float(total_sq),
+                    'min_value': low, 'max_value': high, 'updated_at': now
+                })
+
+        if rows:
+            db.session.execute(insert(table), rows)
+        db.session.commit()
+    except Exception:
+        db.session.rollback()
+        raise
+    return len(rows)
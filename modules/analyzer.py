@@ -1,34 +1,64 @@
-from modules.encryption.aes import AESEncryption
-from modules.encryption.des import DESEncryption
-from modules.encryption.blowfish import BlowfishEncryption
-from modules.encryption.chacha20 import ChaCha20Encryption
+from modules.encryption.registry import registry, ANALYZE
+from modules.measurement import MEMORY_MODES, MemoryProfile, relative_standard_error, summarize_samples
+from modules.parallel import ISOLATION_SUPPORTED
 
 class EncryptionAnalyzer:
+    # Algorithms compared by compare_algorithms, in result order (registration order)
+    ALGORITHMS = registry.names(ANALYZE)
+    
     def __init__(self, config):
         """
         Initialize analyzer with configuration weights
         """
+        self.config = config
+        self.parallel = config.ANALYSIS_PARALLEL
+        self._pool = None
+        
+        # Benchmark mode settings
+        self.benchmark = config.BENCHMARK_MODE
+        self.warmup = config.BENCHMARK_WARMUP
+        self.repetitions = config.BENCHMARK_REPETITIONS
+        self.max_repetitions = config.BENCHMARK_MAX_REPETITIONS
+        self.target_rse = config.BENCHMARK_TARGET_RSE
+        
+        # Memory instrumentation defaults (see MemoryProfile); 'rss' needs
+        # fresh forked processes and is not offered without fork
+        self.memory_modes = tuple(m for m in MEMORY_MODES if m != 'rss' or ISOLATION_SUPPORTED)
+        self.memory_mode = config.MEMORY_PROFILE_MODE
+        if self.memory_mode not in self.memory_modes:
+            print(f"[ANALYZER] Memory mode {self.memory_mode} is not available here, using tracemalloc")
+            self.memory_mode = 'tracemalloc'
+        self.memory_sample_every = config.MEMORY_SAMPLE_EVERY
+        
         self.w1 = config.WEIGHT_PERFORMANCE
         self.w2 = config.WEIGHT_SECURITY
         self.w3 = config.WEIGHT_KEY_MANAGEMENT
         self.w4 = config.WEIGHT_INTEGRITY
+        
+        # Pre-forked measurement workers (created on first use)
+        self.sandbox = config.ANALYSIS_SANDBOX
+        self._sandbox = None
+        
+        # Result memoization (created on first use, not in pool workers)
+        self.cache_enabled = config.RESULT_CACHE_ENABLED
+        self._cache = None
     
-    def analyze_algorithm(self, algorithm_name, plaintext, key=None, iv_or_nonce=None):
+    def analyze_algorithm(self, algorithm_name, plaintext, key=None, iv_or_nonce=None, benchmark=None,
+                          memory_mode=None):
         """
         Analyze a specific encryption algorithm
+        benchmark: time repeated runs instead of one (default: config.BENCHMARK_MODE)
+        memory_mode: 'off', 'tracemalloc' or 'rss' (default: config.MEMORY_PROFILE_MODE);
+                     'rss' is only meaningful inside parallel.analyze_isolated
         Returns: dictionary with all metrics
         """
+        if benchmark is None:
+            benchmark = self.benchmark
+        if memory_mode is None:
+            memory_mode = self.memory_mode
+        
         # Initialize algorithm
-        if algorithm_name == 'AES':
-            algo = AESEncryption(key_size=256)
-        elif algorithm_name == 'DES':
-            algo = DESEncryption()
-        elif algorithm_name == 'Blowfish':
-            algo = BlowfishEncryption(key_size=128)
-        elif algorithm_name == 'ChaCha20':
-            algo = ChaCha20Encryption()
-        else:
-            raise ValueError(f"Unsupported algorithm: {algorithm_name}")
+        algo = self.create_algorithm(algorithm_name)
         
         # Generate or set key
         if key and iv_or_nonce:
@@ -36,11 +66,26 @@ class EncryptionAnalyzer:
         else:
             key, iv_or_nonce = algo.generate_key()
         
-        # Encrypt
-        ciphertext, enc_time, enc_cpu, enc_mem, entropy = algo.encrypt(plaintext)
+        with MemoryProfile(memory_mode, self.memory_sample_every) as profile:
+            if benchmark:
+                run = self._benchmark(algo, plaintext, profile)
+                ciphertext, decrypted, entropy = run['ciphertext'], run['decrypted'], run['entropy']
+                enc_time, dec_time = run['encryption_time_ms'], run['decryption_time_ms']
+                enc_cpu, dec_cpu = run['encryption_cpu'], run['decryption_cpu']
+                key_setup_ms, context_reused = run['key_setup_ms'], run['context_reused']
+            else:
+                # Encrypt
+                ciphertext, enc_time, enc_cpu, _, entropy = algo.encrypt(plaintext)
+                
+                # Key setup as paid by the encrypt; decrypt always reuses its context
+                key_setup_ms, context_reused = algo.key_setup_ms, algo.context_reused
+                
+                # Decrypt
+                decrypted, dec_time, dec_cpu, _ = algo.decrypt(ciphertext)
         
-        # Decrypt
-        decrypted, dec_time, dec_cpu, dec_mem = algo.decrypt(ciphertext)
+        # Largest sampled peak per operation
+        enc_mem = profile.memory_mb('encrypt')
+        dec_mem = profile.memory_mb('decrypt')
         
         # Verify integrity
         if isinstance(plaintext, str):
@@ -56,16 +101,27 @@ class EncryptionAnalyzer:
             'encryption_time_ms': round(enc_time, 4),
             'decryption_time_ms': round(dec_time, 4),
             'total_time_ms': round(enc_time + dec_time, 4),
+            'key_setup_time_ms': round(key_setup_ms, 4),
+            'context_reused': context_reused,
             'avg_cpu_percent': round((enc_cpu + dec_cpu) / 2, 2),
+            'cpu_time_ms': round((enc_cpu * enc_time + dec_cpu * dec_time) / 100, 4),
             'avg_memory_mb': round((enc_mem + dec_mem) / 2, 4),
+            'memory_mode': memory_mode,
             'entropy': round(entropy, 4),
+            'chi_square': round(algo.byte_stats['chi_square'], 4),
+            'serial_correlation': round(algo.byte_stats['serial_correlation'], 6),
             'integrity_check': integrity_check,
             'key_size': algo.get_algorithm_info()['key_size'],
             'security_level': algo.get_algorithm_info()['security_level'],
+            'authenticated': algo.get_algorithm_info().get('authenticated', False),
             'plaintext_size': len(plaintext_bytes),
             'ciphertext_size': len(ciphertext)
         }
         
+        if benchmark:
+            metrics['repetitions'] = run['time_stats']['n']
+            metrics['time_stats'] = run['time_stats']
+        
         # Calculate normalized scores (0-1 range)
         T = self._calculate_performance_score(metrics)
         E = self._calculate_security_score(metrics)
@@ -83,16 +139,110 @@ class EncryptionAnalyzer:
         
         return metrics, key, iv_or_nonce
     
+    def encrypt_many(self, algorithm_name, messages, key=None, iv_or_nonce=None):
+        """
+        Encrypt a batch of messages under one key context, each with its own
+        random IV/nonce, without the per-message analysis
+        Returns: dictionary with ciphertexts (IV/nonce-prefixed), key,
+                 iv_or_nonce, count, total_time_ms and messages_per_second
+        """
+        algo = self.create_algorithm(algorithm_name)
+        
+        if key and iv_or_nonce:
+            algo.set_key(key, iv_or_nonce)
+        else:
+            key, iv_or_nonce = algo.generate_key()
+        
+        ciphertexts, elapsed_ms = algo.encrypt_many(messages)
+        
+        return {
+            'algorithm': algorithm_name,
+            'ciphertexts': ciphertexts,
+            'key': key,
+            'iv_or_nonce': iv_or_nonce,
+            'count': len(ciphertexts),
+            'total_time_ms': round(elapsed_ms, 4),
+            'key_setup_time_ms': round(algo.key_setup_ms, 4),
+            'messages_per_second': round(len(ciphertexts) / (elapsed_ms / 1000), 1) if elapsed_ms > 0 else None
+        }
+    
+    @staticmethod
+    def create_algorithm(algorithm_name):
+        """
+        Instantiate the cipher wrapper for an algorithm name
+        The wrapper module is imported on first use (see encryption.registry)
+        """
+        return registry.create(algorithm_name)
+    
+    def _benchmark(self, algo, plaintext, profile):
+        """
+        Warm up, then time encrypt/decrypt repeatedly until the relative
+        standard error of the total time reaches the target
+        Memory is only sampled in the untimed warmup runs (at least one),
+        so tracing overhead never reaches the timing samples
+        Returns: dictionary with median timings, the last run's outputs and
+                 the key setup of the first encrypt
+        """
+        setup = None
+        for _ in range(max(1, self.warmup)):
+            ciphertext = algo.encrypt(plaintext)[0]
+            if setup is None:
+                # Key setup as paid by the first encrypt
+                setup = (algo.key_setup_ms, algo.context_reused)
+            algo.decrypt(ciphertext)
+        
+        enc_times, dec_times, total_times = [], [], []
+        cpu_samples = []
+        
+        with profile.suspended():
+            while len(total_times) < self.max_repetitions:
+                ciphertext, enc_time, enc_cpu, _, entropy = algo.encrypt(plaintext)
+                decrypted, dec_time, dec_cpu, _ = algo.decrypt(ciphertext)
+                
+                enc_times.append(enc_time)
+                dec_times.append(dec_time)
+                total_times.append(enc_time + dec_time)
+                cpu_samples.append((enc_cpu, dec_cpu))
+                
+                if (len(total_times) >= self.repetitions and
+                        relative_standard_error(total_times) <= self.target_rse):
+                    break
+        
+        n = len(total_times)
+        return {
+            'ciphertext': ciphertext,
+            'decrypted': decrypted,
+            'entropy': entropy,
+            'key_setup_ms': setup[0],
+            'context_reused': setup[1],
+            'encryption_time_ms': summarize_samples(enc_times)['median'],
+            'decryption_time_ms': summarize_samples(dec_times)['median'],
+            'encryption_cpu': sum(c[0] for c in cpu_samples) / n,
+            'decryption_cpu': sum(c[1] for c in cpu_samples) / n,
+            'time_stats': summarize_samples(total_times)
+        }
+    
     def _calculate_performance_score(self, metrics):
         """
         Calculate performance efficiency score (T)
         Lower time and resource usage = higher score
         """
+        # Benchmarked runs score the median blended with the p95 tail,
+        # so unstable timings are penalised; single runs use the sample
+        time_stats = metrics.get('time_stats')
+        if time_stats:
+            total_time = 0.7 * time_stats['median'] + 0.3 * time_stats['p95']
+        else:
+            total_time = metrics['total_time_ms']
+        
         # Normalize time (assuming max 100ms for good performance)
-        time_score = max(0, 1 - (metrics['total_time_ms'] / 100))
+        time_score = max(0, 1 - (total_time / 100))
         
-        # Normalize CPU (assuming max 50% for good performance)
-        cpu_score = max(0, 1 - (metrics['avg_cpu_percent'] / 50))
+        # Normalize CPU time on the same 100ms scale. CPU% is not used: a
+        # single-threaded cipher keeps its thread ~100% busy, so it does not
+        # tell algorithms apart, while CPU time also charges work fanned
+        # out to other threads (AES-CTR chunks)
+        cpu_score = max(0, 1 - (metrics['cpu_time_ms'] / 100))
         
         # Normalize memory (assuming max 10MB for good performance)
         mem_score = max(0, 1 - (metrics['avg_memory_mb'] / 10))
@@ -152,7 +302,9 @@ class EncryptionAnalyzer:
             size_score = 0.8
         
         # Algorithm complexity score
-        if algorithm in ['ChaCha20', 'AES']:
+        if algorithm in ['AES-GCM', 'ChaCha20-Poly1305', 'XChaCha20-Poly1305']:
+            complexity_score = 1.0  # Modern AEAD, no separate MAC key to manage
+        elif algorithm in ['ChaCha20', 'AES', 'AES-CTR']:
             complexity_score = 0.9  # Modern, well-supported
         elif algorithm == 'Blowfish':
             complexity_score = 0.7
@@ -166,11 +318,14 @@ class EncryptionAnalyzer:
     def _calculate_integrity_score(self, metrics):
         """
         Calculate integrity and reliability score (I)
-        Based on successful decryption and entropy
+        Based on successful decryption, entropy and built-in authentication
         """
         # Integrity check
         integrity_score = 1.0 if metrics['integrity_check'] else 0.0
         
+        # Tampering is detected only by authenticated (AEAD) modes
+        auth_score = 1.0 if metrics['authenticated'] else 0.0
+        
         # Entropy (high entropy = good)
         entropy_score = metrics['entropy']
         
@@ -178,27 +333,185 @@ class EncryptionAnalyzer:
         size_ratio = metrics['ciphertext_size'] / max(metrics['plaintext_size'], 1)
         size_score = 1.0 if 1.0 <= size_ratio <= 2.0 else 0.8
         
-        I = (integrity_score * 0.5 + entropy_score * 0.3 + size_score * 0.2)
+        I = (integrity_score * 0.4 + entropy_score * 0.3 + size_score * 0.2 + auth_score * 0.1)
         
         return min(1.0, max(0.0, I))
     
-    def compare_algorithms(self, plaintext):
+    @property
+    def cache(self):
+        """ResultCache shared by compare_algorithms calls"""
+        if self._cache is None:
+            from modules.result_cache import ResultCache
+            self._cache = ResultCache(
+                max_entries=self.config.RESULT_CACHE_MAX_ENTRIES,
+                ttl=self.config.RESULT_CACHE_TTL,
+                db_path=self.config.RESULT_CACHE_DB_PATH
+            )
+        return self._cache
+    
+    def _cache_key(self, plaintext, benchmark, memory_mode, sandbox, user_id=None):
+        """
+        Cache key covering everything that changes compare_algorithms output,
+        plus the requesting user: an instant cached response would otherwise
+        tell one user that another already analyzed the same plaintext
+        """
+        params = {
+            'user_id': user_id,
+            'benchmark': bool(benchmark),
+            'memory_mode': memory_mode,
+            'sandbox': bool(sandbox),
+            'weights': [self.w1, self.w2, self.w3, self.w4]
+        }
+        if memory_mode == 'tracemalloc':
+            params['memory_sample_every'] = self.memory_sample_every
+        if benchmark:
+            params['benchmark_settings'] = [self.warmup, self.repetitions, self.max_repetitions, self.target_rse]
+        return self.cache.make_key(plaintext, self.ALGORITHMS, params)
+    
+    def compare_algorithms(self, plaintext, parallel=None, benchmark=None, on_result=None, use_cache=None,
+                           memory_mode=None, sandbox=None, user_id=None):
         """
         Compare all algorithms with the same plaintext
+        parallel: run on the process pool (default: config.ANALYSIS_PARALLEL)
+        sandbox: run each algorithm in its pre-forked sandbox worker
+                 (default: config.ANALYSIS_SANDBOX)
+        benchmark: use repeated timings (default: config.BENCHMARK_MODE)
+        memory_mode: 'off', 'tracemalloc' or 'rss' (default: config.MEMORY_PROFILE_MODE);
+                     'rss' analyzes each algorithm in a freshly forked process
+        on_result: optional callback(algorithm, metrics, error) invoked as
+                   each algorithm finishes (metrics is None on error)
+        use_cache: return memoized results for identical input, flagged
+                   with 'cached': True (default: config.RESULT_CACHE_ENABLED)
+        user_id: requesting user; memoized results are only returned to
+                 calls with the same user_id
         Returns: list of metrics for all algorithms
         """
-        algorithms = ['AES', 'DES', 'Blowfish', 'ChaCha20']
+        if parallel is None:
+            parallel = self.parallel
+        if sandbox is None:
+            sandbox = self.sandbox
+        if sandbox and self._get_sandbox() is None:
+            sandbox = False
+        if benchmark is None:
+            benchmark = self.benchmark
+        if use_cache is None:
+            use_cache = self.cache_enabled
+        if memory_mode is None:
+            memory_mode = self.memory_mode
+        
+        if memory_mode not in self.memory_modes:
+            raise ValueError(f"Unsupported memory mode on this platform: {memory_mode}")
+        
+        if use_cache:
+            cache_key = self._cache_key(plaintext, benchmark, memory_mode, sandbox, user_id)
+            cached = self.cache.get(cache_key)
+            if cached is not None:
+                for metrics in cached:
+                    metrics['cached'] = True
+                    if on_result:
+                        on_result(metrics['algorithm'], metrics, None)
+                return cached
+        
+        options = {'benchmark': benchmark, 'memory_mode': memory_mode}
+        if memory_mode == 'rss':
+            # Long-lived workers carry earlier allocations, so each
+            # algorithm gets a fresh process instead
+            from modules.parallel import analyze_isolated
+            runner = lambda name, data, **kw: analyze_isolated(self.config, name, data, **kw)
+            results = self._compare_sequential(plaintext, on_result, runner=runner, **options)
+        elif sandbox:
+            results = self._compare_sequential(plaintext, on_result, runner=self._sandbox.analyze, **options)
+        elif parallel:
+            results = self._compare_parallel(plaintext, on_result, **options)
+        else:
+            results = self._compare_sequential(plaintext, on_result, **options)
+        
+        # Only complete runs are memoized
+        if use_cache and len(results) == len(self.ALGORITHMS):
+            self.cache.put(cache_key, results)
+        
+        return results
+    
+    def _compare_sequential(self, plaintext, on_result=None, runner=None, **options):
+        """
+        Run compare_algorithms one algorithm at a time
+        runner: optional callable(algorithm, plaintext, **options) -> metrics
+                executing the analysis elsewhere (default: in this process)
+        """
         results = []
         
-        for algo_name in algorithms:
+        for algo_name in self.ALGORITHMS:
             try:
-                metrics, _, _ = self.analyze_algorithm(algo_name, plaintext)
+                if runner:
+                    metrics = runner(algo_name, plaintext, **options)
+                else:
+                    metrics, _, _ = self.analyze_algorithm(algo_name, plaintext, **options)
                 results.append(metrics)
             except Exception as e:
                 print(f"Error analyzing {algo_name}: {str(e)}")
+                if on_result:
+                    on_result(algo_name, None, e)
+                continue
+            
+            if on_result:
+                on_result(algo_name, metrics, None)
         
         return results
     
+    def _get_sandbox(self):
+        """
+        MeasurementSandbox with one worker per algorithm, forked on first use
+        Returns None where the sandbox is unavailable (no fork), in which
+        case analyses run in this process
+        """
+        if self._sandbox is None:
+            from modules.sandbox import MeasurementSandbox, SANDBOX_SUPPORTED
+            if not SANDBOX_SUPPORTED:
+                if self.sandbox:
+                    print("[ANALYZER] Measurement sandbox is not available here, measuring in-process")
+                    self.sandbox = False
+                return None
+            self._sandbox = MeasurementSandbox(
+                self.config,
+                self.ALGORITHMS,
+                cpus=self.config.ANALYSIS_SANDBOX_CPUS,
+                timeout=self.config.ANALYSIS_SANDBOX_TIMEOUT
+            )
+        return self._sandbox
+    
+    def _compare_parallel(self, plaintext, on_result=None, **options):
+        """Run compare_algorithms on the persistent process pool"""
+        if self._pool is None:
+            from modules.parallel import AnalysisPool
+            self._pool = AnalysisPool(
+                self.config,
+                max_workers=self.config.ANALYSIS_WORKERS,
+                pin_cpus=self.config.ANALYSIS_PIN_CPUS
+            )
+        
+        def report(algo_name, outcome):
+            if isinstance(outcome, Exception):
+                print(f"Error analyzing {algo_name}: {str(outcome)}")
+                if on_result:
+                    on_result(algo_name, None, outcome)
+            elif on_result:
+                on_result(algo_name, outcome, None)
+        
+        outcomes = self._pool.analyze(self.ALGORITHMS, plaintext, on_result=report, **options)
+        return [outcome for _, outcome in outcomes if not isinstance(outcome, Exception)]
+    
+    @staticmethod
+    def rank_algorithms(results):
+        """
+        Results ordered by overall score, best first
+        Returns: list of {'algorithm', 'S_overall_score'}
+        """
+        ranked = sorted(results, key=lambda x: x['S_overall_score'], reverse=True)
+        return [
+            {'algorithm': r['algorithm'], 'S_overall_score': r['S_overall_score']}
+            for r in ranked
+        ]
+    
     def get_best_algorithm(self, results):
         """
         Determine the best algorithm based on overall score
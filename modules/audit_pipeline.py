@@ -0,0 +1,187 @@
+"""
+Audit Pipeline Module
+Queues AuditLog records in memory and writes them in batches from a
+background thread, so requests do not wait on an extra commit
+"""
+
+import time
+import queue
+import atexit
+import logging
+import threading
+from datetime import datetime
+from sqlalchemy import insert
+
+# Queue marker asking the writer thread to exit
+_STOP = object()
+
+
+class AuditPipeline:
+    """
+    Buffered, asynchronous writer for the audit_logs table
+
+    Records are flushed when batch_size are pending or flush_interval
+    seconds have passed since the first of them was queued. The queue is
+    bounded: when it is full, log() blocks (backpressure) for up to
+    put_timeout seconds and then writes the record synchronously, so
+    nothing is dropped. A batch the database rejects is retried
+    write_retries times and then written to the file audit log (the root
+    logger, see KeyManager). Pending records are flushed at interpreter exit.
+    """
+
+    def __init__(self, app=None):
+        self.app = app
+        self.enabled = False
+        self.batch_size = 100
+        self.flush_interval = 1.0
+        self.put_timeout = 5.0
+        self.write_retries = 3
+        self.retry_delay = 0.5
+        self._queue = None
+        self._thread = None
+        self._lock = threading.Lock()
+
+        if app is not None:
+            self.init_app(app)
+
+    def init_app(self, app):
+        """Read AUDIT_* settings and start the writer thread"""
+        self.app = app
+        self.enabled = app.config.get('AUDIT_ASYNC', True)
+        self.batch_size = app.config.get('AUDIT_BATCH_SIZE', self.batch_size)
+        self.flush_interval = app.config.get('AUDIT_FLUSH_INTERVAL', self.flush_interval)
+        self.put_timeout = app.config.get('AUDIT_PUT_TIMEOUT', self.put_timeout)
+        self.write_retries = app.config.get('AUDIT_WRITE_RETRIES', self.write_retries)
+        self.retry_delay = app.config.get('AUDIT_RETRY_DELAY', self.retry_delay)
+        self._queue = queue.Queue(maxsize=app.config.get('AUDIT_QUEUE_SIZE', 10000))
+
+        if self.enabled:
+            self._start()
+            atexit.register(self.shutdown)
+
+    def _start(self):
+        """Start the writer thread if it is not running"""
+        with self._lock:
+            if self._thread is None or not self._thread.is_alive():
+                self._thread = threading.Thread(target=self._run, name='audit-writer', daemon=True)
+                self._thread.start()
+
+    def log(self, action, details=None, user_id=None, ip_address=None):
+        """Queue an audit record (timestamped now, not at flush time)"""
+        record = {
+            'user_id': user_id,
+            'action': action,
+            'details': details,
+            'ip_address': ip_address,
+            'timestamp': datetime.utcnow()
+        }
+
+        if not self.enabled:
+            self._write([record])
+            return
+
+        try:
+            self._queue.put(record, timeout=self.put_timeout)
+        except queue.Full:
+            logging.warning("Audit queue full, writing record synchronously")
+            self._write([record])
+            return
+
+        # shutdown() ran after the enabled check above: the writer may be
+        # gone, so write what is left ourselves
+        if not self.enabled:
+            self._drain()
+
+    def flush(self):
+        """Block until every queued record has been written"""
+        if self.enabled:
+            self._queue.join()
+
+    def shutdown(self):
+        """Flush pending records and stop the writer thread"""
+        with self._lock:
+            thread, self._thread = self._thread, None
+            # Anything logged from now on is written directly
+            self.enabled = False
+        if thread is not None and thread.is_alive():
+            self._queue.put(_STOP)
+            thread.join()
+        # Records queued by log() calls that passed the enabled check
+        # before it was cleared can land behind _STOP
+        self._drain()
+
+    def _drain(self):
+        """Write every record still in the queue (after the writer has stopped)"""
+        if self._queue is None:
+            return
+        records = []
+        while True:
+            try:
+                item = self._queue.get_nowait()
+            except queue.Empty:
+                break
+            if item is not _STOP:
+                records.append(item)
+            self._queue.task_done()
+        if records:
+            self._write(records)
+
+    def _run(self):
+        """Writer loop: collect a batch by count or time, then write it"""
+        while True:
+            item = self._queue.get()
+            if item is _STOP:
+                self._queue.task_done()
+                return
+
+            batch = [item]
+            stop = False
+            deadline = time.monotonic() + self.flush_interval
+            while len(batch) < self.batch_size:
+                remaining = deadline - time.monotonic()
+                if remaining <= 0:
+                    break
+                try:
+                    item = self._queue.get(timeout=remaining)
+                except queue.Empty:
+                    break
+                if item is _STOP:
+                    stop = True
+                    break
+                batch.append(item)
+
+            try:
+                self._write(batch)
+            finally:
+                for _ in range(len(batch) + (1 if stop else 0)):
+                    self._queue.task_done()
+
+            if stop:
+                return
+
+    def _write(self, records):
+        """
+        Insert records in one transaction, retrying a failed batch; if it
+        still fails, the records go to the file audit log instead
+        """
+        from database.models import db, AuditLog
+
+        for attempt in range(self.write_retries + 1):
+            if attempt:
+                time.sleep(self.retry_delay * attempt)
+            with self.app.app_context():
+                try:
+                    db.session.execute(insert(AuditLog), records)
+                    db.session.commit()
+                    return
+                except Exception as e:
+                    db.session.rollback()
+                    error = e
+
+        logging.error(f"Failed to write {len(records)} audit records to the database: {str(error)}")
+        for record in records:
+            logging.warning(
+                f"Audit record - Action: {record['action']}, User: {record['user_id']}, "
+                f"IP: {record['ip_address']}, Time: {record['timestamp'].isoformat()}, "
+                f"Details: {record['details']}"
+            )
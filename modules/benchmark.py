@@ -0,0 +1,322 @@
+"""
+Throughput Benchmark Module
+Sweeps plaintext sizes (powers of two) over every cipher wrapper and
+reports MB/s, cycles/byte and fixed per-call overhead
+
+Usage:
+    python -m modules.benchmark --max-size 64M --save
+    python -m modules.benchmark --parallel-encryption --size 256M
+"""
+
+import os
+import sys
+import uuid
+import socket
+import platform
+import argparse
+import statistics
+from modules.analyzer import EncryptionAnalyzer
+
+# A size is "viable" while one encryption stays under this budget
+VIABLE_TIME_MS = 100
+
+
+def sweep_sizes(min_size, max_size):
+    """Powers of two from min_size up to max_size"""
+    sizes = []
+    size = 1 << max(0, (min_size - 1).bit_length())
+    while size <= max_size:
+        sizes.append(size)
+        size <<= 1
+    return sizes
+
+
+def _cpu_mhz():
+    """Current CPU frequency in MHz, or None if unknown"""
+    try:
+        import psutil
+        freq = psutil.cpu_freq()
+        return freq.current if freq and freq.current else None
+    except Exception:
+        return None
+
+
+def _estimate_overhead_us(points):
+    """
+    Estimate fixed per-call overhead from (size, time_ms) points
+
+    The per-byte cost is taken from the largest size, then the overhead is
+    the median residual over the smallest sizes, where it dominates.
+    """
+    points = sorted(points)
+    largest_size, largest_time = points[-1]
+    per_byte_ms = largest_time / largest_size
+
+    small = points[:max(1, len(points) // 4)]
+    residuals = [time_ms - per_byte_ms * size for size, time_ms in small]
+    return max(0.0, statistics.median(residuals)) * 1000
+
+
+def _throughput_mb_s(size, time_ms):
+    """Bytes per millisecond converted to MB/s"""
+    if time_ms <= 0:
+        return None
+    return size / (1024 * 1024) / (time_ms / 1000)
+
+
+def _round(value, digits):
+    """Round values that may be None"""
+    return round(value, digits) if value is not None else None
+
+
+def run_sweep(algorithms=None, min_size=16, max_size=256 * 1024 * 1024,
+              repetitions=3, progress=None):
+    """
+    Run the throughput sweep
+
+    Args:
+        algorithms: Algorithm names (default: EncryptionAnalyzer.ALGORITHMS)
+        min_size: Smallest plaintext size in bytes
+        max_size: Largest plaintext size in bytes
+        repetitions: Timed runs per size, the fastest is kept
+        progress: Optional callback(algorithm, size)
+
+    Returns:
+        dict: run metadata, per-size rows and per-algorithm summaries
+    """
+    algorithms = algorithms or EncryptionAnalyzer.ALGORITHMS
+    sizes = sweep_sizes(min_size, max_size)
+    cpu_mhz = _cpu_mhz()
+
+    ciphers = {}
+    for name in algorithms:
+        algo = EncryptionAnalyzer.create_algorithm(name)
+        algo.generate_key()
+
+        # Warm up so one-time backend initialisation is not timed
+        algo.decrypt(algo.encrypt(b'warmup')[0])
+        ciphers[name] = algo
+
+    # One random buffer, sliced per size
+    source = os.urandom(sizes[-1]) if sizes else b''
+
+    rows = []
+    for size in sizes:
+        plaintext = source[:size]
+        for name, algo in ciphers.items():
+            if progress:
+                progress(name, size)
+
+            enc_times, dec_times = [], []
+            for _ in range(repetitions):
+                ciphertext, enc_time, _, _, _ = algo.encrypt(plaintext)
+                _, dec_time, _, _ = algo.decrypt(ciphertext)
+                enc_times.append(enc_time)
+                dec_times.append(dec_time)
+
+            enc_time, dec_time = min(enc_times), min(dec_times)
+            cycles_per_byte = None
+            if cpu_mhz:
+                cycles_per_byte = (enc_time / 1000) * cpu_mhz * 1e6 / size
+
+            rows.append({
+                'algorithm': name,
+                'plaintext_size': size,
+                'encryption_time_ms': round(enc_time, 4),
+                'decryption_time_ms': round(dec_time, 4),
+                'encryption_mb_s': _round(_throughput_mb_s(size, enc_time), 2),
+                'decryption_mb_s': _round(_throughput_mb_s(size, dec_time), 2),
+                'cycles_per_byte': _round(cycles_per_byte, 2)
+            })
+
+    summaries = []
+    for name in algorithms:
+        algo_rows = [r for r in rows if r['algorithm'] == name]
+        if not algo_rows:
+            continue
+
+        overhead_us = _estimate_overhead_us(
+            [(r['plaintext_size'], r['encryption_time_ms']) for r in algo_rows]
+        )
+        viable = [r['plaintext_size'] for r in algo_rows if r['encryption_time_ms'] <= VIABLE_TIME_MS]
+
+        for r in algo_rows:
+            r['overhead_us'] = round(overhead_us, 2)
+
+        summaries.append({
+            'algorithm': name,
+            'overhead_us': round(overhead_us, 2),
+            'peak_encryption_mb_s': max((r['encryption_mb_s'] or 0) for r in algo_rows),
+            'viable_up_to': max(viable) if viable else None
+        })
+
+    return {
+        'run_id': str(uuid.uuid4()),
+        'host': socket.gethostname(),
+        'python_version': platform.python_version(),
+        'cpu_mhz': cpu_mhz,
+        'rows': rows,
+        'summaries': summaries
+    }
+
+
+class _NullSink:
+    """Writable that discards data, so only encryption is measured"""
+
+    def write(self, data):
+        return len(data)
+
+
+def run_parallel_scaling(size=128 * 1024 * 1024, workers=None, algorithm='AES-GCM',
+                         segment_size=1024 * 1024):
+    """
+    Measure container encryption MB/s for increasing thread counts
+
+    Args:
+        size: Plaintext size in bytes
+        workers: Thread counts to try (default: 1, 2, 4 ... CPU count)
+        algorithm: 'AES-GCM' or 'ChaCha20-Poly1305'
+        segment_size: Plaintext bytes per segment
+
+    Returns:
+        list: dicts with workers, time_ms, mb_s and speedup versus sequential
+    """
+    import io
+    import time
+    import base64
+    from modules.memory_encryptor import MemoryEncryptor
+    from modules.parallel_encryptor import ParallelMemoryEncryptor
+
+    if workers is None:
+        cpus = os.cpu_count() or 1
+        workers = [1]
+        while workers[-1] * 2 <= cpus:
+            workers.append(workers[-1] * 2)
+        if workers[-1] != cpus:
+            workers.append(cpus)
+
+    master_key = base64.b64encode(os.urandom(32)).decode()
+    plaintext = os.urandom(size)
+
+    def timed(encryptor, runs=3):
+        """Best of runs after one warmup, in ms"""
+        times = []
+        for _ in range(runs + 1):
+            start = time.perf_counter_ns()
+            encryptor.encrypt_stream_container(io.BytesIO(plaintext), _NullSink(), algorithm, segment_size)
+            times.append((time.perf_counter_ns() - start) / 1e6)
+        return min(times[1:])
+
+    baseline_ms = timed(MemoryEncryptor(master_key))
+
+    results = [{
+        'workers': 'sequential',
+        'time_ms': round(baseline_ms, 2),
+        'mb_s': _round(_throughput_mb_s(size, baseline_ms), 2),
+        'speedup': 1.0
+    }]
+    for count in workers:
+        encryptor = ParallelMemoryEncryptor(master_key, workers=count)
+        try:
+            time_ms = timed(encryptor)
+        finally:
+            encryptor.shutdown()
+        results.append({
+            'workers': count,
+            'time_ms': round(time_ms, 2),
+            'mb_s': _round(_throughput_mb_s(size, time_ms), 2),
+            'speedup': round(baseline_ms / time_ms, 2)
+        })
+
+    return results
+
+
+def save_sweep(sweep, release, user_id=None, audit=None):
+    """Persist sweep rows as BenchmarkResult records (requires app context)"""
+    from database.persistence import save_benchmark_rows
+
+    return save_benchmark_rows(sweep, release, user_id=user_id, audit=audit)
+
+
+def parse_size(text):
+    """Parse sizes like 4096, 64K, 16M or 1G"""
+    text = text.strip().upper().rstrip('B')
+    units = {'K': 1024, 'M': 1024 ** 2, 'G': 1024 ** 3}
+    if text and text[-1] in units:
+        return int(float(text[:-1]) * units[text[-1]])
+    return int(text)
+
+
+def format_report(sweep):
+    """Render a sweep as a plain-text table"""
+    lines = [
+        f"Run {sweep['run_id']} on {sweep['host']} (Python {sweep['python_version']}, "
+        f"CPU {sweep['cpu_mhz'] or '?'} MHz)",
+        '',
+        f"{'Algorithm':<10} {'Size':>12} {'Enc ms':>12} {'Dec ms':>12} {'Enc MB/s':>10} {'Dec MB/s':>10} {'cyc/B':>8}"
+    ]
+    for r in sweep['rows']:
+        lines.append(
+            f"{r['algorithm']:<10} {r['plaintext_size']:>12} {r['encryption_time_ms']:>12.4f} "
+            f"{r['decryption_time_ms']:>12.4f} {str(r['encryption_mb_s']):>10} "
+            f"{str(r['decryption_mb_s']):>10} {str(r['cycles_per_byte']):>8}"
+        )
+    lines.append('')
+    for s in sweep['summaries']:
+        lines.append(
+            f"{s['algorithm']}: overhead {s['overhead_us']} us/call, "
+            f"peak {s['peak_encryption_mb_s']} MB/s, "
+            f"viable (<= {VIABLE_TIME_MS} ms) up to {s['viable_up_to']} bytes"
+        )
+    return '\n'.join(lines)
+
+
+def main(argv=None):
+    """CLI entry point"""
+    from config import Config
+
+    parser = argparse.ArgumentParser(description='Cipher throughput-vs-size sweep')
+    parser.add_argument('--algorithms', nargs='+', default=None,
+                        help='Algorithms to sweep (default: all)')
+    parser.add_argument('--min-size', default=str(Config.BENCHMARK_SWEEP_MIN_SIZE))
+    parser.add_argument('--max-size', default=str(Config.BENCHMARK_SWEEP_MAX_SIZE))
+    parser.add_argument('--repetitions', type=int, default=Config.BENCHMARK_SWEEP_REPETITIONS)
+    parser.add_argument('--save', action='store_true',
+                        help='Store results in the benchmark_results table')
+    parser.add_argument('--parallel-encryption', action='store_true',
+                        help='Measure container encryption scaling across threads instead')
+    parser.add_argument('--size', default='128M',
+                        help='Plaintext size for --parallel-encryption')
+    args = parser.parse_args(argv)
+
+    if args.parallel_encryption:
+        algorithm = args.algorithms[0] if args.algorithms else 'AES-GCM'
+        print(f"{'Workers':>10} {'Time ms':>12} {'MB/s':>10} {'Speedup':>8}")
+        for r in run_parallel_scaling(parse_size(args.size), algorithm=algorithm):
+            print(f"{str(r['workers']):>10} {r['time_ms']:>12} {str(r['mb_s']):>10} {r['speedup']:>8}")
+        return
+
+    sweep = run_sweep(
+        algorithms=args.algorithms,
+        min_size=parse_size(args.min_size),
+        max_size=parse_size(args.max_size),
+        repetitions=args.repetitions,
+        progress=lambda name, size: print(f"[..] {name} {size} B", file=sys.stderr)
+    )
+    print(format_report(sweep))
+
+    if args.save:
+        from flask import Flask
+        from database.models import db
+
+        app = Flask(__name__)
+        app.config.from_object(Config)
+        db.init_app(app)
+        with app.app_context():
+            db.create_all()
+            save_sweep(sweep, Config.APP_VERSION)
+        print(f"[OK] Saved {len(sweep['rows'])} rows (run {sweep['run_id']})")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,88 @@
+"""
+Byte Statistics Module
+Single-pass entropy and randomness statistics for ciphertext
+"""
+
+import numpy as np
+
+# Bytes processed per step for the serial correlation dot product
+_CHUNK_SIZE = 1 << 20
+
+
+def _as_array(data):
+    """Zero-copy uint8 view of bytes-like data"""
+    return np.frombuffer(data, dtype=np.uint8)
+
+
+def _entropy_from_histogram(counts, n):
+    """Shannon entropy (bits per byte) of a histogram"""
+    p = counts[counts > 0] / n
+    return max(0.0, float(-(p * np.log2(p)).sum()))
+
+
+def _serial_correlation(values, sum_x, sum_x2):
+    """
+    Serial correlation coefficient between consecutive bytes
+    (the last byte is paired with the first, as in ent)
+    """
+    n = len(values)
+    if n < 2:
+        return 0.0
+
+    sum_xy = 0
+    for start in range(0, n - 1, _CHUNK_SIZE):
+        end = min(start + _CHUNK_SIZE, n - 1)
+        left = values[start:end].astype(np.int64)
+        right = values[start + 1:end + 1].astype(np.int64)
+        sum_xy += int(np.dot(left, right))
+    sum_xy += int(values[-1]) * int(values[0])
+
+    denominator = n * sum_x2 - sum_x * sum_x
+    if denominator == 0:
+        return 1.0
+    return (n * sum_xy - sum_x * sum_x) / denominator
+
+
+def analyze_bytes(data):
+    """
+    Compute entropy and byte distribution statistics of data
+
+    Returns:
+        dict: entropy (normalized 0-1), entropy_bits, chi_square,
+              serial_correlation, mean, unique_bytes, min_count, max_count
+    """
+    if not data:
+        return {
+            'entropy': 0.0,
+            'entropy_bits': 0.0,
+            'chi_square': 0.0,
+            'serial_correlation': 0.0,
+            'mean': 0.0,
+            'unique_bytes': 0,
+            'min_count': 0,
+            'max_count': 0
+        }
+
+    values = _as_array(data)
+    n = len(values)
+    counts = np.bincount(values, minlength=256)
+
+    # Moments from the histogram instead of the raw data
+    byte_values = np.arange(256, dtype=np.int64)
+    sum_x = int((counts * byte_values).sum())
+    sum_x2 = int((counts * byte_values * byte_values).sum())
+
+    entropy_bits = _entropy_from_histogram(counts, n)
+    expected = n / 256
+    chi_square = float(((counts - expected) ** 2).sum() / expected)
+
+    return {
+        'entropy': entropy_bits / 8.0,
+        'entropy_bits': entropy_bits,
+        'chi_square': chi_square,
+        'serial_correlation': float(_serial_correlation(values, sum_x, sum_x2)),
+        'mean': sum_x / n,
+        'unique_bytes': int(np.count_nonzero(counts)),
+        'min_count': int(counts.min()),
+        'max_count': int(counts.max())
+    }
@@ -0,0 +1,185 @@
+"""
+Segmented Container Format
+Versioned, chunk-authenticated layout for large-file encryption
+
+Layout (all integers big-endian):
+    magic            4 bytes  b'CAEC'
+    version          1 byte   1
+    algorithm        1 byte   1 = AES-256-GCM, 2 = ChaCha20-Poly1305
+    reserved         2 bytes  0
+    segment_size     4 bytes  plaintext bytes per segment
+    nonce_prefix     7 bytes  random per file
+    wrapped_key_len  2 bytes
+    wrapped_key      N bytes  session key wrapped with MASTER_KEY
+    segments...      each: ciphertext (<= segment_size) + 16-byte tag
+
+Segment i uses nonce = nonce_prefix || uint32(i) || last_flag and the
+header as associated data, so segments cannot be reordered, truncated or
+moved between files. Every segment except the last is full size, which
+makes segment offsets computable for random access.
+"""
+
+import os
+import struct
+from cryptography.exceptions import InvalidTag
+from cryptography.hazmat.primitives.ciphers.aead import AESGCM, ChaCha20Poly1305
+
+MAGIC = b'CAEC'
+VERSION = 1
+TAG_SIZE = 16
+NONCE_PREFIX_SIZE = 7
+DEFAULT_SEGMENT_SIZE = 1024 * 1024
+# Accepted segment sizes (each segment is held in memory while processed)
+MIN_SEGMENT_SIZE = 1024
+MAX_SEGMENT_SIZE = 64 * 1024 * 1024
+
+ALGORITHM_IDS = {
+    'AES-GCM': 1,
+    'ChaCha20-Poly1305': 2
+}
+ALGORITHM_NAMES = {v: k for k, v in ALGORITHM_IDS.items()}
+
+_AEAD_CLASSES = {
+    'AES-GCM': AESGCM,
+    'ChaCha20-Poly1305': ChaCha20Poly1305
+}
+
+# magic, version, algorithm, reserved, segment_size, nonce_prefix, wrapped_key_len
+_FIXED_HEADER = struct.Struct('>4sBBHI7sH')
+
+
+class ContainerError(ValueError):
+    """Raised for malformed or unauthentic container data"""
+
+
+class ContainerHeader:
+    """
+    Parsed container header
+    """
+
+    def __init__(self, algorithm, segment_size, nonce_prefix, wrapped_key):
+        if algorithm not in ALGORITHM_IDS:
+            raise ContainerError(f"Unsupported container algorithm: {algorithm}")
+        if not MIN_SEGMENT_SIZE <= segment_size <= MAX_SEGMENT_SIZE:
+            # Guards readers against zero-length read loops and huge allocations
+            raise ContainerError(f"Invalid container segment size: {segment_size}")
+        self.algorithm = algorithm
+        self.segment_size = segment_size
+        self.nonce_prefix = nonce_prefix
+        self.wrapped_key = wrapped_key
+        self.raw = _FIXED_HEADER.pack(
+            MAGIC, VERSION, ALGORITHM_IDS[algorithm], 0,
+            segment_size, nonce_prefix, len(wrapped_key)
+        ) + wrapped_key
+
+    @property
+    def size(self):
+        """Header length in bytes"""
+        return len(self.raw)
+
+    @property
+    def stored_segment_size(self):
+        """On-disk size of a full segment (ciphertext + tag)"""
+        return self.segment_size + TAG_SIZE
+
+    def segment_offset(self, index):
+        """Byte offset of segment index from the start of the container"""
+        return self.size + index * self.stored_segment_size
+
+    def segment_count(self, container_size):
+        """Number of segments in a container of container_size bytes"""
+        body = container_size - self.size
+        if body < TAG_SIZE:
+            raise ContainerError("Container is truncated")
+        return -(-body // self.stored_segment_size)
+
+    @classmethod
+    def create(cls, algorithm, wrapped_key, segment_size=DEFAULT_SEGMENT_SIZE):
+        """New header with a random nonce prefix"""
+        return cls(algorithm, segment_size, os.urandom(NONCE_PREFIX_SIZE), wrapped_key)
+
+    @classmethod
+    def read(cls, src):
+        """Parse a header from a readable stream positioned at its start"""
+        fixed = src.read(_FIXED_HEADER.size)
+        if len(fixed) < _FIXED_HEADER.size:
+            raise ContainerError("Container header is truncated")
+
+        magic, version, algorithm_id, _, segment_size, nonce_prefix, key_len = _FIXED_HEADER.unpack(fixed)
+        if magic != MAGIC:
+            raise ContainerError("Not a segmented container")
+        if version != VERSION:
+            raise ContainerError(f"Unsupported container version: {version}")
+        if algorithm_id not in ALGORITHM_NAMES:
+            raise ContainerError(f"Unknown container algorithm id: {algorithm_id}")
+
+        wrapped_key = src.read(key_len)
+        if len(wrapped_key) < key_len:
+            raise ContainerError("Container header is truncated")
+
+        return cls(ALGORITHM_NAMES[algorithm_id], segment_size, nonce_prefix, wrapped_key)
+
+
+def is_container(prefix):
+    """Check whether leading bytes look like a container header"""
+    return len(prefix) >= 5 and prefix[:4] == MAGIC and prefix[4] == VERSION
+
+
+def read_exact(src, size):
+    """Read size bytes, fewer only at end of stream"""
+    data = src.read(size)
+    if len(data) == size or not data:
+        return data
+
+    parts = [data]
+    remaining = size - len(data)
+    while remaining:
+        chunk = src.read(remaining)
+        if not chunk:
+            break
+        parts.append(chunk)
+        remaining -= len(chunk)
+    return b''.join(parts)
+
+
+def iter_segments(src, size):
+    """
+    Yield (index, data, last) for consecutive size-byte reads of src
+    Reads one segment ahead so the final one can be flagged; an empty
+    stream yields a single empty last segment
+    """
+    index = 0
+    segment = read_exact(src, size)
+    while True:
+        next_segment = read_exact(src, size)
+        last = not next_segment
+        yield index, segment, last
+        if last:
+            return
+        segment = next_segment
+        index += 1
+
+
+def new_aead(algorithm, key):
+    """AEAD primitive for a container algorithm"""
+    return _AEAD_CLASSES[algorithm](key)
+
+
+def segment_nonce(header, index, last):
+    """96-bit nonce for segment index"""
+    return header.nonce_prefix + struct.pack('>IB', index, 1 if last else 0)
+
+
+def encrypt_segment(aead, header, index, plaintext, last):
+    """Encrypt one segment, returns ciphertext + tag"""
+    return aead.encrypt(segment_nonce(header, index, last), plaintext, header.raw)
+
+
+def decrypt_segment(aead, header, index, ciphertext, last):
+    """Decrypt and authenticate one segment"""
+    if len(ciphertext) < TAG_SIZE:
+        raise ContainerError("Container is truncated")
+    try:
+        return aead.decrypt(segment_nonce(header, index, last), ciphertext, header.raw)
+    except InvalidTag:
+        raise ContainerError(f"Segment {index} failed authentication")
@@ -0,0 +1,146 @@
+import os
+import time
+from modules.measurement import Measurement
+from modules.byte_stats import analyze_bytes
+
+class AEADEncryption:
+    """
+    Base for the authenticated (AEAD) cipher wrappers
+    
+    Ciphertext layout: nonce || ciphertext || 16-byte tag. A fresh random
+    nonce is drawn for every encrypt() call, because repeating a nonce
+    under one key breaks both confidentiality and authenticity; the nonce
+    from generate_key()/set_key() is only kept for key storage.
+    No padding is needed, so ciphertext is plaintext + NONCE_SIZE + TAG_SIZE.
+    """
+    
+    NAME = None
+    MODE = None
+    KEY_SIZE = 32       # Bytes
+    NONCE_SIZE = 12     # Bytes
+    TAG_SIZE = 16       # Bytes
+    BLOCK_SIZE = None   # Bits, None for stream ciphers
+    
+    def __init__(self):
+        self.key = None
+        self.nonce = None
+        self.byte_stats = None
+        self.key_setup_ms = 0.0
+        self.context_reused = False
+        self._aead = None
+        
+    def generate_key(self):
+        """Generate a random key and nonce"""
+        self.key = os.urandom(self.KEY_SIZE)
+        self.nonce = os.urandom(self.NONCE_SIZE)
+        self._aead = None
+        return self.key, self.nonce
+    
+    def set_key(self, key, nonce):
+        """Set existing key and nonce"""
+        self.key = key
+        self.nonce = nonce
+        self._aead = None
+    
+    def _new_aead(self):
+        """AEAD object for self.key with encrypt/decrypt(nonce, data, associated_data)"""
+        raise NotImplementedError
+    
+    def _context(self):
+        """AEAD object for the current key, built once and timed as key_setup_ms"""
+        if self._aead is None:
+            start = time.perf_counter_ns()
+            self._aead = self._new_aead()
+            self.key_setup_ms = (time.perf_counter_ns() - start) / 1e6
+            self.context_reused = False
+        else:
+            self.key_setup_ms = 0.0
+            self.context_reused = True
+        return self._aead
+    
+    def encrypt(self, plaintext):
+        """
+        Encrypt and authenticate plaintext under a fresh nonce
+        Returns: (ciphertext, encryption_time_ms, cpu_percent, memory_mb, entropy)
+        """
+        if isinstance(plaintext, str):
+            plaintext = plaintext.encode('utf-8')
+        
+        aead = self._context()
+        self.nonce = os.urandom(self.NONCE_SIZE)
+        
+        # Performance monitoring (non-blocking)
+        with Measurement('encrypt') as m:
+            # Encryption (no padding, tag appended)
+            sealed = aead.encrypt(self.nonce, plaintext, None)
+        
+        ciphertext = self.nonce + sealed
+        
+        # Single-pass byte statistics of the ciphertext
+        self.byte_stats = analyze_bytes(ciphertext)
+        entropy = self.byte_stats['entropy']
+        
+        return ciphertext, m.elapsed_ms, m.cpu_percent, m.memory_mb, entropy
+    
+    def decrypt(self, ciphertext):
+        """
+        Verify and decrypt nonce-prefixed ciphertext
+        Raises InvalidTag (or ValueError) if the tag does not match
+        Returns: (plaintext, decryption_time_ms, cpu_percent, memory_mb)
+        """
+        aead = self._context()
+        nonce = bytes(ciphertext[:self.NONCE_SIZE])
+        sealed = memoryview(ciphertext)[self.NONCE_SIZE:]
+        
+        # Performance monitoring (non-blocking)
+        with Measurement('decrypt') as m:
+            # Decryption and tag verification
+            plaintext = aead.decrypt(nonce, sealed, None)
+        
+        return plaintext, m.elapsed_ms, m.cpu_percent, m.memory_mb
+    
+    def encrypt_many(self, messages):
+        """
+        Encrypt many messages under the current key, each with its own random nonce
+        Returns: (list of nonce || ciphertext || tag, total_time_ms)
+        """
+        aead = self._context()
+        n = self.NONCE_SIZE
+        nonces = os.urandom(n * len(messages))
+        
+        with Measurement('encrypt_many') as m:
+            ciphertexts = []
+            for i, msg in enumerate(messages):
+                if isinstance(msg, str):
+                    msg = msg.encode('utf-8')
+                nonce = nonces[n * i:n * (i + 1)]
+                ciphertexts.append(nonce + aead.encrypt(nonce, msg, None))
+        
+        return ciphertexts, m.elapsed_ms
+    
+    def decrypt_many(self, ciphertexts):
+        """
+        Verify and decrypt nonce-prefixed ciphertexts from encrypt_many
+        Returns: (list of plaintexts, total_time_ms)
+        """
+        aead = self._context()
+        n = self.NONCE_SIZE
+        
+        with Measurement('decrypt_many') as m:
+            plaintexts = [
+                aead.decrypt(bytes(ciphertext[:n]), memoryview(ciphertext)[n:], None)
+                for ciphertext in ciphertexts
+            ]
+        
+        return plaintexts, m.elapsed_ms
+    
+    def get_algorithm_info(self):
+        """Return algorithm information"""
+        return {
+            'name': self.NAME,
+            'key_size': self.KEY_SIZE * 8,
+            'block_size': self.BLOCK_SIZE,
+            'mode': self.MODE,
+            'security_level': 'High',
+            'authenticated': True
+        }
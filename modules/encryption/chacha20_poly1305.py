@@ -0,0 +1,11 @@
+from cryptography.hazmat.primitives.ciphers.aead import ChaCha20Poly1305
+from modules.encryption.aead import AEADEncryption
+
+class ChaCha20Poly1305Encryption(AEADEncryption):
+    """ChaCha20-Poly1305 (RFC 8439, 96-bit nonce)"""
+    
+    NAME = 'ChaCha20-Poly1305'
+    MODE = 'Stream + Poly1305'
+    
+    def _new_aead(self):
+        return ChaCha20Poly1305(self.key)
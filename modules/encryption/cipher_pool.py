@@ -0,0 +1,155 @@
+"""
+Cipher Context Pool
+Reusable CBC cipher contexts keyed by (algorithm, key), so repeated
+operations under one key pay the key schedule only once
+"""
+
+import os
+import time
+import threading
+from collections import OrderedDict
+
+
+def _xor(a, b):
+    """XOR two equal-length byte strings"""
+    return (int.from_bytes(a, 'big') ^ int.from_bytes(b, 'big')).to_bytes(len(a), 'big')
+
+
+class CBCContext:
+    """
+    One long-lived CBC encryptor and decryptor for a single key
+
+    Neither backend can change the IV of an existing context, but CBC only
+    uses the IV through the chaining value: block 1 is E(P1 xor chain).
+    XOR-ing the first block with (iv xor chain) therefore makes a context
+    whose chain is the previous message's last ciphertext block produce
+    exactly the output of a fresh context with the requested IV.
+    """
+
+    def __init__(self, new_encryptor, new_decryptor, block_size):
+        """
+        Args:
+            new_encryptor: Callable returning an update(data) -> bytes
+                           function of a CBC encryptor with an all-zero IV
+            new_decryptor: Same for decryption
+            block_size: Cipher block size in bytes
+        """
+        self.block_size = block_size
+        start = time.perf_counter_ns()
+        self._encrypt = new_encryptor()
+        self._decrypt = new_decryptor()
+        self.setup_ms = (time.perf_counter_ns() - start) / 1e6
+        self._enc_chain = bytes(block_size)
+        self._dec_chain = bytes(block_size)
+        self._lock = threading.Lock()
+        self.broken = False
+
+    def encrypt(self, iv, padded):
+        """CBC-encrypt block-aligned data under iv"""
+        with self._lock:
+            return self._encrypt_unlocked(iv, padded)
+
+    def decrypt(self, iv, ciphertext):
+        """CBC-decrypt block-aligned data under iv"""
+        with self._lock:
+            return self._decrypt_unlocked(iv, ciphertext)
+
+    def _encrypt_unlocked(self, iv, padded):
+        bs = self.block_size
+        if not padded or len(padded) % bs:
+            raise ValueError("Data must be a non-empty multiple of the block size")
+
+        view = memoryview(padded)
+        try:
+            first = self._encrypt(_xor(bytes(view[:bs]), _xor(iv, self._enc_chain)))
+            ciphertext = first + self._encrypt(view[bs:]) if len(padded) > bs else first
+        except Exception:
+            self.broken = True
+            raise
+        self._enc_chain = ciphertext[-bs:]
+        return ciphertext
+
+    def _decrypt_unlocked(self, iv, ciphertext):
+        bs = self.block_size
+        if not ciphertext or len(ciphertext) % bs:
+            raise ValueError("Ciphertext must be a non-empty multiple of the block size")
+
+        view = memoryview(ciphertext)
+        try:
+            first = _xor(self._decrypt(view[:bs]), _xor(iv, self._dec_chain))
+            plaintext = first + self._decrypt(view[bs:]) if len(ciphertext) > bs else first
+        except Exception:
+            self.broken = True
+            raise
+        self._dec_chain = bytes(view[-bs:])
+        return plaintext
+
+    def encrypt_many(self, ivs, padded_messages):
+        """
+        CBC-encrypt each message under its own IV (ivs holds them back to
+        back), taking the lock once for the whole batch
+        Returns: list of IV || ciphertext
+        """
+        bs = self.block_size
+        with self._lock:
+            return [
+                ivs[i * bs:(i + 1) * bs] + self._encrypt_unlocked(ivs[i * bs:(i + 1) * bs], padded)
+                for i, padded in enumerate(padded_messages)
+            ]
+
+    def decrypt_many(self, ciphertexts):
+        """
+        CBC-decrypt IV-prefixed ciphertexts, taking the lock once
+        Returns: list of padded plaintexts
+        """
+        bs = self.block_size
+        with self._lock:
+            return [self._decrypt_unlocked(bytes(c[:bs]), memoryview(c)[bs:]) for c in ciphertexts]
+
+
+class CipherContextPool:
+    """
+    LRU of cipher contexts keyed by (algorithm, key)
+    """
+
+    def __init__(self, max_size=64):
+        self.max_size = max_size
+        self._contexts = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, algorithm, key, factory):
+        """
+        Context for (algorithm, key), built with factory() on a miss
+        Returns: (context, reused)
+        """
+        pool_key = (algorithm, bytes(key))
+        with self._lock:
+            context = self._contexts.get(pool_key)
+            if context is not None and not context.broken:
+                self._contexts.move_to_end(pool_key)
+                return context, True
+
+        context = factory()
+        with self._lock:
+            self._contexts[pool_key] = context
+            self._contexts.move_to_end(pool_key)
+            while len(self._contexts) > self.max_size:
+                self._contexts.popitem(last=False)
+        return context, False
+
+    def clear(self):
+        """Drop every context (and the key material it holds)"""
+        with self._lock:
+            self._contexts.clear()
+
+    def _reset_after_fork(self):
+        """Start empty in a forked child: parent threads may hold the locks"""
+        self._lock = threading.Lock()
+        self._contexts = OrderedDict()
+
+
+# Shared by all cipher wrappers in this process
+default_pool = CipherContextPool()
+
+if hasattr(os, 'register_at_fork'):
+    os.register_at_fork(after_in_child=default_pool._reset_after_fork)
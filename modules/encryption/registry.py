@@ -0,0 +1,166 @@
+"""
+Algorithm Registry
+Single table of supported algorithms: name -> wrapper factory, key and
+nonce sizes and capabilities. Wrapper modules are imported on first use,
+so backends that are never requested are never loaded.
+
+Third-party packages can add algorithms through the
+'compare_algorithm.ciphers' entry point group; each entry point is a
+callable that receives the registry and calls register() on it.
+"""
+
+import os
+import importlib
+import threading
+
+ENTRY_POINT_GROUP = 'compare_algorithm.ciphers'
+
+# Capabilities used across the app
+ANALYZE = 'analyze'              # Compared by EncryptionAnalyzer
+AUTHENTICATED = 'authenticated'  # AEAD: tampering is detected on decrypt
+PADDING = 'padding'              # Block mode with PKCS7 padding
+STREAM = 'stream'                # Keystream, ciphertext length = plaintext length (+ nonce/tag)
+PARALLEL = 'parallel'            # Large inputs are split across threads
+FILE = 'file'                    # Offered by /secure-encrypt
+CONTAINER = 'container'          # Files use the segmented container format
+
+
+class AlgorithmSpec:
+    """
+    Registration of one algorithm
+
+    target is 'module:Class' and is only imported by load(). file_stream
+    names the MemoryEncryptor encrypt_stream_<x>/decrypt_stream_<x> pair
+    used for files (None for container or non-file algorithms).
+    """
+
+    def __init__(self, name, target=None, key_size=None, nonce_size=None, capabilities=(),
+                 file_stream=None, options=None):
+        self.name = name
+        self.target = target
+        self.key_size = key_size
+        self.nonce_size = nonce_size
+        self.capabilities = frozenset(capabilities)
+        self.file_stream = file_stream
+        self.options = options or {}
+        self._factory = None
+
+    def has(self, capability):
+        return capability in self.capabilities
+
+    def load(self):
+        """Import and return the wrapper class"""
+        if self._factory is None:
+            if self.target is None:
+                raise ValueError(f"{self.name} has no cipher wrapper")
+            module_name, _, attr = self.target.partition(':')
+            self._factory = getattr(importlib.import_module(module_name), attr)
+        return self._factory
+
+    def create(self):
+        """New wrapper instance"""
+        return self.load()(**self.options)
+
+    def generate_key_material(self):
+        """Random (key, iv_or_nonce) of the registered sizes"""
+        if not self.key_size:
+            raise ValueError(f"Unsupported algorithm: {self.name}")
+        return os.urandom(self.key_size), os.urandom(self.nonce_size or 0)
+
+
+class AlgorithmRegistry:
+    """
+    Name -> AlgorithmSpec, in registration order
+    """
+
+    def __init__(self, entry_point_group=ENTRY_POINT_GROUP):
+        self.entry_point_group = entry_point_group
+        self._specs = {}
+        self._plugins_loaded = False
+        self._lock = threading.Lock()
+
+    def register(self, name, target=None, key_size=None, nonce_size=None, capabilities=(),
+                 file_stream=None, options=None):
+        """
+        Register (or replace) an algorithm
+
+        Args:
+            name: Algorithm name used across the app
+            target: 'module:Class' of the cipher wrapper (None: not analyzable)
+            key_size: Key length in bytes
+            nonce_size: IV/nonce length in bytes
+            capabilities: Capability strings (see module constants)
+            file_stream: MemoryEncryptor stream method suffix for files
+            options: Keyword arguments for the wrapper constructor
+
+        Returns: AlgorithmSpec
+        """
+        spec = AlgorithmSpec(name, target, key_size, nonce_size, capabilities, file_stream, options)
+        self._specs[name] = spec
+        return spec
+
+    def _load_plugins(self):
+        """Run entry point registrations once"""
+        if self._plugins_loaded:
+            return
+        with self._lock:
+            if self._plugins_loaded:
+                return
+            self._plugins_loaded = True
+
+            from importlib.metadata import entry_points
+            for entry_point in entry_points(group=self.entry_point_group):
+                try:
+                    entry_point.load()(self)
+                except Exception as e:
+                    print(f"[REGISTRY] Plugin {entry_point.name} failed: {str(e)}")
+
+    def get(self, name):
+        """AlgorithmSpec by name, ValueError if unknown"""
+        spec = self._specs.get(name)
+        if spec is None:
+            self._load_plugins()
+            spec = self._specs.get(name)
+        if spec is None:
+            raise ValueError(f"Unsupported algorithm: {name}")
+        return spec
+
+    def names(self, capability=None):
+        """Registered names, optionally only those with a capability"""
+        self._load_plugins()
+        return [
+            name for name, spec in self._specs.items()
+            if capability is None or spec.has(capability)
+        ]
+
+    def create(self, name):
+        """New wrapper instance for name"""
+        return self.get(name).create()
+
+    def __contains__(self, name):
+        try:
+            self.get(name)
+        except ValueError:
+            return False
+        return True
+
+
+registry = AlgorithmRegistry()
+
+registry.register('AES', 'modules.encryption.aes:AESEncryption', 32, 16,
+                  (ANALYZE, PADDING, FILE), file_stream='aes', options={'key_size': 256})
+registry.register('DES', 'modules.encryption.des:DESEncryption', 8, 8,
+                  (ANALYZE, PADDING))
+registry.register('Blowfish', 'modules.encryption.blowfish:BlowfishEncryption', 16, 8,
+                  (ANALYZE, PADDING), options={'key_size': 128})
+registry.register('ChaCha20', 'modules.encryption.chacha20:ChaCha20Encryption', 32, 16,
+                  (ANALYZE, STREAM, FILE), file_stream='chacha20')
+registry.register('AES-GCM', 'modules.encryption.aes_gcm:AESGCMEncryption', 32, 12,
+                  (ANALYZE, AUTHENTICATED, FILE, CONTAINER))
+registry.register('AES-CTR', 'modules.encryption.aes_ctr:AESCTREncryption', 32, 16,
+                  (ANALYZE, STREAM, PARALLEL))
+registry.register('ChaCha20-Poly1305', 'modules.encryption.chacha20_poly1305:ChaCha20Poly1305Encryption', 32, 12,
+                  (ANALYZE, AUTHENTICATED, STREAM, FILE, CONTAINER))
+registry.register('XChaCha20-Poly1305', 'modules.encryption.xchacha20_poly1305:XChaCha20Poly1305Encryption', 32, 24,
+                  (ANALYZE, AUTHENTICATED, STREAM))
+registry.register('Fernet', capabilities=(FILE,), file_stream='fernet')
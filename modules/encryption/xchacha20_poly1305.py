@@ -0,0 +1,35 @@
+from Crypto.Cipher import ChaCha20_Poly1305
+from modules.encryption.aead import AEADEncryption
+
+class _XChaCha20Poly1305:
+    """pycryptodome XChaCha20-Poly1305 behind the cryptography AEAD interface"""
+    
+    def __init__(self, key):
+        self.key = key
+    
+    def encrypt(self, nonce, data, associated_data):
+        cipher = ChaCha20_Poly1305.new(key=self.key, nonce=nonce)
+        if associated_data:
+            cipher.update(associated_data)
+        ciphertext, tag = cipher.encrypt_and_digest(data)
+        return ciphertext + tag
+    
+    def decrypt(self, nonce, data, associated_data):
+        cipher = ChaCha20_Poly1305.new(key=self.key, nonce=nonce)
+        if associated_data:
+            cipher.update(associated_data)
+        return cipher.decrypt_and_verify(data[:-16], data[-16:])
+
+class XChaCha20Poly1305Encryption(AEADEncryption):
+    """
+    XChaCha20-Poly1305 (192-bit nonce)
+    The extended nonce makes random nonces safe for practically unlimited
+    messages under one key
+    """
+    
+    NAME = 'XChaCha20-Poly1305'
+    MODE = 'Stream + Poly1305'
+    NONCE_SIZE = 24
+    
+    def _new_aead(self):
+        return _XChaCha20Poly1305(self.key)
@@ -0,0 +1,168 @@
+"""
+Job Queue Module
+Runs long analyses on background workers and tracks per-step progress
+so the web request only enqueues and the browser polls for status
+"""
+
+import time
+import uuid
+import threading
+from concurrent.futures import ThreadPoolExecutor
+
+
+class Job:
+    """
+    State of one background job
+
+    steps are the units of work reported as progress (for an analysis,
+    the algorithm names). Workers call step_done() as each one finishes,
+    so partial results are visible before the job completes; streaming
+    readers block in wait_for_updates() instead of polling.
+    """
+
+    QUEUED = 'queued'
+    RUNNING = 'running'
+    DONE = 'done'
+    FAILED = 'failed'
+
+    def __init__(self, user_id, steps):
+        self.id = uuid.uuid4().hex
+        self.user_id = user_id
+        self.status = self.QUEUED
+        self.steps = {name: 'pending' for name in steps}
+        self.results = []
+        self.updates = []
+        self.summary = {}
+        self.error = None
+        self.created_at = time.time()
+        self.started_at = None
+        self.finished_at = None
+        self._lock = threading.Condition()
+
+    @property
+    def finished(self):
+        return self.status in (self.DONE, self.FAILED)
+
+    def start(self):
+        with self._lock:
+            self.status = self.RUNNING
+            self.started_at = time.time()
+
+    def step_done(self, name, result=None, error=None):
+        """Record one finished step and its result (or error message)"""
+        with self._lock:
+            self.steps[name] = 'failed' if error else 'done'
+            if result is not None:
+                self.results.append(result)
+            self.updates.append((name, result, error))
+            self._lock.notify_all()
+
+    def finish(self, **summary):
+        """Mark the job done with extra summary fields"""
+        with self._lock:
+            self.summary = summary
+            self.status = self.DONE
+            self.finished_at = time.time()
+            self._lock.notify_all()
+
+    def fail(self, error):
+        with self._lock:
+            self.error = str(error)
+            self.status = self.FAILED
+            self.finished_at = time.time()
+            self._lock.notify_all()
+
+    def wait_for_updates(self, seen, timeout=None):
+        """
+        Block until there are step updates after the first seen ones, the
+        job finishes, or timeout expires
+        Returns: (new (name, result, error) updates, finished)
+        """
+        with self._lock:
+            self._lock.wait_for(lambda: len(self.updates) > seen or self.finished, timeout)
+            return self.updates[seen:], self.finished
+
+    def to_dict(self):
+        """JSON-serialisable snapshot"""
+        with self._lock:
+            total = len(self.steps)
+            completed = sum(1 for state in self.steps.values() if state != 'pending')
+            return {
+                'job_id': self.id,
+                'status': self.status,
+                'total': total,
+                'completed': completed,
+                'progress': round(100 * completed / total, 1) if total else 100.0,
+                'steps': dict(self.steps),
+                'results': list(self.results),
+                'error': self.error,
+                'elapsed_s': round((self.finished_at or time.time()) - (self.started_at or self.created_at), 3),
+                **self.summary
+            }
+
+
+class JobQueue:
+    """
+    Thread pool executing jobs, plus a registry of recent jobs
+
+    Finished jobs are kept for ttl seconds so their status can still be
+    polled, then dropped.
+    """
+
+    def __init__(self, max_workers=1, ttl=3600):
+        """
+        Args:
+            max_workers: Jobs executed concurrently
+            ttl: Seconds a finished job stays queryable
+        """
+        self.ttl = ttl
+        self._executor = ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix='job')
+        self._jobs = {}
+        self._lock = threading.Lock()
+
+    def submit(self, func, user_id, steps, *args, **kwargs):
+        """
+        Queue func(job, *args, **kwargs)
+        func reports progress through job.step_done() and calls job.finish();
+        an exception marks the job failed
+        Returns: Job
+        """
+        job = Job(user_id, steps)
+        with self._lock:
+            self._prune()
+            self._jobs[job.id] = job
+
+        self._executor.submit(self._run, job, func, args, kwargs)
+        return job
+
+    def get(self, job_id, user_id=None):
+        """Job by id (optionally only if owned by user_id), or None"""
+        with self._lock:
+            job = self._jobs.get(job_id)
+        if job is None or (user_id is not None and job.user_id != user_id):
+            return None
+        return job
+
+    def _run(self, job, func, args, kwargs):
+        job.start()
+        try:
+            func(job, *args, **kwargs)
+            if not job.finished:
+                job.finish()
+        except Exception as e:
+            print(f"[JOB] {job.id} failed: {str(e)}")
+            job.fail(e)
+
+    def _prune(self):
+        """Drop finished jobs older than ttl (caller holds the lock)"""
+        cutoff = time.time() - self.ttl
+        expired = [
+            job_id for job_id, job in self._jobs.items()
+            if job.finished and job.finished_at < cutoff
+        ]
+        for job_id in expired:
+            del self._jobs[job_id]
+
+    def shutdown(self):
+        """Wait for running jobs and stop the workers"""
+        self._executor.shutdown(wait=True, cancel_futures=True)
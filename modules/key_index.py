@@ -0,0 +1,126 @@
+"""
+Key Index Module
+In-memory secondary indexes over key vault metadata
+"""
+
+from bisect import bisect_left, bisect_right, insort
+
+
+def encode_cursor(entry):
+    """Opaque pagination cursor for an index entry"""
+    created_at, key_id = entry
+    return f"{created_at}|{key_id}"
+
+
+def decode_cursor(cursor):
+    """Inverse of encode_cursor"""
+    created_at, sep, key_id = cursor.partition('|')
+    if not sep:
+        raise ValueError(f"Invalid cursor: {cursor}")
+    return created_at, key_id
+
+
+class KeyIndex:
+    """
+    Secondary indexes by user, algorithm, user + algorithm and creation time
+
+    Every index holds (created_at, key_id) tuples in sorted order, so a
+    filtered, paginated listing is one bisect plus a slice rather than a
+    scan over all keys.
+    """
+
+    def __init__(self):
+        self.by_time = []
+        self.by_user = {}
+        self.by_algorithm = {}
+        self.by_user_algorithm = {}
+
+    def _buckets(self, key_data):
+        """(index dict, value) pairs a key belongs to"""
+        return (
+            (self.by_user, key_data['user']),
+            (self.by_algorithm, key_data['algorithm']),
+            (self.by_user_algorithm, (key_data['user'], key_data['algorithm']))
+        )
+
+    def rebuild(self, keys):
+        """Rebuild all indexes from a key_id -> key data dict"""
+        self.__init__()
+        for key_id, key_data in keys.items():
+            entry = (key_data['created_at'], key_id)
+            self.by_time.append(entry)
+            for index, value in self._buckets(key_data):
+                index.setdefault(value, []).append(entry)
+
+        self.by_time.sort()
+        for index in (self.by_user, self.by_algorithm, self.by_user_algorithm):
+            for entries in index.values():
+                entries.sort()
+
+    def add(self, key_id, key_data):
+        """Index a new key"""
+        entry = (key_data['created_at'], key_id)
+        insort(self.by_time, entry)
+        for index, value in self._buckets(key_data):
+            insort(index.setdefault(value, []), entry)
+
+    def remove(self, key_id, key_data):
+        """Drop a key from every index"""
+        entry = (key_data['created_at'], key_id)
+        self._discard(self.by_time, entry)
+        for index, value in self._buckets(key_data):
+            entries = index.get(value)
+            if entries is None:
+                continue
+            self._discard(entries, entry)
+            if not entries:
+                del index[value]
+
+    @staticmethod
+    def _discard(entries, entry):
+        """Remove entry from a sorted list if present"""
+        i = bisect_left(entries, entry)
+        if i < len(entries) and entries[i] == entry:
+            del entries[i]
+
+    def select(self, user=None, algorithm=None):
+        """Sorted entry list for a filter (shared, do not modify)"""
+        if user is not None and algorithm is not None:
+            return self.by_user_algorithm.get((user, algorithm), [])
+        if user is not None:
+            return self.by_user.get(user, [])
+        if algorithm is not None:
+            return self.by_algorithm.get(algorithm, [])
+        return self.by_time
+
+    def count(self, user=None, algorithm=None):
+        """Number of keys matching a filter"""
+        return len(self.select(user, algorithm))
+
+    def page(self, user=None, algorithm=None, cursor=None, limit=50, newest_first=True):
+        """
+        One page of (created_at, key_id) entries matching a filter
+
+        Args:
+            cursor: Cursor of the last entry of the previous page
+            limit: Maximum entries per page
+            newest_first: Order by creation time descending
+
+        Returns:
+            (entries, next_cursor) - next_cursor is None on the last page
+        """
+        entries = self.select(user, algorithm)
+        position = decode_cursor(cursor) if cursor else None
+
+        if newest_first:
+            end = bisect_left(entries, position) if position else len(entries)
+            start = max(0, end - limit)
+            page = entries[start:end][::-1]
+            has_more = start > 0
+        else:
+            start = bisect_right(entries, position) if position else 0
+            page = entries[start:start + limit]
+            has_more = start + limit < len(entries)
+
+        next_cursor = encode_cursor(page[-1]) if page and has_more else None
+        return page, next_cursor
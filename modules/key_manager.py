@@ -1,10 +1,8 @@
 import os
-import json
-import base64
 from datetime import datetime
-from cryptography.hazmat.primitives.ciphers import Cipher, algorithms, modes
-from cryptography.hazmat.backends import default_backend
-from cryptography.hazmat.primitives import padding
+from modules.key_vault import KeyVault
+from modules.key_index import KeyIndex
+from modules.encryption.registry import registry
 import logging
 
 class KeyManager:
@@ -15,6 +13,8 @@ class KeyManager:
         self.vault_path = vault_path
         self.audit_log_path = audit_log_path
         self.master_key = self._get_or_create_master_key()
+        self.vault = KeyVault(vault_path, self.master_key)
+        self.index = KeyIndex()
         self.keys = {}
         self._load_keys()
         
@@ -39,109 +39,27 @@ class KeyManager:
                 f.write(master_key)
             return master_key
     
-    def _encrypt_vault(self, data):
-        """Encrypt vault data using master key"""
-        iv = os.urandom(16)
-        cipher = Cipher(
-            algorithms.AES(self.master_key),
-            modes.CBC(iv),
-            backend=default_backend()
-        )
-        encryptor = cipher.encryptor()
-        
-        # Pad data
-        padder = padding.PKCS7(128).padder()
-        padded_data = padder.update(data.encode('utf-8')) + padder.finalize()
-        
-        # Encrypt
-        ciphertext = encryptor.update(padded_data) + encryptor.finalize()
-        
-        # Return IV + ciphertext
-        return iv + ciphertext
-    
-    def _decrypt_vault(self, encrypted_data):
-        """Decrypt vault data using master key"""
-        iv = encrypted_data[:16]
-        ciphertext = encrypted_data[16:]
-        
-        cipher = Cipher(
-            algorithms.AES(self.master_key),
-            modes.CBC(iv),
-            backend=default_backend()
-        )
-        decryptor = cipher.decryptor()
-        
-        # Decrypt
-        padded_plaintext = decryptor.update(ciphertext) + decryptor.finalize()
-        
-        # Unpad
-        unpadder = padding.PKCS7(128).unpadder()
-        plaintext = unpadder.update(padded_plaintext) + unpadder.finalize()
-        
-        return plaintext.decode('utf-8')
-    
     def _load_keys(self):
-        """Load keys from encrypted vault"""
-        if os.path.exists(self.vault_path):
-            try:
-                with open(self.vault_path, 'rb') as f:
-                    encrypted_data = f.read()
-                
-                if encrypted_data:
-                    decrypted_data = self._decrypt_vault(encrypted_data)
-                    self.keys = json.loads(decrypted_data)
-                    
-                    # Convert base64 strings back to bytes
-                    for key_id, key_data in self.keys.items():
-                        key_data['key'] = base64.b64decode(key_data['key'])
-                        key_data['iv_or_nonce'] = base64.b64decode(key_data['iv_or_nonce'])
-            except Exception as e:
-                logging.error(f"Error loading keys: {str(e)}")
-                self.keys = {}
-    
-    def _save_keys(self):
-        """Save keys to encrypted vault"""
-        # Convert bytes to base64 for JSON serialization
-        serializable_keys = {}
-        for key_id, key_data in self.keys.items():
-            serializable_keys[key_id] = {
-                'key': base64.b64encode(key_data['key']).decode('utf-8'),
-                'iv_or_nonce': base64.b64encode(key_data['iv_or_nonce']).decode('utf-8'),
-                'algorithm': key_data['algorithm'],
-                'created_at': key_data['created_at'],
-                'user': key_data['user']
-            }
-        
-        # Encrypt and save
-        json_data = json.dumps(serializable_keys)
-        encrypted_data = self._encrypt_vault(json_data)
-        
-        os.makedirs(os.path.dirname(self.vault_path), exist_ok=True)
-        with open(self.vault_path, 'wb') as f:
-            f.write(encrypted_data)
+        """Replay the append-only key vault (migrates the old single-blob format)"""
+        try:
+            self.keys = self.vault.load()
+        except Exception as e:
+            # Starting with an empty vault would append new records onto the
+            # unreadable file and lose every stored key
+            logging.error(f"Error loading keys: {str(e)}")
+            raise RuntimeError(f"Key vault {self.vault_path} could not be loaded: {str(e)}") from e
+        self.index.rebuild(self.keys)
     
-    def create_key(self, algorithm, user='system'):
+    def create_key(self, algorithm, user='system', rotated_from=None):
         """
         Create and store a new encryption key
+        Appends a single record to the vault instead of rewriting it
         Returns: key_id
         """
-        key_id = f"{algorithm}_{datetime.now().strftime('%Y%m%d_%H%M%S_%f')}"
+        # Key and IV/nonce sizes come from the algorithm registry
+        key, iv_or_nonce = registry.get(algorithm).generate_key_material()
         
-        # Generate key based on algorithm
-        if algorithm == 'AES':
-            key = os.urandom(32)  # 256-bit
-            iv_or_nonce = os.urandom(16)
-        elif algorithm == 'DES':
-            key = os.urandom(8)
-            iv_or_nonce = os.urandom(8)
-        elif algorithm == 'Blowfish':
-            key = os.urandom(16)  # 128-bit
-            iv_or_nonce = os.urandom(8)
-        elif algorithm == 'ChaCha20':
-            key = os.urandom(32)  # 256-bit
-            iv_or_nonce = os.urandom(16)
-        else:
-            raise ValueError(f"Unsupported algorithm: {algorithm}")
+        key_id = f"{algorithm}_{datetime.now().strftime('%Y%m%d_%H%M%S_%f')}"
         
         # Store key
         self.keys[key_id] = {
@@ -151,8 +69,11 @@ class KeyManager:
             'created_at': datetime.now().isoformat(),
             'user': user
         }
+        if rotated_from:
+            self.keys[key_id]['rotated_from'] = rotated_from
         
-        self._save_keys()
+        self.vault.put(key_id, self.keys[key_id], live_keys=self.keys)
+        self.index.add(key_id, self.keys[key_id])
         
         # Audit log
         logging.info(f"Key created - ID: {key_id}, Algorithm: {algorithm}, User: {user}")
@@ -183,7 +104,7 @@ class KeyManager:
             raise ValueError(f"Key not found: {old_key_id}")
         
         algorithm = self.keys[old_key_id]['algorithm']
-        new_key_id = self.create_key(algorithm, user)
+        new_key_id = self.create_key(algorithm, user, rotated_from=old_key_id)
         
         # Audit log
         logging.info(f"Key rotated - Old ID: {old_key_id}, New ID: {new_key_id}, User: {user}")
@@ -195,24 +116,46 @@ class KeyManager:
         if key_id not in self.keys:
             raise ValueError(f"Key not found: {key_id}")
         
-        algorithm = self.keys[key_id]['algorithm']
-        del self.keys[key_id]
-        self._save_keys()
+        key_data = self.keys.pop(key_id)
+        algorithm = key_data['algorithm']
+        self.vault.delete(key_id, live_keys=self.keys)
+        self.index.remove(key_id, key_data)
         
         # Audit log
         logging.info(f"Key deleted - ID: {key_id}, Algorithm: {algorithm}, User: {user}")
     
-    def list_keys(self):
-        """List all keys (without exposing actual key values)"""
+    def _key_metadata(self, key_id):
+        """Public metadata of a key (no key material)"""
+        key_data = self.keys[key_id]
+        return {
+            'algorithm': key_data['algorithm'],
+            'created_at': key_data['created_at'],
+            'user': key_data['user']
+        }
+    
+    def list_keys(self, user=None, algorithm=None):
+        """List keys, optionally filtered (without exposing actual key values)"""
         return {
-            key_id: {
-                'algorithm': key_data['algorithm'],
-                'created_at': key_data['created_at'],
-                'user': key_data['user']
-            }
-            for key_id, key_data in self.keys.items()
+            key_id: self._key_metadata(key_id)
+            for _, key_id in self.index.select(user, algorithm)
         }
     
+    def list_keys_page(self, user=None, algorithm=None, cursor=None, limit=50, newest_first=True):
+        """
+        Paginated key listing served from the secondary indexes
+        Returns: {'keys': [...], 'next_cursor': str or None, 'total': int}
+        """
+        entries, next_cursor = self.index.page(user, algorithm, cursor, limit, newest_first)
+        return {
+            'keys': [dict(key_id=key_id, **self._key_metadata(key_id)) for _, key_id in entries],
+            'next_cursor': next_cursor,
+            'total': self.index.count(user, algorithm)
+        }
+    
+    def count_keys(self, user=None, algorithm=None):
+        """Number of keys matching a filter"""
+        return self.index.count(user, algorithm)
+    
     def get_audit_logs(self, limit=100):
         """Get recent audit logs"""
         if not os.path.exists(self.audit_log_path):
@@ -0,0 +1,214 @@
+"""
+Append-Only Key Vault
+Stores one encrypted record per key operation instead of rewriting the
+whole vault, with periodic compaction
+
+File layout:
+    magic    5 bytes  b'KVLT\\x01'
+    records  each: uint32 length + 12-byte nonce + AES-256-GCM(JSON record)
+
+Records are {"op": "put", "key_id": ..., "data": {...}} or
+{"op": "delete", "key_id": ...}. Replaying them in order yields the live
+keys; compaction rewrites the file with one "put" per live key.
+"""
+
+import os
+import json
+import base64
+import struct
+import logging
+import threading
+from cryptography.hazmat.primitives.ciphers import Cipher, algorithms, modes
+from cryptography.hazmat.primitives.ciphers.aead import AESGCM
+from cryptography.hazmat.backends import default_backend
+from cryptography.hazmat.primitives import padding
+
+VAULT_MAGIC = b'KVLT\x01'
+NONCE_SIZE = 12
+_LENGTH = struct.Struct('>I')
+
+# Fields of a key record stored as base64
+_BINARY_FIELDS = ('key', 'iv_or_nonce')
+
+
+class KeyVault:
+    """
+    Encrypted append-only record log for KeyManager
+    """
+
+    def __init__(self, path, master_key, compaction_ratio=2.0, min_compaction_records=64):
+        """
+        Args:
+            path: Vault file path
+            master_key: 256-bit key encrypting every record
+            compaction_ratio: Compact once records exceed ratio * live keys
+            min_compaction_records: Never compact below this many records
+        """
+        self.path = path
+        self.aead = AESGCM(master_key)
+        self.master_key = master_key
+        self.compaction_ratio = compaction_ratio
+        self.min_compaction_records = min_compaction_records
+        self.record_count = 0
+        self.live_count = 0
+        self._lock = threading.Lock()
+
+    def load(self):
+        """
+        Replay the vault
+        Returns: dict of key_id -> key data (binary fields as bytes)
+        Raises if the vault cannot be read or migrated, so a damaged vault is
+        never mistaken for an empty one and overwritten
+        """
+        if not os.path.exists(self.path):
+            return {}
+
+        with open(self.path, 'rb') as f:
+            magic = f.read(len(VAULT_MAGIC))
+            if magic != VAULT_MAGIC:
+                f.seek(0)
+                legacy_data = f.read()
+            else:
+                legacy_data = None
+
+        if legacy_data is not None:
+            # Whole-file JSON vault from older versions: migrate it once the
+            # file is closed (os.replace fails on an open file on Windows)
+            keys = self._load_legacy(legacy_data)
+            self.compact(keys)
+            return keys
+
+        with open(self.path, 'rb') as f:
+            f.seek(len(VAULT_MAGIC))
+            keys = {}
+            records = 0
+            good_offset = f.tell()
+            while True:
+                record = self._read_record(f)
+                if record is None:
+                    break
+                records += 1
+                good_offset = f.tell()
+
+                if record['op'] == 'put':
+                    keys[record['key_id']] = self._decode(record['data'])
+                elif record['op'] == 'delete':
+                    keys.pop(record['key_id'], None)
+
+        # Drop a torn record left by an interrupted append
+        if good_offset < os.path.getsize(self.path):
+            logging.error(f"Key vault: discarding truncated record at offset {good_offset}")
+            with open(self.path, 'r+b') as f:
+                f.truncate(good_offset)
+
+        self.record_count = records
+        self.live_count = len(keys)
+        return keys
+
+    def put(self, key_id, key_data, live_keys=None):
+        """Append a create/rotate record"""
+        self._append({'op': 'put', 'key_id': key_id, 'data': self._encode(key_data)}, delta=1, live_keys=live_keys)
+
+    def delete(self, key_id, live_keys=None):
+        """Append a delete record"""
+        self._append({'op': 'delete', 'key_id': key_id}, delta=-1, live_keys=live_keys)
+
+    def compact(self, keys):
+        """Rewrite the vault with one record per live key"""
+        with self._lock:
+            self._compact(keys)
+
+    def _append(self, record, delta, live_keys):
+        """Append one record, compacting when dead records dominate"""
+        with self._lock:
+            if not os.path.exists(self.path):
+                self._compact({})
+
+            with open(self.path, 'ab') as f:
+                f.write(self._encode_record(record))
+                f.flush()
+                os.fsync(f.fileno())
+
+            self.record_count += 1
+            if live_keys is not None:
+                # Exact count: a put may overwrite an existing key
+                self.live_count = len(live_keys)
+            else:
+                self.live_count = max(0, self.live_count + delta)
+
+            threshold = max(self.min_compaction_records, self.compaction_ratio * self.live_count)
+            if live_keys is not None and self.record_count > threshold:
+                self._compact(live_keys)
+
+    def _compact(self, keys):
+        """Write all live keys to a new file and atomically replace the vault"""
+        os.makedirs(os.path.dirname(self.path) or '.', exist_ok=True)
+        tmp_path = self.path + '.tmp'
+
+        with open(tmp_path, 'wb') as f:
+            f.write(VAULT_MAGIC)
+            for key_id, key_data in keys.items():
+                f.write(self._encode_record({'op': 'put', 'key_id': key_id, 'data': self._encode(key_data)}))
+            f.flush()
+            os.fsync(f.fileno())
+
+        os.replace(tmp_path, self.path)
+        self.record_count = len(keys)
+        self.live_count = len(keys)
+
+    def _encode_record(self, record):
+        """Frame and encrypt a record"""
+        nonce = os.urandom(NONCE_SIZE)
+        ciphertext = self.aead.encrypt(nonce, json.dumps(record).encode('utf-8'), VAULT_MAGIC)
+        return _LENGTH.pack(NONCE_SIZE + len(ciphertext)) + nonce + ciphertext
+
+    def _read_record(self, f):
+        """Read and decrypt the next record, None at end or on a torn tail"""
+        header = f.read(_LENGTH.size)
+        if len(header) < _LENGTH.size:
+            return None
+
+        (length,) = _LENGTH.unpack(header)
+        body = f.read(length)
+        if len(body) < length:
+            return None
+
+        plaintext = self.aead.decrypt(body[:NONCE_SIZE], body[NONCE_SIZE:], VAULT_MAGIC)
+        return json.loads(plaintext)
+
+    def _encode(self, key_data):
+        """Key data with binary fields as base64 strings"""
+        encoded = dict(key_data)
+        for field in _BINARY_FIELDS:
+            encoded[field] = base64.b64encode(key_data[field]).decode('utf-8')
+        return encoded
+
+    def _decode(self, encoded):
+        """Inverse of _encode"""
+        key_data = dict(encoded)
+        for field in _BINARY_FIELDS:
+            key_data[field] = base64.b64decode(encoded[field])
+        return key_data
+
+    def _load_legacy(self, encrypted_data):
+        """Decrypt the old single-blob vault (IV + AES-CBC(JSON))"""
+        if not encrypted_data:
+            return {}
+
+        iv = encrypted_data[:16]
+        ciphertext = encrypted_data[16:]
+
+        decryptor = Cipher(
+            algorithms.AES(self.master_key),
+            modes.CBC(iv),
+            backend=default_backend()
+        ).decryptor()
+        padded_plaintext = decryptor.update(ciphertext) + decryptor.finalize()
+
+        unpadder = padding.PKCS7(128).unpadder()
+        plaintext = unpadder.update(padded_plaintext) + unpadder.finalize()
+
+        return {
+            key_id: self._decode(key_data)
+            for key_id, key_data in json.loads(plaintext.decode('utf-8')).items()
+        }
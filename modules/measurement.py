@@ -0,0 +1,314 @@
+"""
+Performance Measurement Module
+Non-blocking wall time, CPU and memory probes shared by the cipher wrappers
+"""
+
+import os
+import math
+import time
+import threading
+import statistics
+import contextvars
+import tracemalloc
+from functools import wraps
+
+# Memory instrumentation modes accepted by MemoryProfile
+MEMORY_MODES = ('off', 'tracemalloc', 'rss')
+
+# tracemalloc is process-wide: only one thread may trace at a time
+_tracemalloc_lock = threading.RLock()
+
+# MemoryProfile active in the current thread/context, if any
+_active_profile = contextvars.ContextVar('memory_profile', default=None)
+
+
+def _reset_after_fork():
+    """Forked children start untraced with a fresh lock (another parent thread may hold it)"""
+    global _tracemalloc_lock
+    _tracemalloc_lock = threading.RLock()
+    if tracemalloc.is_tracing():
+        tracemalloc.stop()
+
+
+if hasattr(os, 'register_at_fork'):
+    os.register_at_fork(after_in_child=_reset_after_fork)
+
+
+def _process_memory():
+    """Unique set size of this process in bytes (RSS where USS is unavailable)"""
+    import psutil
+
+    process = psutil.Process()
+    try:
+        return process.memory_full_info().uss
+    except (psutil.AccessDenied, AttributeError):
+        return process.memory_info().rss
+
+
+class MemoryProfile:
+    """
+    Memory instrumentation for one analysis
+
+    While active, Measurement blocks record their memory according to mode:
+
+    - 'off': nothing is traced, memory is reported as 0
+    - 'tracemalloc': peak Python allocations of the first and then every
+      sample_every-th call of each operation, traced under a global lock
+    - 'rss': growth of the process USS around each call; only meaningful
+      in a process of its own (see parallel.analyze_isolated), and it
+      includes memory allocated inside OpenSSL/pycryptodome
+
+    Blocks run under suspended() record nothing, so timed benchmark
+    repetitions are never slowed down by tracing.
+    """
+
+    def __init__(self, mode='off', sample_every=1):
+        """
+        Args:
+            mode: One of MEMORY_MODES
+            sample_every: Trace every n-th call per operation in 'tracemalloc' mode
+        """
+        if mode not in MEMORY_MODES:
+            raise ValueError(f"Unsupported memory mode: {mode}")
+
+        self.mode = mode
+        self.sample_every = max(1, int(sample_every))
+        self.peaks = {}
+        self._calls = {}
+        self._token = None
+        self._suspended = False
+
+    def __enter__(self):
+        self._token = _active_profile.set(self)
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        _active_profile.reset(self._token)
+        self._token = None
+        return False
+
+    def suspended(self):
+        """Context manager pausing memory recording for the enclosed block"""
+        return _SuspendedProfile(self)
+
+    def should_sample(self, operation):
+        """Count a call of operation and decide whether to trace it"""
+        if self._suspended:
+            return False
+        calls = self._calls.get(operation, 0)
+        self._calls[operation] = calls + 1
+        return calls % self.sample_every == 0
+
+    def record(self, operation, peak_bytes):
+        """Keep the largest sample per operation"""
+        self.peaks[operation] = max(self.peaks.get(operation, 0), peak_bytes)
+
+    def memory_mb(self, operation):
+        """Largest recorded sample of operation in MB (0.0 if never sampled)"""
+        return self.peaks.get(operation, 0) / (1024 * 1024)
+
+
+class _SuspendedProfile:
+    """Context manager returned by MemoryProfile.suspended()"""
+
+    def __init__(self, profile):
+        self.profile = profile
+        self._previous = False
+
+    def __enter__(self):
+        self._previous, self.profile._suspended = self.profile._suspended, True
+        return self.profile
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        self.profile._suspended = self._previous
+        return False
+
+
+class Measurement:
+    """
+    Context manager measuring the enclosed block without sleeping
+
+    CPU utilisation is the CPU time of the calling thread (thread_time_ns)
+    over the wall time delta (perf_counter_ns), so other threads in the
+    process (audit writer, jobs) are not counted and 100% means the block
+    kept one core busy. Blocks that fan out to worker threads pass
+    threaded=True to count the whole process (process_time_ns, with
+    os.times as a fallback) instead.
+
+    Memory follows the active MemoryProfile; with no profile active,
+    memory is only traced when trace_memory=True is passed explicitly.
+    """
+
+    def __init__(self, operation=None, trace_memory=None, threaded=False):
+        """
+        Args:
+            operation: Name the active MemoryProfile records samples under
+            trace_memory: Force tracemalloc on/off (None: follow the profile)
+            threaded: The block runs work on other threads; count process
+                      CPU time instead of this thread's
+        """
+        self.operation = operation
+        self.trace_memory = trace_memory
+        self.threaded = threaded
+        self._cpu_clock = time.process_time_ns if threaded else time.thread_time_ns
+        self.wall_ns = 0
+        self.cpu_ns = 0
+        self.user_time = 0.0
+        self.system_time = 0.0
+        self.peak_memory = 0
+        self._profile = None
+        self._memory_mode = 'off'
+        self._stop_tracing = False
+
+    def _select_memory_mode(self):
+        """Memory mode for this block"""
+        if self.trace_memory is not None:
+            return 'tracemalloc' if self.trace_memory else 'off'
+
+        profile = _active_profile.get()
+        if profile is None or profile.mode == 'off' or profile._suspended:
+            return 'off'
+
+        self._profile = profile
+        if profile.mode == 'tracemalloc' and not profile.should_sample(self.operation):
+            return 'off'
+        return profile.mode
+
+    def __enter__(self):
+        self._memory_mode = self._select_memory_mode()
+
+        if self._memory_mode == 'tracemalloc':
+            _tracemalloc_lock.acquire()
+            if tracemalloc.is_tracing():
+                tracemalloc.reset_peak()
+            else:
+                tracemalloc.start()
+                self._stop_tracing = True
+        elif self._memory_mode == 'rss':
+            self._memory_start = _process_memory()
+
+        self._times_start = os.times()
+        self._cpu_start = self._cpu_clock()
+        self._wall_start = time.perf_counter_ns()
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        self.wall_ns = time.perf_counter_ns() - self._wall_start
+        self.cpu_ns = self._cpu_clock() - self._cpu_start
+        times_end = os.times()
+
+        self.user_time = times_end.user - self._times_start.user
+        self.system_time = times_end.system - self._times_start.system
+
+        # Coarse process clocks can report 0 for short blocks
+        if self.cpu_ns == 0 and self.threaded:
+            self.cpu_ns = int((self.user_time + self.system_time) * 1e9)
+
+        if self._memory_mode == 'tracemalloc':
+            try:
+                _, self.peak_memory = tracemalloc.get_traced_memory()
+                if self._stop_tracing:
+                    tracemalloc.stop()
+                    self._stop_tracing = False
+            finally:
+                _tracemalloc_lock.release()
+        elif self._memory_mode == 'rss':
+            self.peak_memory = max(0, _process_memory() - self._memory_start)
+
+        if self._profile is not None and self._memory_mode != 'off':
+            self._profile.record(self.operation, self.peak_memory)
+
+        return False
+
+    @property
+    def elapsed_ms(self):
+        """Wall time in milliseconds"""
+        return self.wall_ns / 1e6
+
+    @property
+    def cpu_time_ms(self):
+        """CPU time (thread, or process when threaded) in milliseconds"""
+        return self.cpu_ns / 1e6
+
+    @property
+    def cpu_percent(self):
+        """CPU time as a percentage of wall time"""
+        if self.wall_ns <= 0:
+            return 0.0
+        return self.cpu_ns / self.wall_ns * 100
+
+    @property
+    def memory_mb(self):
+        """Peak traced memory (or USS growth) in MB, 0 when not traced"""
+        return self.peak_memory / (1024 * 1024)
+
+
+def measured(func=None, trace_memory=None):
+    """
+    Decorator running func inside a Measurement
+    The decorated function returns (result, measurement)
+    """
+    def decorator(f):
+        @wraps(f)
+        def wrapper(*args, **kwargs):
+            with Measurement(f.__name__, trace_memory=trace_memory) as m:
+                result = f(*args, **kwargs)
+            return result, m
+        return wrapper
+
+    if func is not None:
+        return decorator(func)
+    return decorator
+
+
+# Two-sided 95% Student t critical values by degrees of freedom
+_T_95 = {
+    1: 12.706, 2: 4.303, 3: 3.182, 4: 2.776, 5: 2.571, 6: 2.447, 7: 2.365,
+    8: 2.306, 9: 2.262, 10: 2.228, 11: 2.201, 12: 2.179, 13: 2.160,
+    14: 2.145, 15: 2.131, 16: 2.120, 17: 2.110, 18: 2.101, 19: 2.093,
+    20: 2.086, 21: 2.080, 22: 2.074, 23: 2.069, 24: 2.064, 25: 2.060,
+    26: 2.056, 27: 2.052, 28: 2.048, 29: 2.045, 30: 2.042
+}
+
+
+def relative_standard_error(samples):
+    """Standard error of the mean divided by the mean"""
+    n = len(samples)
+    mean = statistics.fmean(samples) if n else 0.0
+    if n < 2 or mean == 0:
+        return float('inf')
+    return statistics.stdev(samples) / math.sqrt(n) / mean
+
+
+def summarize_samples(samples):
+    """
+    Summarize timing samples
+
+    Returns:
+        dict: n, mean, median, p95, stddev, ci95_low, ci95_high, rse
+    """
+    n = len(samples)
+    if n == 0:
+        return None
+
+    ordered = sorted(samples)
+    mean = statistics.fmean(ordered)
+    stddev = statistics.stdev(ordered) if n > 1 else 0.0
+
+    # Nearest-rank 95th percentile
+    p95 = ordered[max(0, math.ceil(0.95 * n) - 1)]
+
+    # Normal approximation beyond 30 degrees of freedom
+    t_value = _T_95.get(n - 1, 1.96)
+    half_width = t_value * stddev / math.sqrt(n) if n > 1 else 0.0
+
+    return {
+        'n': n,
+        'mean': round(mean, 4),
+        'median': round(statistics.median(ordered), 4),
+        'p95': round(p95, 4),
+        'stddev': round(stddev, 4),
+        'ci95_low': round(mean - half_width, 4),
+        'ci95_high': round(mean + half_width, 4),
+        'rse': round(relative_standard_error(ordered), 6) if n > 1 else None
+    }
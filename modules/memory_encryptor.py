@@ -5,12 +5,21 @@ Uses MASTER_KEY for key wrapping
 """
 
 import os
+import hmac
 import base64
 from io import BytesIO
 from cryptography.hazmat.primitives.ciphers import Cipher, algorithms, modes
 from cryptography.hazmat.backends import default_backend
 from cryptography.hazmat.primitives import padding
 from cryptography.fernet import Fernet
+from modules.container_format import (
+    ContainerHeader, ContainerError, DEFAULT_SEGMENT_SIZE,
+    is_container, iter_segments, new_aead, encrypt_segment, decrypt_segment, read_exact
+)
+from modules.encryption.registry import registry, FILE, CONTAINER
+
+# Bytes read per step by the streaming encrypt/decrypt methods
+DEFAULT_CHUNK_SIZE = 64 * 1024
 
 
 class MemoryEncryptor:
@@ -39,39 +48,43 @@ class MemoryEncryptor:
         Returns:
             tuple: (encrypted_data_stream, encrypted_key_stream)
         """
-        # Read file data into memory
-        file_data = file_stream.read()
+        encrypted_data_stream = BytesIO()
+        wrapped_key = self.encrypt_stream_aes(file_stream, encrypted_data_stream)
+        encrypted_data_stream.seek(0)
+        
+        return encrypted_data_stream, BytesIO(wrapped_key)
+    
+    def encrypt_stream_aes(self, src, dst, chunk_size=DEFAULT_CHUNK_SIZE):
+        """
+        Stream-encrypt with AES-256-CBC, reading src in fixed-size chunks
+        Output layout is IV + ciphertext, same as encrypt_file_aes
         
+        Args:
+            src: Readable file-like object with plaintext
+            dst: Writable file-like object for the encrypted data
+            chunk_size: Bytes read per step (peak memory is O(chunk_size))
+            
+        Returns:
+            bytes: Wrapped session key
+        """
         # Generate random session key (32 bytes for AES-256)
         session_key = os.urandom(32)
         iv = os.urandom(16)  # AES block size
         
-        # Encrypt file data with session key
-        cipher = Cipher(
+        encryptor = Cipher(
             algorithms.AES(session_key),
             modes.CBC(iv),
             backend=default_backend()
-        )
-        encryptor = cipher.encryptor()
-        
-        # Pad data
+        ).encryptor()
         padder = padding.PKCS7(128).padder()
-        padded_data = padder.update(file_data) + padder.finalize()
         
-        # Encrypt
-        ciphertext = encryptor.update(padded_data) + encryptor.finalize()
-        
-        # Combine IV + ciphertext
-        encrypted_data = iv + ciphertext
+        dst.write(iv)
+        for chunk in iter(lambda: src.read(chunk_size), b''):
+            dst.write(encryptor.update(padder.update(chunk)))
+        dst.write(encryptor.update(padder.finalize()) + encryptor.finalize())
         
         # Wrap session key with MASTER_KEY
-        wrapped_key = self._wrap_key(session_key)
-        
-        # Return as BytesIO streams
-        encrypted_data_stream = BytesIO(encrypted_data)
-        encrypted_key_stream = BytesIO(wrapped_key)
-        
-        return encrypted_data_stream, encrypted_key_stream
+        return self._wrap_key(session_key)
     
     def decrypt_file_aes(self, encrypted_data_stream, encrypted_key_stream):
         """
@@ -84,36 +97,41 @@ class MemoryEncryptor:
         Returns:
             BytesIO: Decrypted file data
         """
-        # Read encrypted data
-        encrypted_data = encrypted_data_stream.read()
-        wrapped_key = encrypted_key_stream.read()
+        plaintext_stream = BytesIO()
+        self.decrypt_stream_aes(encrypted_data_stream, plaintext_stream, encrypted_key_stream.read())
+        plaintext_stream.seek(0)
         
+        return plaintext_stream
+    
+    def decrypt_stream_aes(self, src, dst, wrapped_key, chunk_size=DEFAULT_CHUNK_SIZE):
+        """
+        Stream-decrypt AES-256-CBC data produced by encrypt_stream_aes
+        
+        Args:
+            src: Readable file-like object with IV + ciphertext
+            dst: Writable file-like object for the plaintext
+            wrapped_key: Wrapped session key bytes
+            chunk_size: Bytes read per step
+        """
         # Unwrap session key
         session_key = self._unwrap_key(wrapped_key)
+        iv = src.read(16)
         
-        # Extract IV and ciphertext
-        iv = encrypted_data[:16]
-        ciphertext = encrypted_data[16:]
-        
-        # Decrypt
-        cipher = Cipher(
+        decryptor = Cipher(
             algorithms.AES(session_key),
             modes.CBC(iv),
             backend=default_backend()
-        )
-        decryptor = cipher.decryptor()
-        padded_plaintext = decryptor.update(ciphertext) + decryptor.finalize()
-        
-        # Unpad
+        ).decryptor()
         unpadder = padding.PKCS7(128).unpadder()
-        plaintext = unpadder.update(padded_plaintext) + unpadder.finalize()
         
-        # Return as BytesIO stream
-        return BytesIO(plaintext)
+        for chunk in iter(lambda: src.read(chunk_size), b''):
+            dst.write(unpadder.update(decryptor.update(chunk)))
+        dst.write(unpadder.update(decryptor.finalize()) + unpadder.finalize())
     
     def encrypt_file_fernet(self, file_stream):
         """
         Encrypt file using Fernet (AES-128-CBC + HMAC) with random session key
+        A Fernet token authenticates the whole message, so this is not streamed
         
         Args:
             file_stream: BytesIO or file-like object
@@ -165,6 +183,19 @@ class MemoryEncryptor:
         # Return as BytesIO stream
         return BytesIO(plaintext)
     
+    def encrypt_stream_fernet(self, src, dst):
+        """
+        Fernet counterpart of the stream methods (the token is built in memory)
+        Returns: wrapped session key
+        """
+        encrypted_data_stream, encrypted_key_stream = self.encrypt_file_fernet(src)
+        dst.write(encrypted_data_stream.getvalue())
+        return encrypted_key_stream.getvalue()
+    
+    def decrypt_stream_fernet(self, src, dst, wrapped_key):
+        """Fernet counterpart of the stream methods"""
+        dst.write(self.decrypt_file_fernet(src, BytesIO(wrapped_key)).getvalue())
+    
     def encrypt_file_chacha20(self, file_stream):
         """
         Encrypt file using ChaCha20 with random session key
@@ -175,33 +206,42 @@ class MemoryEncryptor:
         Returns:
             tuple: (encrypted_data_stream, encrypted_key_stream)
         """
-        # Read file data into memory
-        file_data = file_stream.read()
+        encrypted_data_stream = BytesIO()
+        wrapped_key = self.encrypt_stream_chacha20(file_stream, encrypted_data_stream)
+        encrypted_data_stream.seek(0)
         
+        return encrypted_data_stream, BytesIO(wrapped_key)
+    
+    def encrypt_stream_chacha20(self, src, dst, chunk_size=DEFAULT_CHUNK_SIZE):
+        """
+        Stream-encrypt with ChaCha20, reading src in fixed-size chunks
+        Output layout is nonce + ciphertext, same as encrypt_file_chacha20
+        
+        Args:
+            src: Readable file-like object with plaintext
+            dst: Writable file-like object for the encrypted data
+            chunk_size: Bytes read per step (peak memory is O(chunk_size))
+            
+        Returns:
+            bytes: Wrapped session key
+        """
         # Generate random session key (32 bytes for ChaCha20)
         session_key = os.urandom(32)
         nonce = os.urandom(16)  # ChaCha20 nonce
         
-        # Encrypt file data with session key
-        cipher = Cipher(
+        encryptor = Cipher(
             algorithms.ChaCha20(session_key, nonce),
             mode=None,
             backend=default_backend()
-        )
-        encryptor = cipher.encryptor()
-        ciphertext = encryptor.update(file_data) + encryptor.finalize()
+        ).encryptor()
         
-        # Combine nonce + ciphertext
-        encrypted_data = nonce + ciphertext
+        dst.write(nonce)
+        for chunk in iter(lambda: src.read(chunk_size), b''):
+            dst.write(encryptor.update(chunk))
+        dst.write(encryptor.finalize())
         
         # Wrap session key with MASTER_KEY
-        wrapped_key = self._wrap_key(session_key)
-        
-        # Return as BytesIO streams
-        encrypted_data_stream = BytesIO(encrypted_data)
-        encrypted_key_stream = BytesIO(wrapped_key)
-        
-        return encrypted_data_stream, encrypted_key_stream
+        return self._wrap_key(session_key)
     
     def decrypt_file_chacha20(self, encrypted_data_stream, encrypted_key_stream):
         """
@@ -214,28 +254,157 @@ class MemoryEncryptor:
         Returns:
             BytesIO: Decrypted file data
         """
-        # Read encrypted data
-        encrypted_data = encrypted_data_stream.read()
-        wrapped_key = encrypted_key_stream.read()
+        plaintext_stream = BytesIO()
+        self.decrypt_stream_chacha20(encrypted_data_stream, plaintext_stream, encrypted_key_stream.read())
+        plaintext_stream.seek(0)
         
+        return plaintext_stream
+    
+    def decrypt_stream_chacha20(self, src, dst, wrapped_key, chunk_size=DEFAULT_CHUNK_SIZE):
+        """
+        Stream-decrypt ChaCha20 data produced by encrypt_stream_chacha20
+        
+        Args:
+            src: Readable file-like object with nonce + ciphertext
+            dst: Writable file-like object for the plaintext
+            wrapped_key: Wrapped session key bytes
+            chunk_size: Bytes read per step
+        """
         # Unwrap session key
         session_key = self._unwrap_key(wrapped_key)
+        nonce = src.read(16)
         
-        # Extract nonce and ciphertext
-        nonce = encrypted_data[:16]
-        ciphertext = encrypted_data[16:]
-        
-        # Decrypt
-        cipher = Cipher(
+        decryptor = Cipher(
             algorithms.ChaCha20(session_key, nonce),
             mode=None,
             backend=default_backend()
-        )
-        decryptor = cipher.decryptor()
-        plaintext = decryptor.update(ciphertext) + decryptor.finalize()
+        ).decryptor()
         
-        # Return as BytesIO stream
-        return BytesIO(plaintext)
+        for chunk in iter(lambda: src.read(chunk_size), b''):
+            dst.write(decryptor.update(chunk))
+        dst.write(decryptor.finalize())
+    
+    def encrypt_stream_container(self, src, dst, algorithm='AES-GCM', segment_size=DEFAULT_SEGMENT_SIZE):
+        """
+        Stream-encrypt into the segmented container format
+        Each segment is authenticated on its own (AES-GCM or ChaCha20-Poly1305)
+        
+        Args:
+            src: Readable file-like object with plaintext
+            dst: Writable file-like object for the container
+            algorithm: 'AES-GCM' or 'ChaCha20-Poly1305'
+            segment_size: Plaintext bytes per segment
+            
+        Returns:
+            bytes: Wrapped session key (also stored in the header)
+        """
+        session_key = os.urandom(32)
+        wrapped_key = self._wrap_key(session_key)
+        header = ContainerHeader.create(algorithm, wrapped_key, segment_size)
+        aead = new_aead(algorithm, session_key)
+        
+        dst.write(header.raw)
+        self._process_segments(encrypt_segment, aead, header, iter_segments(src, segment_size), dst)
+        
+        return wrapped_key
+    
+    def decrypt_stream_container(self, src, dst, wrapped_key=None):
+        """
+        Stream-decrypt a segmented container, authenticating every segment
+        The session key is taken from the container header
+        
+        Args:
+            src: Readable file-like object positioned at the container header
+            dst: Writable file-like object for the plaintext
+            wrapped_key: Key file supplied by the user; must match the
+                         header's wrapped key (None: not checked)
+        """
+        header = ContainerHeader.read(src)
+        if wrapped_key is not None and not hmac.compare_digest(wrapped_key, header.wrapped_key):
+            raise ContainerError("Key file does not belong to this container")
+        aead = new_aead(header.algorithm, self._unwrap_key(header.wrapped_key))
+        
+        segments = iter_segments(src, header.stored_segment_size)
+        self._process_segments(decrypt_segment, aead, header, segments, dst)
+    
+    def _process_segments(self, operation, aead, header, segments, dst):
+        """
+        Apply operation to each (index, data, last) segment, writing results in order
+        
+        Args:
+            operation: encrypt_segment or decrypt_segment
+            aead: AEAD primitive holding the session key
+            header: ContainerHeader of the container
+            segments: Iterable of (index, data, last)
+            dst: Writable file-like object
+        """
+        for index, data, last in segments:
+            dst.write(operation(aead, header, index, data, last))
+    
+    def read_container_segment(self, src, index):
+        """
+        Random access: decrypt a single segment of a container
+        
+        Args:
+            src: Seekable file-like object with the container
+            index: Segment number (0-based)
+            
+        Returns:
+            bytes: Plaintext of the segment
+        """
+        src.seek(0)
+        header = ContainerHeader.read(src)
+        count = header.segment_count(src.seek(0, os.SEEK_END))
+        if not 0 <= index < count:
+            raise IndexError(f"Segment {index} out of range (0-{count - 1})")
+        
+        src.seek(header.segment_offset(index))
+        segment = read_exact(src, header.stored_segment_size)
+        aead = new_aead(header.algorithm, self._unwrap_key(header.wrapped_key))
+        
+        return decrypt_segment(aead, header, index, segment, index == count - 1)
+    
+    def encrypt_stream(self, src, dst, algorithm, segment_size=DEFAULT_SEGMENT_SIZE):
+        """
+        Encrypt src into dst with any file algorithm from the registry
+        Container algorithms write the segmented format, the others use
+        their encrypt_stream_<file_stream> method
+        
+        Returns:
+            bytes: Wrapped session key (containers also store it in their header)
+        """
+        spec = registry.get(algorithm)
+        if not spec.has(FILE):
+            raise ValueError(f"Unsupported algorithm: {algorithm}")
+        
+        if spec.has(CONTAINER):
+            return self.encrypt_stream_container(src, dst, algorithm, segment_size)
+        return getattr(self, f'encrypt_stream_{spec.file_stream}')(src, dst)
+    
+    def decrypt_stream(self, src, dst, wrapped_key, algorithm):
+        """
+        Decrypt any supported format into dst
+        Containers are recognised by their header, older IV + ciphertext
+        files are decrypted according to algorithm
+        
+        Args:
+            src: Seekable file-like object with encrypted data
+            dst: Writable file-like object for the plaintext
+            wrapped_key: Wrapped session key (for containers it must match the header)
+            algorithm: Registry name with a file_stream ('AES', 'ChaCha20', 'Fernet') for legacy files
+        """
+        start = src.tell()
+        prefix = src.read(5)
+        src.seek(start)
+        
+        if is_container(prefix):
+            self.decrypt_stream_container(src, dst, wrapped_key)
+            return
+        
+        spec = registry.get(algorithm)
+        if not spec.file_stream:
+            raise ValueError(f"Unsupported algorithm: {algorithm}")
+        getattr(self, f'decrypt_stream_{spec.file_stream}')(src, dst, wrapped_key)
     
     def _wrap_key(self, session_key):
         """
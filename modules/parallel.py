@@ -0,0 +1,199 @@
+"""
+Parallel Analysis Module
+Runs EncryptionAnalyzer.analyze_algorithm calls on a persistent process pool
+The plaintext is handed to workers through shared memory
+"""
+
+import os
+import atexit
+import multiprocessing
+from concurrent.futures import ProcessPoolExecutor, as_completed
+from multiprocessing import shared_memory
+
+# Per-process analyzer created by the pool initializer
+_worker_analyzer = None
+
+# Fresh measurement processes (rss memory mode, sandbox) rely on fork: the
+# child starts with the parent's pages shared and nothing to re-import.
+# Platforms without it (Windows) do not offer these features.
+ISOLATION_SUPPORTED = 'fork' in multiprocessing.get_all_start_methods()
+
+
+def isolation_context():
+    """
+    Multiprocessing context for isolated measurement processes
+    Raises RuntimeError where fork is unavailable
+    """
+    if not ISOLATION_SUPPORTED:
+        raise RuntimeError("Isolated measurement processes need the 'fork' start method")
+    # Locks a web-server thread may hold at fork time (tracemalloc,
+    # cipher contexts) are re-created in the child by at-fork hooks
+    return multiprocessing.get_context('fork')
+
+
+def _init_worker(config, cpu_queue):
+    """Create the worker's analyzer and pin it to a dedicated CPU"""
+    global _worker_analyzer
+    from modules.analyzer import EncryptionAnalyzer
+
+    _worker_analyzer = EncryptionAnalyzer(config)
+
+    if cpu_queue is not None and hasattr(os, 'sched_setaffinity'):
+        try:
+            os.sched_setaffinity(0, {cpu_queue.get(timeout=1)})
+        except Exception:
+            # Pinning is best effort (queue exhausted or CPU unavailable)
+            pass
+
+
+def _attach_shared_memory(name):
+    """Attach to an existing block without letting this process own it"""
+    try:
+        return shared_memory.SharedMemory(name=name, track=False)
+    except TypeError:
+        # Python < 3.13: pool workers share the parent's resource tracker,
+        # so the duplicate registration is released by the parent's unlink
+        return shared_memory.SharedMemory(name=name)
+
+
+def _analyze_shared(algorithm_name, shm_name, size, options):
+    """Worker entry point: analyze one algorithm over the shared plaintext"""
+    shm = _attach_shared_memory(shm_name)
+    try:
+        plaintext = bytes(shm.buf[:size])
+    finally:
+        shm.close()
+
+    metrics, _, _ = _worker_analyzer.analyze_algorithm(algorithm_name, plaintext, **options)
+    return metrics
+
+
+def _analyze_in_child(conn, config, algorithm_name, plaintext, options):
+    """Forked child entry point: analyze and send (ok, metrics or message) back"""
+    try:
+        from modules.analyzer import EncryptionAnalyzer
+
+        metrics, _, _ = EncryptionAnalyzer(config).analyze_algorithm(algorithm_name, plaintext, **options)
+        conn.send((True, metrics))
+    except Exception as e:
+        conn.send((False, f"{type(e).__name__}: {e}"))
+    finally:
+        conn.close()
+
+
+def analyze_isolated(config, algorithm_name, plaintext, timeout=None, **options):
+    """
+    Analyze one algorithm in a freshly forked process
+
+    A new child per call starts with every page shared with the parent, so
+    its USS growth reflects only what the analysis itself allocated
+    (used by the 'rss' memory mode).
+
+    Returns: metrics dictionary
+    """
+    ctx = isolation_context()
+    parent_conn, child_conn = ctx.Pipe(duplex=False)
+    process = ctx.Process(
+        target=_analyze_in_child,
+        args=(child_conn, config, algorithm_name, plaintext, options),
+        daemon=True
+    )
+    process.start()
+    child_conn.close()
+
+    try:
+        if not parent_conn.poll(timeout):
+            raise TimeoutError(f"Isolated analysis of {algorithm_name} timed out")
+        ok, payload = parent_conn.recv()
+    except EOFError:
+        raise RuntimeError(f"Isolated analysis of {algorithm_name} exited unexpectedly")
+    finally:
+        parent_conn.close()
+        process.join(1)
+        if process.is_alive():
+            process.kill()
+            process.join()
+
+    if not ok:
+        raise RuntimeError(payload)
+    return payload
+
+
+class AnalysisPool:
+    """
+    Persistent process pool for comparing algorithms in parallel
+    """
+
+    def __init__(self, config, max_workers=None, pin_cpus=True):
+        """
+        Args:
+            config: Configuration object passed to each worker's analyzer
+            max_workers: Number of worker processes (default: available CPUs)
+            pin_cpus: Pin each worker to its own CPU where supported
+        """
+        if hasattr(os, 'sched_getaffinity'):
+            cpus = sorted(os.sched_getaffinity(0))
+        else:
+            cpus = list(range(os.cpu_count() or 1))
+
+        self.max_workers = max_workers or len(cpus)
+
+        cpu_queue = None
+        if pin_cpus and hasattr(os, 'sched_setaffinity'):
+            cpu_queue = multiprocessing.Queue()
+            for i in range(self.max_workers):
+                cpu_queue.put(cpus[i % len(cpus)])
+
+        self._executor = ProcessPoolExecutor(
+            max_workers=self.max_workers,
+            initializer=_init_worker,
+            initargs=(config, cpu_queue)
+        )
+        atexit.register(self.shutdown)
+
+    def analyze(self, algorithms, plaintext, on_result=None, **options):
+        """
+        Analyze algorithms in parallel over the same plaintext
+
+        Args:
+            algorithms: Algorithm names, results keep this order
+            plaintext: str or bytes
+            on_result: Optional callback(algorithm_name, metrics or exception)
+                       invoked in completion order
+            options: Extra keyword arguments for analyze_algorithm
+
+        Returns:
+            list: (algorithm_name, metrics or exception) in input order
+        """
+        if isinstance(plaintext, str):
+            plaintext = plaintext.encode('utf-8')
+
+        size = len(plaintext)
+        shm = shared_memory.SharedMemory(create=True, size=max(size, 1))
+        try:
+            shm.buf[:size] = plaintext
+
+            futures = {
+                self._executor.submit(_analyze_shared, name, shm.name, size, options): name
+                for name in algorithms
+            }
+
+            outcomes = {}
+            for future in as_completed(futures):
+                name = futures[future]
+                try:
+                    outcomes[name] = future.result()
+                except Exception as e:
+                    outcomes[name] = e
+                if on_result:
+                    on_result(name, outcomes[name])
+
+            # Return in submission order so merging is deterministic
+            return [(name, outcomes[name]) for name in algorithms]
+        finally:
+            shm.close()
+            shm.unlink()
+
+    def shutdown(self):
+        """Stop worker processes"""
+        self._executor.shutdown(wait=True, cancel_futures=True)
@@ -0,0 +1,58 @@
+"""
+Parallel Segment Encryption Module
+Encrypts and decrypts segmented containers on a thread pool
+OpenSSL releases the GIL during AEAD calls, so segments run on all cores
+"""
+
+import os
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor
+from modules.memory_encryptor import MemoryEncryptor
+
+
+class ParallelMemoryEncryptor(MemoryEncryptor):
+    """
+    MemoryEncryptor whose container segments are processed concurrently
+
+    Output is byte-identical in layout to the sequential container format,
+    so either implementation can read what the other wrote.
+    """
+
+    def __init__(self, master_key_b64, workers=None, max_in_flight=None):
+        """
+        Args:
+            master_key_b64: Base64 encoded 256-bit master key
+            workers: Thread count (default: CPU count)
+            max_in_flight: Segments queued or in progress at once, bounds
+                           memory to about max_in_flight * segment_size
+                           (default: 2 * workers)
+        """
+        super().__init__(master_key_b64)
+        self.workers = workers or os.cpu_count() or 1
+        self.max_in_flight = max_in_flight or 2 * self.workers
+        self._executor = ThreadPoolExecutor(
+            max_workers=self.workers,
+            thread_name_prefix='segment-crypto'
+        )
+
+    def _process_segments(self, operation, aead, header, segments, dst):
+        """
+        Run operation on segments concurrently and write results in order
+        Reading stops while max_in_flight segments are pending
+        """
+        pending = deque()
+        try:
+            for index, data, last in segments:
+                pending.append(self._executor.submit(operation, aead, header, index, data, last))
+                if len(pending) >= self.max_in_flight:
+                    dst.write(pending.popleft().result())
+
+            while pending:
+                dst.write(pending.popleft().result())
+        finally:
+            for future in pending:
+                future.cancel()
+
+    def shutdown(self):
+        """Stop the worker threads"""
+        self._executor.shutdown(wait=True)
@@ -0,0 +1,121 @@
+"""
+Report Cache Module
+Size-bounded on-disk LRU cache for rendered PDF reports, keyed by a hash
+of the analysis results and the report template version
+"""
+
+import os
+import json
+import hashlib
+import threading
+
+
+class ReportCache:
+    """
+    Disk cache of rendered reports
+
+    Entries are files named <sha256>.pdf. A hit refreshes the file's mtime,
+    so evicting the oldest mtimes first gives LRU order. Writes go through a
+    temporary file and os.replace, so readers never see partial reports.
+
+    A cached report is served byte for byte, so the generation date printed
+    in it ("Yaratilgan sana") is when that report was first rendered, not
+    when it is downloaded.
+    """
+
+    def __init__(self, cache_dir, max_bytes=100 * 1024 * 1024, extension='.pdf'):
+        """
+        Args:
+            cache_dir: Directory holding cached reports
+            max_bytes: Total size kept on disk before evicting
+            extension: File extension of cached entries
+        """
+        self.cache_dir = cache_dir
+        self.max_bytes = max_bytes
+        self.extension = extension
+        self._lock = threading.Lock()
+        os.makedirs(cache_dir, exist_ok=True)
+
+    @staticmethod
+    def make_key(results, template_version):
+        """Content hash of a results list and the template version"""
+        payload = json.dumps(
+            {'template': template_version, 'results': results},
+            sort_keys=True,
+            default=str
+        )
+        return hashlib.sha256(payload.encode('utf-8')).hexdigest()
+
+    def _path(self, key):
+        return os.path.join(self.cache_dir, key + self.extension)
+
+    def get(self, key):
+        """Path of a cached report (marked as recently used), or None"""
+        path = self._path(key)
+        try:
+            os.utime(path)
+        except FileNotFoundError:
+            return None
+        return path
+
+    def put(self, key, data):
+        """Store report bytes, returns the cached path"""
+        return self.render(key, lambda tmp_path: self._write(tmp_path, data))
+
+    def render(self, key, render_func):
+        """
+        Store the output of render_func(path), which writes the report to
+        the given path, then evict down to max_bytes
+        Returns: cached path
+        """
+        path = self._path(key)
+        tmp_path = f"{path}.{threading.get_ident()}.tmp"
+        try:
+            render_func(tmp_path)
+            os.replace(tmp_path, path)
+        finally:
+            if os.path.exists(tmp_path):
+                os.remove(tmp_path)
+
+        self.evict(keep=path)
+        return path
+
+    @staticmethod
+    def _write(path, data):
+        with open(path, 'wb') as f:
+            f.write(data)
+
+    def evict(self, keep=None):
+        """Delete least recently used entries until the cache fits max_bytes"""
+        with self._lock:
+            entries = []
+            total = 0
+            for entry in os.scandir(self.cache_dir):
+                if not entry.name.endswith(self.extension):
+                    continue
+                try:
+                    stat = entry.stat()
+                except FileNotFoundError:
+                    continue
+                entries.append((stat.st_mtime, stat.st_size, entry.path))
+                total += stat.st_size
+
+            entries.sort()
+            for _, size, path in entries:
+                if total <= self.max_bytes:
+                    break
+                if path == keep:
+                    continue
+                try:
+                    os.remove(path)
+                    total -= size
+                except FileNotFoundError:
+                    pass
+
+    def size(self):
+        """Bytes currently used by cached entries"""
+        return sum(
+            entry.stat().st_size
+            for entry in os.scandir(self.cache_dir)
+            if entry.name.endswith(self.extension)
+        )
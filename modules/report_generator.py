@@ -1,24 +1,30 @@
 from datetime import datetime
+from io import BytesIO
 import os
 
-# Try to import WeasyPrint, use ReportLab as fallback
-try:
-    from weasyprint import HTML
-    WEASYPRINT_AVAILABLE = True
-except (ImportError, OSError):
-    WEASYPRINT_AVAILABLE = False
-    try:
-        from reportlab.lib.pagesizes import letter, A4
-        from reportlab.lib import colors
-        from reportlab.lib.styles import getSampleStyleSheet, ParagraphStyle
-        from reportlab.lib.units import inch
-        from reportlab.platypus import SimpleDocTemplate, Table, TableStyle, Paragraph, Spacer, PageBreak
-        from reportlab.lib.enums import TA_CENTER, TA_LEFT
-        REPORTLAB_AVAILABLE = True
-    except ImportError:
-        REPORTLAB_AVAILABLE = False
+# PDF backend ('weasyprint', 'reportlab' or '' for none), detected on first use
+# so importing this module does not load either library
+_pdf_backend = None
+
+def get_pdf_backend():
+    """Try WeasyPrint, then ReportLab as fallback; None if neither imports"""
+    global _pdf_backend
+    if _pdf_backend is None:
+        try:
+            import weasyprint
+            _pdf_backend = 'weasyprint'
+        except (ImportError, OSError):
+            try:
+                import reportlab.platypus
+                _pdf_backend = 'reportlab'
+            except ImportError:
+                _pdf_backend = ''
+    return _pdf_backend or None
 
 class ReportGenerator:
+    # Bump whenever the report layout changes, so cached PDFs are not reused
+    TEMPLATE_VERSION = 1
+    
     def __init__(self):
         self.template = """
 <!DOCTYPE html>
@@ -281,31 +287,51 @@ class ReportGenerator:
         
         return html_content
     
-    def generate_pdf_report(self, results, output_path):
+    def generate_pdf_report(self, results, output_path=None):
         """
         Generate PDF report from analysis results
+        Writes to output_path, or renders in memory and returns a BytesIO
+        positioned at the start when output_path is None
         """
-        # Create directory if it doesn't exist
-        os.makedirs(os.path.dirname(output_path) if os.path.dirname(output_path) else '.', exist_ok=True)
+        if output_path is None:
+            buffer = BytesIO()
+            target = buffer
+        else:
+            # Create directory if it doesn't exist
+            os.makedirs(os.path.dirname(output_path) if os.path.dirname(output_path) else '.', exist_ok=True)
+            buffer = None
+            target = output_path
         
-        if WEASYPRINT_AVAILABLE:
+        backend = get_pdf_backend()
+        if backend == 'weasyprint':
             # Use WeasyPrint if available
+            from weasyprint import HTML
             html_content = self.generate_html_report(results)
-            if html_content:
-                HTML(string=html_content).write_pdf(output_path)
-                return output_path
-        elif REPORTLAB_AVAILABLE:
+            if not html_content:
+                raise RuntimeError("HTML report is empty, PDF was not generated")
+            HTML(string=html_content).write_pdf(target)
+        elif backend == 'reportlab':
             # Use ReportLab as fallback
-            return self._generate_pdf_with_reportlab(results, output_path)
+            self._generate_pdf_with_reportlab(results, target)
         else:
             raise ImportError("Neither WeasyPrint nor ReportLab is available for PDF generation")
         
-        return None
+        if buffer is not None:
+            buffer.seek(0)
+            return buffer
+        return output_path
     
     def _generate_pdf_with_reportlab(self, results, output_path):
         """
         Generate PDF using ReportLab (fallback method)
+        output_path may be a file path or a writable binary file object
         """
+        from reportlab.lib.pagesizes import A4
+        from reportlab.lib import colors
+        from reportlab.lib.styles import getSampleStyleSheet, ParagraphStyle
+        from reportlab.platypus import SimpleDocTemplate, Table, TableStyle, Paragraph, Spacer
+        from reportlab.lib.enums import TA_CENTER
+        
         doc = SimpleDocTemplate(output_path, pagesize=A4)
         story = []
         styles = getSampleStyleSheet()
@@ -433,6 +459,12 @@ class ReportGenerator:
         doc.build(story)
         return output_path
     
+    @property
+    def cache_version(self):
+        """Template version plus rendering backend, part of the report cache key"""
+        backend = get_pdf_backend() or 'none'
+        return f"{self.TEMPLATE_VERSION}-{backend}"
+    
     def _get_score_class(self, score):
         """Get CSS class based on score value"""
         if score >= 0.7:
@@ -0,0 +1,121 @@
+"""
+Result Cache Module
+Content-addressed memoization of compare_algorithms results: an LRU
+memory tier in front of an optional SQLite tier, both with a TTL
+"""
+
+import copy
+import json
+import time
+import sqlite3
+import hashlib
+import threading
+from collections import OrderedDict
+
+# Bump when the metrics or scoring change, so older cached results are ignored
+CACHE_VERSION = 5
+
+
+class ResultCache:
+    """
+    Two-tier cache of analysis results
+
+    Keys are sha256 digests of the plaintext plus everything that affects
+    the results (algorithm set, parameters, weights), so identical requests
+    map to the same entry regardless of who sends them.
+    """
+
+    def __init__(self, max_entries=128, ttl=24 * 3600, db_path=None):
+        """
+        Args:
+            max_entries: Entries kept in the memory tier
+            ttl: Seconds an entry stays valid in either tier
+            db_path: SQLite file for the persistent tier (None disables it)
+        """
+        self.max_entries = max_entries
+        self.ttl = ttl
+        self.db_path = db_path
+        self.hits = 0
+        self.misses = 0
+        self._memory = OrderedDict()
+        self._lock = threading.Lock()
+        self._db = None
+
+        if db_path:
+            self._db = sqlite3.connect(db_path, check_same_thread=False)
+            self._db.execute(
+                "CREATE TABLE IF NOT EXISTS result_cache ("
+                "key TEXT PRIMARY KEY, results TEXT NOT NULL, expires_at REAL NOT NULL)"
+            )
+            self._db.commit()
+
+    @staticmethod
+    def make_key(plaintext, algorithms, params):
+        """Digest of the plaintext, algorithm list and parameters"""
+        if isinstance(plaintext, str):
+            plaintext = plaintext.encode('utf-8')
+
+        digest = hashlib.sha256()
+        digest.update(json.dumps(
+            {'version': CACHE_VERSION, 'algorithms': list(algorithms), 'params': params},
+            sort_keys=True
+        ).encode('utf-8'))
+        digest.update(b'\0')
+        digest.update(plaintext)
+        return digest.hexdigest()
+
+    def get(self, key):
+        """Copy of the cached results, or None"""
+        now = time.time()
+        with self._lock:
+            entry = self._memory.get(key)
+            if entry is not None:
+                expires_at, results = entry
+                if expires_at > now:
+                    self._memory.move_to_end(key)
+                    self.hits += 1
+                    return copy.deepcopy(results)
+                del self._memory[key]
+
+            if self._db is not None:
+                row = self._db.execute(
+                    "SELECT results, expires_at FROM result_cache WHERE key = ?", (key,)
+                ).fetchone()
+                if row is not None and row[1] > now:
+                    results = json.loads(row[0])
+                    self._remember(key, row[1], results)
+                    self.hits += 1
+                    return copy.deepcopy(results)
+
+            self.misses += 1
+            return None
+
+    def put(self, key, results):
+        """Store results in both tiers"""
+        expires_at = time.time() + self.ttl
+        results = copy.deepcopy(results)
+        with self._lock:
+            self._remember(key, expires_at, results)
+
+            if self._db is not None:
+                self._db.execute(
+                    "INSERT OR REPLACE INTO result_cache (key, results, expires_at) VALUES (?, ?, ?)",
+                    (key, json.dumps(results), expires_at)
+                )
+                self._db.execute("DELETE FROM result_cache WHERE expires_at <= ?", (time.time(),))
+                self._db.commit()
+
+    def _remember(self, key, expires_at, results):
+        """Insert into the memory tier, evicting the least recently used (caller holds the lock)"""
+        self._memory[key] = (expires_at, results)
+        self._memory.move_to_end(key)
+        while len(self._memory) > self.max_entries:
+            self._memory.popitem(last=False)
+
+    def clear(self):
+        """Drop every entry from both tiers"""
+        with self._lock:
+            self._memory.clear()
+            if self._db is not None:
+                self._db.execute("DELETE FROM result_cache")
+                self._db.commit()
@@ -0,0 +1,192 @@
+"""
+Measurement Sandbox Module
+Runs EncryptionAnalyzer.analyze_algorithm in dedicated pre-forked worker
+processes, one per algorithm, so timings reflect the cipher rather than
+the web server's threads, garbage collector and other requests
+"""
+
+import gc
+import os
+import atexit
+import threading
+from modules.parallel import ISOLATION_SUPPORTED, isolation_context
+
+try:
+    import resource
+except ImportError:
+    # Not available on Windows
+    resource = None
+
+# Workers are forked, and their rusage deltas come from getrusage
+SANDBOX_SUPPORTED = ISOLATION_SUPPORTED and resource is not None
+
+
+def _rusage_delta(before, after):
+    """Resource usage of one analysis from two getrusage snapshots"""
+    return {
+        'user_time_ms': round((after.ru_utime - before.ru_utime) * 1000, 4),
+        'system_time_ms': round((after.ru_stime - before.ru_stime) * 1000, 4),
+        'minor_faults': after.ru_minflt - before.ru_minflt,
+        'major_faults': after.ru_majflt - before.ru_majflt,
+        'voluntary_switches': after.ru_nvcsw - before.ru_nvcsw,
+        'involuntary_switches': after.ru_nivcsw - before.ru_nivcsw,
+        # High-water mark of the worker (KB on Linux), not a delta
+        'maxrss_kb': after.ru_maxrss
+    }
+
+
+def _worker_main(conn, config, algorithm_name, cpu):
+    """
+    Worker loop: receive (plaintext, options), reply (ok, metrics or message)
+    A None message stops the worker
+    """
+    from modules.analyzer import EncryptionAnalyzer
+
+    if cpu is not None and hasattr(os, 'sched_setaffinity'):
+        try:
+            os.sched_setaffinity(0, {cpu})
+        except OSError:
+            # Pinning is best effort (CPU unavailable in this cgroup)
+            pass
+
+    analyzer = EncryptionAnalyzer(config)
+
+    while True:
+        try:
+            message = conn.recv()
+        except EOFError:
+            break
+        if message is None:
+            break
+
+        plaintext, options = message
+        try:
+            # Start from a clean heap and keep the collector out of the timed sections
+            gc.collect()
+            gc.disable()
+            before = resource.getrusage(resource.RUSAGE_SELF)
+            try:
+                metrics, _, _ = analyzer.analyze_algorithm(algorithm_name, plaintext, **options)
+            finally:
+                after = resource.getrusage(resource.RUSAGE_SELF)
+                gc.enable()
+
+            metrics['rusage'] = _rusage_delta(before, after)
+            metrics['sandboxed'] = True
+            conn.send((True, metrics))
+        except Exception as e:
+            conn.send((False, f"{type(e).__name__}: {e}"))
+
+    conn.close()
+
+
+class _SandboxWorker:
+    """One pre-forked process dedicated to a single algorithm"""
+
+    def __init__(self, context, config, algorithm_name, cpu):
+        self.context = context
+        self.config = config
+        self.algorithm_name = algorithm_name
+        self.cpu = cpu
+        self.process = None
+        self.conn = None
+        self.lock = threading.Lock()
+        self.start()
+
+    def start(self):
+        parent_conn, child_conn = self.context.Pipe()
+        self.process = self.context.Process(
+            target=_worker_main,
+            args=(child_conn, self.config, self.algorithm_name, self.cpu),
+            name=f"sandbox-{self.algorithm_name}",
+            daemon=True
+        )
+        self.process.start()
+        child_conn.close()
+        self.conn = parent_conn
+
+    def run(self, plaintext, options, timeout):
+        """Send one analysis to the worker, restarting it if it died or hung"""
+        with self.lock:
+            if not self.process.is_alive():
+                self.stop()
+                self.start()
+
+            try:
+                self.conn.send((plaintext, options))
+                if not self.conn.poll(timeout):
+                    raise TimeoutError(f"Sandboxed analysis of {self.algorithm_name} timed out")
+                ok, payload = self.conn.recv()
+            except (EOFError, OSError, TimeoutError) as e:
+                # Worker state is unknown: replace it for the next run
+                self.stop()
+                self.start()
+                if isinstance(e, TimeoutError):
+                    raise
+                raise RuntimeError(f"Sandbox worker for {self.algorithm_name} exited unexpectedly")
+
+        if not ok:
+            raise RuntimeError(payload)
+        return payload
+
+    def stop(self):
+        if self.process is None:
+            return
+        try:
+            self.conn.send(None)
+        except (OSError, ValueError):
+            pass
+        self.process.join(1)
+        if self.process.is_alive():
+            self.process.kill()
+            self.process.join()
+        self.conn.close()
+        self.process = None
+
+
+class MeasurementSandbox:
+    """
+    Pre-forked worker processes, one per algorithm
+
+    Workers are forked up front, so the per-analysis cost is one message
+    over a Pipe. Each worker runs analyses one at a time with the garbage
+    collector disabled, optionally pinned to a CPU, and adds getrusage
+    deltas to the metrics it returns.
+    """
+
+    def __init__(self, config, algorithms, cpus=None, timeout=300):
+        """
+        Args:
+            config: Configuration object for each worker's analyzer
+            algorithms: Algorithm names, one worker each
+            cpus: CPUs to pin workers to round-robin (None: no pinning)
+            timeout: Seconds to wait for a single analysis
+        """
+        if not SANDBOX_SUPPORTED:
+            raise RuntimeError("The measurement sandbox needs fork and the resource module")
+        self.timeout = timeout
+        context = isolation_context()
+        self._workers = {
+            name: _SandboxWorker(context, config, name, cpus[i % len(cpus)] if cpus else None)
+            for i, name in enumerate(algorithms)
+        }
+        atexit.register(self.shutdown)
+
+    def analyze(self, algorithm_name, plaintext, **options):
+        """
+        Analyze one algorithm in its worker
+        Returns: metrics dictionary (with 'rusage' and 'sandboxed' added)
+        """
+        worker = self._workers.get(algorithm_name)
+        if worker is None:
+            raise ValueError(f"Unsupported algorithm: {algorithm_name}")
+
+        if isinstance(plaintext, str):
+            plaintext = plaintext.encode('utf-8')
+        return worker.run(plaintext, options, self.timeout)
+
+    def shutdown(self):
+        """Stop all worker processes"""
+        for worker in self._workers.values():
+            with worker.lock:
+                worker.stop()
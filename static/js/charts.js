@@ -126,6 +126,22 @@ const algorithmColors = {
     'ChaCha20': {
         background: 'rgba(168, 85, 247, 0.8)',
         border: 'rgb(168, 85, 247)'
+    },
+    'AES-GCM': {
+        background: 'rgba(16, 185, 129, 0.8)',
+        border: 'rgb(16, 185, 129)'
+    },
+    'AES-CTR': {
+        background: 'rgba(14, 165, 233, 0.8)',
+        border: 'rgb(14, 165, 233)'
+    },
+    'ChaCha20-Poly1305': {
+        background: 'rgba(236, 72, 153, 0.8)',
+        border: 'rgb(236, 72, 153)'
+    },
+    'XChaCha20-Poly1305': {
+        background: 'rgba(234, 179, 8, 0.8)',
+        border: 'rgb(234, 179, 8)'
     }
 };
 
@@ -134,4 +150,45 @@ function getAlgorithmColor(algorithm, type = 'background') {
     return algorithmColors[algorithm]?.[type] || 'rgba(100, 100, 100, 0.8)';
 }
 
+// Incremental updates for charts fed by streamed per-algorithm results
+
+// Charts with one label per algorithm: set that algorithm's value in each dataset
+function upsertAlgorithmResult(chart, algorithm, values) {
+    let index = chart.data.labels.indexOf(algorithm);
+    if (index === -1) {
+        chart.data.labels.push(algorithm);
+        index = chart.data.labels.length - 1;
+    }
+    
+    chart.data.datasets.forEach((dataset, i) => {
+        dataset.data[index] = values[i];
+        if (Array.isArray(dataset.backgroundColor)) {
+            dataset.backgroundColor[index] = getAlgorithmColor(algorithm, 'background');
+        }
+        if (Array.isArray(dataset.borderColor)) {
+            dataset.borderColor[index] = getAlgorithmColor(algorithm, 'border');
+        }
+    });
+    
+    chart.update();
+}
+
+// Charts with one dataset per algorithm (e.g. radar): add or replace its dataset
+function upsertAlgorithmDataset(chart, algorithm, data) {
+    const dataset = chart.data.datasets.find(d => d.label === algorithm);
+    if (dataset) {
+        dataset.data = data;
+    } else {
+        chart.data.datasets.push({
+            label: algorithm,
+            data: data,
+            backgroundColor: getAlgorithmColor(algorithm, 'background').replace('0.8', '0.3'),
+            borderColor: getAlgorithmColor(algorithm, 'border'),
+            borderWidth: 2
+        });
+    }
+    
+    chart.update();
+}
+
 console.log('Charts.js loaded successfully');
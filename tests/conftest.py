@@ -0,0 +1,39 @@
+import os
+import sys
+
+import pytest
+
+# Tests import the app packages (modules, database) from the project root
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+
+@pytest.fixture
+def db_app(tmp_path):
+    """Flask app with the models bound to an empty SQLite database"""
+    from flask import Flask
+    from database.models import db
+
+    app = Flask(__name__)
+    app.config['SQLALCHEMY_DATABASE_URI'] = f"sqlite:///{tmp_path / 'test.db'}"
+    app.config['SQLALCHEMY_TRACK_MODIFICATIONS'] = False
+    db.init_app(app)
+
+    with app.app_context():
+        db.create_all()
+        yield app
+        db.session.remove()
+        db.drop_all()
+
+
+@pytest.fixture
+def make_user(db_app):
+    """Factory for users (password hashing is skipped)"""
+    from database.models import db, User
+
+    def make(name):
+        user = User(username=name, email=f'{name}@example.com', password_hash='x')
+        db.session.add(user)
+        db.session.commit()
+        return user.id
+
+    return make
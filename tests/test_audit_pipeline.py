@@ -0,0 +1,75 @@
+import logging
+from datetime import datetime
+
+from database.models import AuditLog
+from modules.audit_pipeline import AuditPipeline, _STOP
+
+
+def _pipeline(app, **config):
+    app.config.update({'AUDIT_ASYNC': True, 'AUDIT_FLUSH_INTERVAL': 0.05, 'AUDIT_RETRY_DELAY': 0}, **config)
+    pipeline = AuditPipeline()
+    pipeline.init_app(app)
+    return pipeline
+
+
+def test_queued_records_are_written(db_app):
+    pipeline = _pipeline(db_app)
+
+    for i in range(250):
+        pipeline.log('ACTION', details=str(i))
+    pipeline.flush()
+
+    assert AuditLog.query.count() == 250
+    pipeline.shutdown()
+
+
+def test_records_queued_behind_stop_are_written(db_app):
+    pipeline = _pipeline(db_app)
+    pipeline.log('BEFORE')
+    pipeline.flush()
+
+    # A log() that passed the enabled check while shutdown() ran can queue
+    # its record after the writer's stop marker
+    pipeline._queue.put(_STOP)
+    pipeline._queue.put({'user_id': None, 'action': 'LATE', 'details': None, 'ip_address': None,
+                         'timestamp': datetime.utcnow()})
+    pipeline._thread.join(timeout=5)
+    pipeline.shutdown()
+
+    assert pipeline._queue.empty()
+    assert {log.action for log in AuditLog.query.all()} == {'BEFORE', 'LATE'}
+
+
+def test_failed_batch_is_retried(db_app, monkeypatch):
+    from database.models import db
+    pipeline = _pipeline(db_app, AUDIT_ASYNC=False)
+    execute = db.session.execute
+    calls = []
+
+    def flaky_execute(*args, **kwargs):
+        calls.append(1)
+        if len(calls) < 3:
+            raise RuntimeError('database is locked')
+        return execute(*args, **kwargs)
+
+    monkeypatch.setattr(db.session, 'execute', flaky_execute)
+    pipeline.log('ACTION')
+    monkeypatch.undo()
+
+    assert AuditLog.query.count() == 1
+
+
+def test_rejected_batch_goes_to_the_file_log(db_app, monkeypatch, caplog):
+    from database.models import db
+    pipeline = _pipeline(db_app, AUDIT_ASYNC=False, AUDIT_WRITE_RETRIES=1)
+
+    def failing_execute(*args, **kwargs):
+        raise RuntimeError('database is down')
+
+    monkeypatch.setattr(db.session, 'execute', failing_execute)
+    with caplog.at_level(logging.INFO):
+        pipeline.log('LOGIN', details='user signed in', user_id=7, ip_address='10.0.0.1')
+
+    assert 'database is down' in caplog.text
+    assert 'Action: LOGIN, User: 7, IP: 10.0.0.1' in caplog.text
+    assert 'Details: user signed in' in caplog.text
@@ -0,0 +1,75 @@
+import os
+
+import pytest
+
+from config import Config
+from modules.analyzer import EncryptionAnalyzer
+from modules.encryption.registry import registry, ANALYZE
+
+ALGORITHMS = registry.names(ANALYZE)
+
+
+def _algorithm(name):
+    algo = registry.create(name)
+    algo.generate_key()
+    return algo
+
+
+@pytest.mark.parametrize('name', ALGORITHMS)
+def test_empty_batch(name):
+    algo = _algorithm(name)
+
+    ciphertexts, elapsed_ms = algo.encrypt_many([])
+    assert ciphertexts == []
+    assert elapsed_ms >= 0
+
+    plaintexts, _ = algo.decrypt_many([])
+    assert plaintexts == []
+
+
+@pytest.mark.parametrize('name', ALGORITHMS)
+def test_batch_round_trip(name):
+    algo = _algorithm(name)
+    messages = [b'', b'a', 'salom', os.urandom(15), os.urandom(16), os.urandom(1000)]
+
+    ciphertexts, _ = algo.encrypt_many(messages)
+    plaintexts, _ = algo.decrypt_many(ciphertexts)
+
+    expected = [m.encode('utf-8') if isinstance(m, str) else m for m in messages]
+    assert [bytes(p) for p in plaintexts] == expected
+
+
+@pytest.mark.parametrize('name', ALGORITHMS)
+def test_batch_uses_fresh_iv_per_message(name):
+    algo = _algorithm(name)
+    nonce_size = registry.get(name).nonce_size
+
+    ciphertexts, _ = algo.encrypt_many([b'same message'] * 50)
+
+    assert len({c[:nonce_size] for c in ciphertexts}) == 50
+    assert len(set(ciphertexts)) == 50
+
+
+@pytest.mark.parametrize('name', ALGORITHMS)
+def test_batch_decrypts_with_stored_key(name):
+    sender = _algorithm(name)
+    ciphertexts, _ = sender.encrypt_many([b'one', b'two', b'three'])
+
+    receiver = registry.create(name)
+    receiver.set_key(sender.key, getattr(sender, 'iv', None) or getattr(sender, 'nonce', None))
+    plaintexts, _ = receiver.decrypt_many(ciphertexts)
+
+    assert [bytes(p) for p in plaintexts] == [b'one', b'two', b'three']
+
+
+@pytest.mark.parametrize('messages', [[], [b'x'], [b'msg %d' % i for i in range(500)]])
+def test_analyzer_encrypt_many(messages):
+    analyzer = EncryptionAnalyzer(Config)
+
+    result = analyzer.encrypt_many('AES-GCM', messages)
+
+    assert result['count'] == len(messages)
+    assert len(result['ciphertexts']) == len(messages)
+    algo = registry.create('AES-GCM')
+    algo.set_key(result['key'], result['iv_or_nonce'])
+    assert algo.decrypt_many(result['ciphertexts'])[0] == messages
@@ -0,0 +1,149 @@
+import os
+
+import pytest
+from Crypto.Cipher import DES, Blowfish
+from Crypto.Util.Padding import pad
+from cryptography.hazmat.primitives.ciphers import Cipher, algorithms, modes
+
+from config import Config
+from modules.analyzer import EncryptionAnalyzer
+from modules.encryption.cipher_pool import CBCContext, CipherContextPool
+from modules.encryption.aes import AESEncryption
+from modules.encryption.des import DESEncryption
+from modules.encryption.blowfish import BlowfishEncryption
+
+
+def _fresh_aes_encrypt(key, iv, data):
+    encryptor = Cipher(algorithms.AES(key), modes.CBC(iv)).encryptor()
+    return encryptor.update(data) + encryptor.finalize()
+
+
+def _aes_context(key):
+    zero_iv = modes.CBC(bytes(16))
+    return CBCContext(
+        lambda: Cipher(algorithms.AES(key), zero_iv).encryptor().update,
+        lambda: Cipher(algorithms.AES(key), zero_iv).decryptor().update,
+        16
+    )
+
+
+@pytest.mark.parametrize('blocks', [1, 2, 7])
+def test_context_matches_fresh_cipher_across_messages(blocks):
+    key = os.urandom(32)
+    context = _aes_context(key)
+
+    # The chain carries over between messages; every output must still
+    # equal a brand-new CBC cipher with that message's IV
+    for _ in range(20):
+        iv = os.urandom(16)
+        data = os.urandom(16 * blocks)
+        ciphertext = context.encrypt(iv, data)
+
+        assert ciphertext == _fresh_aes_encrypt(key, iv, data)
+        assert context.decrypt(iv, ciphertext) == data
+
+
+def test_repeated_iv_is_deterministic():
+    key, iv = os.urandom(32), os.urandom(16)
+    context = _aes_context(key)
+    data = os.urandom(64)
+
+    assert context.encrypt(iv, data) == context.encrypt(iv, data)
+
+
+def test_decrypt_out_of_order():
+    key = os.urandom(32)
+    context = _aes_context(key)
+    messages = [(os.urandom(16), os.urandom(48)) for _ in range(5)]
+    ciphertexts = [context.encrypt(iv, data) for iv, data in messages]
+
+    for (iv, data), ciphertext in reversed(list(zip(messages, ciphertexts))):
+        assert context.decrypt(iv, ciphertext) == data
+
+
+def test_batch_matches_single_calls():
+    key = os.urandom(32)
+    context = _aes_context(key)
+    ivs = os.urandom(16 * 3)
+    messages = [os.urandom(16), os.urandom(32), os.urandom(160)]
+
+    batch = context.encrypt_many(ivs, messages)
+
+    for i, (message, output) in enumerate(zip(messages, batch)):
+        iv = ivs[i * 16:(i + 1) * 16]
+        assert output == iv + _fresh_aes_encrypt(key, iv, message)
+    assert context.decrypt_many(batch) == messages
+
+
+def test_unaligned_input_is_rejected():
+    context = _aes_context(os.urandom(32))
+    with pytest.raises(ValueError):
+        context.encrypt(os.urandom(16), b'')
+    with pytest.raises(ValueError):
+        context.encrypt(os.urandom(16), os.urandom(17))
+
+
+@pytest.mark.parametrize('wrapper, fresh', [
+    (lambda: AESEncryption(256), lambda key, iv, data: _fresh_aes_encrypt(key, iv, pad(data, 16))),
+    (DESEncryption, lambda key, iv, data: DES.new(key, DES.MODE_CBC, iv).encrypt(pad(data, 8))),
+    (lambda: BlowfishEncryption(128), lambda key, iv, data: Blowfish.new(key, Blowfish.MODE_CBC, iv).encrypt(pad(data, 8))),
+])
+def test_wrappers_match_fresh_ciphers(wrapper, fresh):
+    first = wrapper()
+    key, iv = first.generate_key()
+
+    # Later wrappers with the same key reuse the pooled context
+    for i in range(5):
+        algo = wrapper()
+        algo.set_key(key, iv)
+        data = os.urandom(37 * (i + 1))
+
+        ciphertext = algo.encrypt(data)[0]
+        assert ciphertext == fresh(key, iv, data)
+        assert algo.decrypt(ciphertext)[0] == data
+    assert algo.context_reused
+
+
+def test_pool_lru_eviction():
+    pool = CipherContextPool(max_size=2)
+    built = []
+
+    def factory():
+        built.append(1)
+        return _aes_context(os.urandom(32))
+
+    pool.get('AES', b'a', factory)
+    pool.get('AES', b'b', factory)
+    assert pool.get('AES', b'a', factory)[1] is True
+    pool.get('AES', b'c', factory)
+
+    # b was least recently used and is rebuilt
+    assert pool.get('AES', b'b', factory)[1] is False
+    assert len(built) == 4
+
+
+def test_broken_context_is_replaced():
+    pool = CipherContextPool()
+    context, _ = pool.get('AES', b'k', lambda: _aes_context(os.urandom(32)))
+    context.broken = True
+
+    replacement, reused = pool.get('AES', b'k', lambda: _aes_context(os.urandom(32)))
+    assert reused is False
+    assert replacement is not context
+
+
+@pytest.mark.parametrize('name', ['AES', 'DES', 'Blowfish'])
+@pytest.mark.parametrize('benchmark', [False, True])
+def test_analysis_reports_setup_of_the_encrypt(name, benchmark):
+    analyzer = EncryptionAnalyzer(Config)
+    analyzer.warmup, analyzer.repetitions, analyzer.max_repetitions = 1, 2, 2
+
+    # A fresh key builds its context on encrypt, even though decrypt reuses it
+    metrics, key, iv = analyzer.analyze_algorithm(name, b'x' * 64, benchmark=benchmark, memory_mode='off')
+    assert metrics['context_reused'] is False
+    assert metrics['key_setup_time_ms'] > 0
+
+    # The same key again hits the pool and pays no key schedule
+    metrics = analyzer.analyze_algorithm(name, b'x' * 64, key, iv, benchmark=benchmark, memory_mode='off')[0]
+    assert metrics['context_reused'] is True
+    assert metrics['key_setup_time_ms'] == 0
@@ -0,0 +1,105 @@
+import os
+
+import pytest
+from cryptography.hazmat.primitives.ciphers import Cipher, algorithms, modes
+
+from modules.encryption.registry import registry, ANALYZE, AUTHENTICATED
+from modules.encryption.aes_ctr import AESCTREncryption
+
+AEAD_ALGORITHMS = registry.names(AUTHENTICATED)
+SIZES = [0, 1, 15, 16, 17, 1000, 64 * 1024 + 3]
+
+
+@pytest.mark.parametrize('name', registry.names(ANALYZE))
+@pytest.mark.parametrize('size', SIZES)
+def test_round_trip(name, size):
+    algo = registry.create(name)
+    algo.generate_key()
+    plaintext = os.urandom(size)
+
+    ciphertext = algo.encrypt(plaintext)[0]
+    assert algo.decrypt(ciphertext)[0] == plaintext
+
+
+@pytest.mark.parametrize('name', registry.names(ANALYZE))
+def test_round_trip_with_stored_key(name):
+    spec = registry.get(name)
+    key, nonce = spec.generate_key_material()
+    sender, receiver = spec.create(), spec.create()
+    sender.set_key(key, nonce)
+    receiver.set_key(key, nonce)
+
+    assert receiver.decrypt(sender.encrypt('salom dunyo')[0])[0] == 'salom dunyo'.encode('utf-8')
+
+
+@pytest.mark.parametrize('name', AEAD_ALGORITHMS)
+def test_aead_layout_and_fresh_nonces(name):
+    algo = registry.create(name)
+    algo.generate_key()
+
+    first = algo.encrypt(b'same message')[0]
+    second = algo.encrypt(b'same message')[0]
+
+    assert len(first) == len(b'same message') + algo.NONCE_SIZE + algo.TAG_SIZE
+    assert first[:algo.NONCE_SIZE] != second[:algo.NONCE_SIZE]
+    assert first != second
+
+
+@pytest.mark.parametrize('name', AEAD_ALGORITHMS)
+@pytest.mark.parametrize('position', [0, 20, -1])
+def test_aead_detects_tampering(name, position):
+    algo = registry.create(name)
+    algo.generate_key()
+    ciphertext = bytearray(algo.encrypt(b'x' * 32)[0])
+    ciphertext[position] ^= 1
+
+    with pytest.raises(Exception):
+        algo.decrypt(bytes(ciphertext))
+
+
+@pytest.mark.parametrize('name', AEAD_ALGORITHMS)
+def test_aead_rejects_wrong_key(name):
+    algo = registry.create(name)
+    algo.generate_key()
+    ciphertext = algo.encrypt(b'secret')[0]
+
+    other = registry.create(name)
+    other.generate_key()
+    with pytest.raises(Exception):
+        other.decrypt(ciphertext)
+
+
+def _reference_ctr(key, counter_block, data):
+    encryptor = Cipher(algorithms.AES(key), modes.CTR(counter_block)).encryptor()
+    return encryptor.update(data) + encryptor.finalize()
+
+
+@pytest.mark.parametrize('counter_block', [
+    bytes(16),
+    os.urandom(16),
+    # Counter overflows inside the first chunk, or exactly at a chunk boundary
+    b'\xff' * 15 + b'\xf0',
+    (2 ** 128 - 4096 // 16).to_bytes(16, 'big'),
+])
+@pytest.mark.parametrize('size', [4096, 4096 * 3 + 5])
+def test_parallel_ctr_matches_single_stream(counter_block, size):
+    algo = AESCTREncryption(workers=4, parallel_threshold=1024)
+    algo.generate_key()
+    data = os.urandom(size)
+    expected = _reference_ctr(algo.key, counter_block, data)
+
+    # Chunks start at their counter offset, wrapping modulo 2**128
+    assert algo._apply(algo._new_context(counter_block), counter_block, data) == expected
+    assert algo.decrypt(counter_block + expected)[0] == data
+
+
+def test_ctr_parallel_and_serial_agree():
+    serial = AESCTREncryption(workers=1)
+    serial.generate_key()
+    parallel = AESCTREncryption(workers=4, parallel_threshold=1024)
+    parallel.set_key(serial.key, serial.nonce)
+    data = os.urandom(100 * 1024 + 7)
+
+    ciphertext = parallel.encrypt(data)[0]
+    assert serial.decrypt(ciphertext)[0] == data
+    assert parallel.decrypt(serial.encrypt(data)[0])[0] == data
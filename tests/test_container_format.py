@@ -0,0 +1,127 @@
+import io
+import os
+import base64
+
+import pytest
+
+from modules.container_format import (
+    ContainerError, ContainerHeader, MAGIC, TAG_SIZE, _FIXED_HEADER
+)
+from modules.memory_encryptor import MemoryEncryptor
+
+SEGMENT = 1024
+
+
+@pytest.fixture
+def encryptor():
+    return MemoryEncryptor(base64.b64encode(os.urandom(32)).decode())
+
+
+def _encrypt(encryptor, plaintext, algorithm='AES-GCM'):
+    dst = io.BytesIO()
+    wrapped_key = encryptor.encrypt_stream_container(io.BytesIO(plaintext), dst, algorithm, SEGMENT)
+    return dst.getvalue(), wrapped_key
+
+
+def _decrypt(encryptor, data, wrapped_key=None):
+    dst = io.BytesIO()
+    encryptor.decrypt_stream_container(io.BytesIO(data), dst, wrapped_key)
+    return dst.getvalue()
+
+
+@pytest.mark.parametrize('algorithm', ['AES-GCM', 'ChaCha20-Poly1305'])
+@pytest.mark.parametrize('size', [0, 1, SEGMENT, SEGMENT * 3 + 17])
+def test_round_trip(encryptor, algorithm, size):
+    plaintext = os.urandom(size)
+    data, wrapped_key = _encrypt(encryptor, plaintext, algorithm)
+
+    assert _decrypt(encryptor, data, wrapped_key) == plaintext
+
+
+def test_decrypt_stream_detects_container(encryptor):
+    plaintext = os.urandom(SEGMENT * 2)
+    data, wrapped_key = _encrypt(encryptor, plaintext)
+
+    dst = io.BytesIO()
+    encryptor.decrypt_stream(io.BytesIO(data), dst, wrapped_key, 'AES-GCM')
+    assert dst.getvalue() == plaintext
+
+
+def test_truncation_is_rejected(encryptor):
+    data, wrapped_key = _encrypt(encryptor, os.urandom(SEGMENT * 3))
+    header_size = ContainerHeader.read(io.BytesIO(data)).size
+
+    # Dropping the whole last segment leaves a valid-looking but non-final segment
+    truncated = data[:header_size + 2 * (SEGMENT + TAG_SIZE)]
+    with pytest.raises(ContainerError):
+        _decrypt(encryptor, truncated, wrapped_key)
+
+    with pytest.raises(ContainerError):
+        _decrypt(encryptor, data[:-1], wrapped_key)
+
+
+def test_reordered_segments_are_rejected(encryptor):
+    data, wrapped_key = _encrypt(encryptor, os.urandom(SEGMENT * 3))
+    header_size = ContainerHeader.read(io.BytesIO(data)).size
+    stored = SEGMENT + TAG_SIZE
+
+    segments = [data[header_size + i * stored:header_size + (i + 1) * stored] for i in range(3)]
+    swapped = data[:header_size] + segments[1] + segments[0] + segments[2]
+    with pytest.raises(ContainerError):
+        _decrypt(encryptor, swapped, wrapped_key)
+
+
+def test_segment_from_another_file_is_rejected(encryptor):
+    first, wrapped_key = _encrypt(encryptor, os.urandom(SEGMENT * 2))
+    second, _ = _encrypt(encryptor, os.urandom(SEGMENT * 2))
+    header_size = ContainerHeader.read(io.BytesIO(first)).size
+
+    mixed = first[:header_size] + second[header_size:]
+    with pytest.raises(ContainerError):
+        _decrypt(encryptor, mixed, wrapped_key)
+
+
+def test_wrong_key_file_is_rejected(encryptor):
+    data, _ = _encrypt(encryptor, b'secret data')
+    _, other_wrapped_key = _encrypt(encryptor, b'other data')
+
+    with pytest.raises(ContainerError):
+        _decrypt(encryptor, data, other_wrapped_key)
+    with pytest.raises(ContainerError):
+        encryptor.decrypt_stream(io.BytesIO(data), io.BytesIO(), b'not a key', 'AES-GCM')
+
+
+def _header(magic=MAGIC, version=1, algorithm_id=1, segment_size=SEGMENT, key=b'k' * 48):
+    return _FIXED_HEADER.pack(magic, version, algorithm_id, 0, segment_size, b'\0' * 7, len(key)) + key
+
+
+@pytest.mark.parametrize('raw', [
+    b'',
+    _header()[:10],
+    _header(magic=b'XXXX'),
+    _header(version=2),
+    _header(algorithm_id=9),
+    _header()[:-1],
+    _header(segment_size=0),
+    _header(segment_size=16),
+    _header(segment_size=0xFFFFFFFF),
+])
+def test_bad_headers_are_rejected(raw):
+    with pytest.raises(ValueError):
+        ContainerHeader.read(io.BytesIO(raw))
+
+
+def test_segment_size_bounds_apply_to_new_headers():
+    with pytest.raises(ContainerError):
+        ContainerHeader.create('AES-GCM', b'k' * 48, segment_size=0)
+
+
+def test_random_access_segment(encryptor):
+    plaintext = os.urandom(SEGMENT * 2 + 5)
+    data, _ = _encrypt(encryptor, plaintext)
+
+    src = io.BytesIO(data)
+    assert encryptor.read_container_segment(src, 1) == plaintext[SEGMENT:SEGMENT * 2]
+    assert encryptor.read_container_segment(src, 2) == plaintext[SEGMENT * 2:]
+    with pytest.raises(IndexError):
+        encryptor.read_container_segment(src, 3)
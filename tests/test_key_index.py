@@ -0,0 +1,124 @@
+import pytest
+
+from modules.key_index import KeyIndex, encode_cursor, decode_cursor
+from modules.key_manager import KeyManager
+
+
+def _keys(n):
+    """n keys alternating users and algorithms, created one second apart"""
+    return {
+        f'k{i:02d}': {
+            'created_at': f'2024-01-01T00:00:{i:02d}',
+            'user': 'alice' if i % 2 else 'bob',
+            'algorithm': 'AES' if i % 3 else 'DES'
+        }
+        for i in range(n)
+    }
+
+
+def _walk(index, limit, newest_first, **filters):
+    """Every page of a listing, following next_cursor"""
+    pages, cursor = [], None
+    while True:
+        page, cursor = index.page(cursor=cursor, limit=limit, newest_first=newest_first, **filters)
+        pages.append([key_id for _, key_id in page])
+        if cursor is None:
+            return pages
+
+
+def test_cursor_round_trip():
+    entry = ('2024-01-01T00:00:00.000001', 'AES_20240101_000000_000001')
+    assert decode_cursor(encode_cursor(entry)) == entry
+
+
+@pytest.mark.parametrize('cursor', ['', 'no-separator'])
+def test_invalid_cursor(cursor):
+    index = KeyIndex()
+    index.rebuild(_keys(5))
+
+    if cursor:
+        with pytest.raises(ValueError):
+            index.page(cursor=cursor)
+    else:
+        # An empty cursor starts from the first page
+        assert index.page(cursor=cursor, limit=2)[0] == index.page(limit=2)[0]
+
+
+@pytest.mark.parametrize('count, limit', [(0, 3), (1, 3), (5, 5), (6, 3), (7, 3), (10, 1), (10, 50)])
+@pytest.mark.parametrize('newest_first', [True, False])
+def test_pages_cover_every_key_once(count, limit, newest_first):
+    keys = _keys(count)
+    index = KeyIndex()
+    index.rebuild(keys)
+
+    pages = _walk(index, limit, newest_first)
+
+    expected = sorted(keys, reverse=newest_first)
+    assert [key_id for page in pages for key_id in page] == expected
+    assert all(len(page) == limit for page in pages[:-1])
+    # A full last page has no next cursor, so no empty page follows it
+    assert len(pages) == max(1, -(-count // limit))
+
+
+@pytest.mark.parametrize('newest_first', [True, False])
+def test_filtered_pages(newest_first):
+    keys = _keys(20)
+    index = KeyIndex()
+    index.rebuild(keys)
+
+    for filters in ({'user': 'alice'}, {'algorithm': 'DES'}, {'user': 'bob', 'algorithm': 'AES'}):
+        expected = sorted(
+            (key_id for key_id, data in keys.items()
+             if all(data[field] == value for field, value in filters.items())),
+            reverse=newest_first
+        )
+        pages = _walk(index, 3, newest_first, **filters)
+        assert [key_id for page in pages for key_id in page] == expected
+        assert index.count(**filters) == len(expected)
+
+    assert index.page(user='nobody') == ([], None)
+
+
+def test_incremental_updates_match_rebuild():
+    keys = _keys(12)
+    index = KeyIndex()
+    for key_id, data in keys.items():
+        index.add(key_id, data)
+    for key_id in ('k03', 'k04', 'k11'):
+        index.remove(key_id, keys.pop(key_id))
+    # Removing an unknown key is a no-op
+    index.remove('k99', {'created_at': 'x', 'user': 'alice', 'algorithm': 'AES'})
+
+    rebuilt = KeyIndex()
+    rebuilt.rebuild(keys)
+    assert vars(index) == vars(rebuilt)
+
+
+@pytest.fixture
+def key_manager(tmp_path):
+    return KeyManager(str(tmp_path / 'key_vault.enc'), str(tmp_path / 'audit.log'))
+
+
+def test_key_manager_index_follows_delete_and_rotate(key_manager, tmp_path):
+    created = [key_manager.create_key('AES', 'alice') for _ in range(3)]
+    created.append(key_manager.create_key('DES', 'bob'))
+
+    rotated = key_manager.rotate_key(created[0], 'alice')
+    key_manager.delete_key(created[0], 'alice')
+    key_manager.delete_key(created[3], 'bob')
+
+    assert key_manager.count_keys() == 3
+    assert key_manager.count_keys(user='bob') == 0
+    assert key_manager.count_keys(user='alice', algorithm='AES') == 3
+
+    page = key_manager.list_keys_page(user='alice', limit=2)
+    assert [k['key_id'] for k in page['keys']] == [rotated, created[2]]
+    assert page['total'] == 3
+    last = key_manager.list_keys_page(user='alice', cursor=page['next_cursor'], limit=2)
+    assert [k['key_id'] for k in last['keys']] == [created[1]]
+    assert last['next_cursor'] is None
+
+    # The index rebuilt from the vault agrees with the incremental one
+    reloaded = KeyManager(str(tmp_path / 'key_vault.enc'), str(tmp_path / 'audit.log'))
+    assert vars(reloaded.index) == vars(key_manager.index)
+    assert 'key' not in page['keys'][0]
@@ -0,0 +1,151 @@
+import os
+import json
+import base64
+
+import pytest
+from cryptography.hazmat.primitives import padding
+from cryptography.hazmat.primitives.ciphers import Cipher, algorithms, modes
+
+from modules.key_vault import KeyVault, VAULT_MAGIC
+
+
+def _key(n):
+    return {'key': bytes([n]) * 32, 'iv_or_nonce': bytes([n]) * 16, 'algorithm': 'AES', 'user': 'test'}
+
+
+@pytest.fixture
+def master_key():
+    return os.urandom(32)
+
+
+@pytest.fixture
+def path(tmp_path):
+    return str(tmp_path / 'key_vault.enc')
+
+
+def test_missing_vault_is_empty(path, master_key):
+    assert KeyVault(path, master_key).load() == {}
+
+
+def test_put_and_delete_replay(path, master_key):
+    vault = KeyVault(path, master_key)
+    vault.put('a', _key(1))
+    vault.put('b', _key(2))
+    vault.put('a', _key(3))
+    vault.delete('b')
+
+    assert KeyVault(path, master_key).load() == {'a': _key(3)}
+
+
+def test_torn_tail_is_discarded(path, master_key):
+    vault = KeyVault(path, master_key)
+    vault.put('a', _key(1))
+    vault.put('b', _key(2))
+    size = os.path.getsize(path)
+
+    # Interrupted append: a partial record after the last complete one
+    with open(path, 'ab') as f:
+        f.write(b'\x00\x00\x01\x00' + b'partial')
+
+    reloaded = KeyVault(path, master_key)
+    assert reloaded.load() == {'a': _key(1), 'b': _key(2)}
+    assert os.path.getsize(path) == size
+
+    # Appends after recovery stay readable
+    reloaded.put('c', _key(3))
+    assert set(KeyVault(path, master_key).load()) == {'a', 'b', 'c'}
+
+
+def test_corrupt_record_raises(path, master_key):
+    vault = KeyVault(path, master_key)
+    vault.put('a', _key(1))
+
+    with open(path, 'r+b') as f:
+        f.seek(-1, os.SEEK_END)
+        last = f.read(1)
+        f.seek(-1, os.SEEK_END)
+        f.write(bytes([last[0] ^ 1]))
+
+    with pytest.raises(Exception):
+        KeyVault(path, master_key).load()
+
+
+def test_wrong_master_key_raises(path, master_key):
+    KeyVault(path, master_key).put('a', _key(1))
+
+    with pytest.raises(Exception):
+        KeyVault(path, os.urandom(32)).load()
+
+
+def _write_legacy(path, master_key, keys):
+    """Old single-blob vault: IV + AES-CBC(PKCS7(JSON)), binary fields base64"""
+    encoded = {
+        key_id: dict(data, key=base64.b64encode(data['key']).decode(),
+                     iv_or_nonce=base64.b64encode(data['iv_or_nonce']).decode())
+        for key_id, data in keys.items()
+    }
+
+    padder = padding.PKCS7(128).padder()
+    plaintext = padder.update(json.dumps(encoded).encode('utf-8')) + padder.finalize()
+    iv = os.urandom(16)
+    encryptor = Cipher(algorithms.AES(master_key), modes.CBC(iv)).encryptor()
+    with open(path, 'wb') as f:
+        f.write(iv + encryptor.update(plaintext) + encryptor.finalize())
+
+
+def test_legacy_vault_is_migrated(path, master_key):
+    keys = {'a': _key(1), 'b': _key(2)}
+    _write_legacy(path, master_key, keys)
+
+    assert KeyVault(path, master_key).load() == keys
+
+    with open(path, 'rb') as f:
+        assert f.read(len(VAULT_MAGIC)) == VAULT_MAGIC
+    assert not os.path.exists(path + '.tmp')
+
+    # The migrated vault accepts appends and replays them
+    vault = KeyVault(path, master_key)
+    vault.load()
+    vault.put('c', _key(3))
+    assert KeyVault(path, master_key).load() == dict(keys, c=_key(3))
+
+
+def test_failed_legacy_migration_keeps_file(path, master_key):
+    _write_legacy(path, master_key, {'a': _key(1)})
+    with open(path, 'rb') as f:
+        original = f.read()
+
+    with pytest.raises(Exception):
+        KeyVault(path, os.urandom(32)).load()
+
+    with open(path, 'rb') as f:
+        assert f.read() == original
+
+
+def test_compaction_keeps_live_keys(path, master_key):
+    vault = KeyVault(path, master_key, compaction_ratio=2.0, min_compaction_records=4)
+    live = {}
+    for i in range(20):
+        live['k'] = _key(i)
+        vault.put('k', _key(i), live_keys=live)
+
+    # Twenty overwrites of one key compact down instead of growing forever
+    assert vault.record_count <= 4
+    assert KeyVault(path, master_key).load() == {'k': _key(19)}
+
+
+def test_explicit_compact(path, master_key):
+    vault = KeyVault(path, master_key)
+    for i in range(5):
+        vault.put(f'k{i}', _key(i))
+    for i in range(4):
+        vault.delete(f'k{i}')
+    size = os.path.getsize(path)
+
+    vault.compact({'k4': _key(4)})
+
+    assert os.path.getsize(path) < size
+    assert vault.record_count == 1
+    reloaded = KeyVault(path, master_key)
+    assert reloaded.load() == {'k4': _key(4)}
+    assert reloaded.record_count == 1
@@ -0,0 +1,35 @@
+import pytest
+
+from config import Config
+from modules.analyzer import EncryptionAnalyzer
+from modules.measurement import Measurement, MemoryProfile
+
+
+def test_suspended_profile_records_nothing():
+    with MemoryProfile('tracemalloc') as profile:
+        with profile.suspended():
+            with Measurement('encrypt') as m:
+                data = bytearray(1024 * 1024)
+        assert m.peak_memory == 0
+        assert profile.peaks == {}
+
+        with Measurement('encrypt') as m:
+            data = bytearray(1024 * 1024)
+    assert profile.memory_mb('encrypt') >= 1.0
+    del data
+
+
+@pytest.mark.parametrize('warmup', [0, 3])
+def test_benchmark_traces_only_warmup_runs(warmup):
+    analyzer = EncryptionAnalyzer(Config)
+    analyzer.warmup, analyzer.repetitions, analyzer.max_repetitions = warmup, 20, 20
+    algo = analyzer.create_algorithm('AES')
+    algo.generate_key()
+
+    with MemoryProfile('tracemalloc', sample_every=1) as profile:
+        run = analyzer._benchmark(algo, b'x' * 4096, profile)
+
+    # Timed repetitions never go through the sampler
+    assert run['time_stats']['n'] == 20
+    assert profile._calls == {'encrypt': max(1, warmup), 'decrypt': max(1, warmup)}
+    assert profile.memory_mb('encrypt') > 0
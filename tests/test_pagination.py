@@ -0,0 +1,79 @@
+from datetime import datetime, timedelta
+
+import pytest
+
+from database.models import db, AnalysisResult
+from database.pagination import keyset_page, encode_cursor, decode_cursor
+
+
+def _add_results(user_id, timestamps):
+    rows = [AnalysisResult(user_id=user_id, algorithm='AES', created_at=ts) for ts in timestamps]
+    db.session.add_all(rows)
+    db.session.commit()
+    return rows
+
+
+def _all_pages(user_id, per_page):
+    pages, cursor = [], None
+    while True:
+        page = keyset_page(
+            AnalysisResult.query.filter_by(user_id=user_id),
+            AnalysisResult.created_at,
+            AnalysisResult.id,
+            cursor=cursor,
+            per_page=per_page
+        )
+        pages.append([row.id for row in page.items])
+        if not page.has_next:
+            return pages
+        cursor = page.next_cursor
+
+
+def _expected_order(rows):
+    return [row.id for row in sorted(rows, key=lambda r: (r.created_at, r.id), reverse=True)]
+
+
+@pytest.mark.parametrize('count, per_page', [(0, 5), (1, 5), (5, 5), (6, 5), (10, 5), (11, 3)])
+def test_pages_cover_every_row_once(make_user, count, per_page):
+    user_id = make_user('alice')
+    start = datetime(2024, 1, 1)
+    rows = _add_results(user_id, [start + timedelta(seconds=i) for i in range(count)])
+
+    pages = _all_pages(user_id, per_page)
+
+    assert [row_id for page in pages for row_id in page] == _expected_order(rows)
+    assert all(len(page) == per_page for page in pages[:-1])
+    # An exact multiple must not produce a trailing empty page
+    if count:
+        assert pages[-1]
+
+
+def test_equal_timestamps_split_across_pages(make_user):
+    user_id = make_user('alice')
+    same = datetime(2024, 1, 1, 12, 0, 0)
+    rows = _add_results(user_id, [same] * 7)
+
+    pages = _all_pages(user_id, 3)
+
+    assert [len(page) for page in pages] == [3, 3, 1]
+    assert [row_id for page in pages for row_id in page] == _expected_order(rows)
+
+
+def test_pages_are_scoped_to_the_query(make_user):
+    alice, bob = make_user('alice'), make_user('bob')
+    start = datetime(2024, 1, 1)
+    mine = _add_results(alice, [start + timedelta(seconds=i) for i in range(4)])
+    _add_results(bob, [start + timedelta(seconds=i) for i in range(4)])
+
+    assert [row_id for page in _all_pages(alice, 3) for row_id in page] == _expected_order(mine)
+
+
+def test_cursor_round_trip():
+    timestamp = datetime(2024, 5, 6, 7, 8, 9, 123456)
+    assert decode_cursor(encode_cursor(timestamp, 42)) == (timestamp, 42)
+
+
+@pytest.mark.parametrize('cursor', ['garbage', 'notadate_1', '2024-01-01T00:00:00_x'])
+def test_malformed_cursor_raises(cursor):
+    with pytest.raises(ValueError):
+        decode_cursor(cursor)
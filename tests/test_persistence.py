@@ -0,0 +1,167 @@
+import base64
+import threading
+
+import pytest
+
+from database.models import db, AnalysisResult, AnalysisStat, AuditLog, EncryptedData
+from database.persistence import (
+    bulk_insert, save_analysis_results, save_encrypted_batch, analysis_stats, rebuild_analysis_stats
+)
+from database.migrations import ensure_analysis_stats
+
+
+def _result(algorithm, total_time, score):
+    return {
+        'algorithm': algorithm,
+        'encryption_time_ms': total_time / 2,
+        'decryption_time_ms': total_time / 2,
+        'total_time_ms': total_time,
+        'avg_cpu_percent': 100.0,
+        'avg_memory_mb': 0.5,
+        'entropy': 0.99,
+        'S_overall_score': score
+    }
+
+
+def _rollup():
+    return {
+        (s.user_id, s.algorithm, s.metric): (s.count, round(s.total, 6), round(s.total_sq, 6), s.min_value, s.max_value)
+        for s in AnalysisStat.query.all()
+    }
+
+
+def test_bulk_insert_writes_rows_and_audit_together(make_user):
+    user_id = make_user('alice')
+    results = [_result('AES', 1.0, 0.8), _result('DES', 3.0, 0.4)]
+
+    count = save_analysis_results(results, user_id, audit={'action': 'ANALYSIS', 'user_id': user_id})
+
+    assert count == 2
+    assert AnalysisResult.query.filter_by(user_id=user_id).count() == 2
+    assert AuditLog.query.filter_by(action='ANALYSIS').count() == 1
+
+
+def test_failed_rollup_rolls_back_everything(make_user):
+    user_id = make_user('alice')
+
+    def failing_rollup(rows):
+        raise RuntimeError('boom')
+
+    with pytest.raises(RuntimeError):
+        bulk_insert(AnalysisResult, [{'user_id': user_id, 'algorithm': 'AES'}],
+                    audit={'action': 'ANALYSIS', 'user_id': user_id}, rollup=failing_rollup)
+
+    assert AnalysisResult.query.count() == 0
+    assert AuditLog.query.count() == 0
+
+
+def test_empty_batch_still_writes_audit(make_user):
+    user_id = make_user('alice')
+
+    assert save_analysis_results([], user_id, audit={'action': 'ANALYSIS', 'user_id': user_id}) == 0
+    assert AuditLog.query.count() == 1
+    assert AnalysisStat.query.count() == 0
+
+
+def test_returning_ids_follow_message_order(make_user):
+    user_id = make_user('alice')
+    ciphertexts = [bytes([i]) * (i + 1) for i in range(50)]
+
+    ids = save_encrypted_batch(ciphertexts, user_id, 'AES', 'AES_key')
+
+    assert len(ids) == 50
+    rows = {row.id: row for row in EncryptedData.query.all()}
+    assert [base64.b64decode(rows[i].encrypted_content) for i in ids] == ciphertexts
+    assert {row.content_type for row in rows.values()} == {'batch'}
+
+
+def test_incremental_rollup_matches_rebuild(make_user):
+    alice, bob = make_user('alice'), make_user('bob')
+    save_analysis_results([_result('AES', 1.0, 0.9), _result('DES', 5.0, 0.3)], alice)
+    save_analysis_results([_result('AES', 3.0, 0.7)], alice)
+    save_analysis_results([_result('AES', 2.0, 0.8), _result('AES', 4.0, 0.6)], bob)
+    # Missing metrics are skipped rather than counted as zero
+    save_analysis_results([{'algorithm': 'AES', 'total_time_ms': 10.0}], alice)
+
+    incremental = _rollup()
+    rebuild_analysis_stats()
+
+    assert _rollup() == incremental
+
+    aes = next(s for s in analysis_stats(alice) if s['name'] == 'AES')
+    assert aes['metrics']['total_time_ms']['count'] == 3
+    assert aes['metrics']['total_time_ms']['min'] == 1.0
+    assert aes['metrics']['total_time_ms']['max'] == 10.0
+    assert aes['metrics']['s_overall_score']['count'] == 2
+    assert aes['avg_score'] == pytest.approx(0.8)
+
+
+def test_concurrent_saves_are_all_counted(db_app, make_user):
+    user_id = make_user('alice')
+    errors = []
+
+    def worker():
+        with db_app.app_context():
+            try:
+                for _ in range(10):
+                    save_analysis_results([_result('AES', 1.0, 0.5)], user_id)
+            except Exception as e:
+                errors.append(e)
+            finally:
+                db.session.remove()
+
+    threads = [threading.Thread(target=worker) for _ in range(4)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+
+    assert errors == []
+    assert AnalysisResult.query.count() == 40
+    stat = AnalysisStat.query.filter_by(user_id=user_id, algorithm='AES', metric='total_time_ms').one()
+    assert stat.count == 40
+
+
+def test_startup_backfills_empty_rollup(make_user):
+    user_id = make_user('alice')
+    save_analysis_results([_result('AES', 1.0, 0.9)], user_id)
+    expected = _rollup()
+
+    # Database from before the rollup table existed
+    db.session.execute(AnalysisStat.__table__.delete())
+    db.session.commit()
+
+    assert ensure_analysis_stats() == len(expected)
+    assert _rollup() == expected
+    # Already populated: nothing to do
+    assert ensure_analysis_stats() == 0
+
+
+def test_startup_skips_empty_database(db_app):
+    assert ensure_analysis_stats() == 0
+
+
+def test_rollup_without_upsert_matches_rebuild(make_user, monkeypatch):
+    import database.persistence as persistence
+    monkeypatch.setattr(persistence, '_upsert', lambda table: None)
+
+    alice = make_user('alice')
+    save_analysis_results([_result('AES', 1.0, 0.9), _result('DES', 5.0, 0.3)], alice)
+    save_analysis_results([_result('AES', 3.0, 0.7), _result('AES', 0.5, 0.95)], alice)
+
+    incremental = _rollup()
+    rebuild_analysis_stats()
+
+    assert _rollup() == incremental
+    assert incremental[(alice, 'AES', 'total_time_ms')] == (3, 4.5, 10.25, 0.5, 3.0)
+
+
+def test_mysql_upsert_adds_to_existing_row(db_app, monkeypatch):
+    from sqlalchemy.dialects import mysql
+    import database.persistence as persistence
+
+    monkeypatch.setattr(db.session.get_bind().dialect, 'name', 'mysql')
+    sql = str(persistence._upsert(AnalysisStat.__table__).compile(dialect=mysql.dialect()))
+
+    assert 'ON DUPLICATE KEY UPDATE' in sql
+    assert 'count = (analysis_stats.count + VALUES(count))' in sql
@@ -0,0 +1,22 @@
+from config import Config
+from modules.analyzer import EncryptionAnalyzer
+
+
+def _compare(analyzer, plaintext, user_id):
+    return analyzer.compare_algorithms(plaintext, parallel=False, sandbox=False, benchmark=False,
+                                       use_cache=True, memory_mode='off', user_id=user_id)
+
+
+def test_cached_results_are_not_shared_between_users():
+    analyzer = EncryptionAnalyzer(Config)
+
+    first = _compare(analyzer, 'maxfiy matn', user_id=1)
+    assert not any(r.get('cached') for r in first)
+
+    # Another user with the same plaintext gets a fresh analysis
+    other = _compare(analyzer, 'maxfiy matn', user_id=2)
+    assert not any(r.get('cached') for r in other)
+
+    again = _compare(analyzer, 'maxfiy matn', user_id=1)
+    assert len(again) == len(analyzer.ALGORITHMS)
+    assert all(r['cached'] for r in again)